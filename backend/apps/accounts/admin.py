@@ -64,7 +64,15 @@ class UserProfileAdmin(admin.ModelAdmin):
         'id',
         'pitch_decks_uploaded',
         'practice_sessions_completed',
+        'practice_quota_month',
+        'practice_sessions_this_month',
         'total_practice_time_seconds',
+        'average_practice_score',
+        'best_practice_score',
+        'practice_score_sum',
+        'practice_score_sum_squares',
+        'first_practice_at',
+        'last_practice_at',
         'created_at',
         'updated_at',
     )
@@ -86,6 +94,8 @@ class UserProfileAdmin(admin.ModelAdmin):
             'fields': (
                 'pitch_decks_uploaded',
                 'practice_sessions_completed',
+                'practice_quota_month',
+                'practice_sessions_this_month',
                 'total_practice_time_seconds',
             )
         }),
@@ -94,6 +104,10 @@ class UserProfileAdmin(admin.ModelAdmin):
                 'average_practice_score',
                 'best_practice_score',
                 'improvement_rate',
+                'practice_score_sum',
+                'practice_score_sum_squares',
+                'first_practice_at',
+                'last_practice_at',
             )
         }),
         ('Preferences', {
@@ -0,0 +1,64 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:48
+
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Min, Sum
+
+
+def backfill_practice_totals(apps, schema_editor):
+    """Rebuild each profile's practice totals from its completed sessions"""
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    PracticeSession = apps.get_model('practice', 'PracticeSession')
+
+    per_user = PracticeSession.objects.filter(status='completed').values('user_id').annotate(
+        count=Count('id'),
+        score_sum=Sum('overall_score'),
+        score_sum_squares=Sum(F('overall_score') * F('overall_score')),
+        best=Max('overall_score'),
+        duration=Sum('duration_seconds'),
+        first=Min('completed_at'),
+        last=Max('completed_at'),
+    )
+    for row in per_user.iterator():
+        UserProfile.objects.filter(user_id=row['user_id']).update(
+            practice_sessions_completed=row['count'],
+            total_practice_time_seconds=row['duration'] or 0,
+            practice_score_sum=row['score_sum'] or 0,
+            practice_score_sum_squares=row['score_sum_squares'] or 0,
+            average_practice_score=(row['score_sum'] or 0) / row['count'],
+            best_practice_score=row['best'] or 0,
+            first_practice_at=row['first'],
+            last_practice_at=row['last'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        # Sessions are marked counted there before the profile totals are rebuilt
+        ('practice', '0002_practiceprogress_score_sum_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='first_practice_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='last_practice_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='practice_score_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='practice_score_sum_squares',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_practice_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_userprofile_first_practice_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='practice_quota_month',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='practice_sessions_this_month',
+            field=models.IntegerField(default=0),
+        ),
+    ]
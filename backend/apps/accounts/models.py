@@ -36,6 +36,8 @@ class UserProfile(models.Model):
     # Usage Tracking
     pitch_decks_uploaded = models.IntegerField(default=0)
     practice_sessions_completed = models.IntegerField(default=0)
+    practice_quota_month = models.DateField(null=True, blank=True)  # Window for the monthly counter
+    practice_sessions_this_month = models.IntegerField(default=0)
     total_practice_time_seconds = models.BigIntegerField(default=0)
     
     # Preferences
@@ -47,6 +49,10 @@ class UserProfile(models.Model):
     average_practice_score = models.FloatField(default=0)
     best_practice_score = models.FloatField(default=0)
     improvement_rate = models.FloatField(default=0)  # Score improvement over time
+    practice_score_sum = models.FloatField(default=0)  # Running totals for the average
+    practice_score_sum_squares = models.FloatField(default=0)
+    first_practice_at = models.DateTimeField(null=True, blank=True)
+    last_practice_at = models.DateTimeField(null=True, blank=True)
     
     # Onboarding
     onboarding_completed = models.BooleanField(default=False)
@@ -102,31 +108,10 @@ class UserProfile(models.Model):
         """Check if user can do more practice sessions this month"""
         if self.subscription_tier != 'free':
             return True
-        # TODO: Add logic to count sessions this month
-        return self.practice_sessions_completed < self.practice_sessions_limit
-    
-    def increment_pitch_deck_count(self):
-        """Called when user uploads a new deck"""
-        self.pitch_decks_uploaded += 1
-        self.save(update_fields=['pitch_decks_uploaded'])
-    
-    def increment_practice_session_count(self):
-        """Called when user completes a practice session"""
-        self.practice_sessions_completed += 1
-        self.save(update_fields=['practice_sessions_completed'])
-    
-    def update_average_score(self, new_score):
-        """Update average practice score"""
-        if self.practice_sessions_completed == 0:
-            self.average_practice_score = new_score
-        else:
-            total = self.average_practice_score * (self.practice_sessions_completed - 1)
-            self.average_practice_score = (total + new_score) / self.practice_sessions_completed
-        
-        if new_score > self.best_practice_score:
-            self.best_practice_score = new_score
-        
-        self.save(update_fields=['average_practice_score', 'best_practice_score'])
+        from .services.quota import current_quota_month
+        if self.practice_quota_month != current_quota_month():
+            return self.practice_sessions_limit > 0
+        return self.practice_sessions_this_month < self.practice_sessions_limit
 
 
 # Auto-create UserProfile when User is created
@@ -23,6 +23,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'practice_sessions_limit',
             'pitch_decks_uploaded',
             'practice_sessions_completed',
+            'practice_sessions_this_month',
             'total_practice_time_seconds',
             'average_practice_score',
             'best_practice_score',
@@ -43,6 +44,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'id',
             'pitch_decks_uploaded',
             'practice_sessions_completed',
+            'practice_sessions_this_month',
             'total_practice_time_seconds',
             'average_practice_score',
             'best_practice_score',
@@ -0,0 +1,84 @@
+"""
+Quota Service
+Atomic check-and-increment for subscription usage limits
+"""
+import logging
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+from ..models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+
+def current_quota_month():
+    """First day of the current (UTC) month, the practice quota window"""
+    return timezone.now().date().replace(day=1)
+
+
+class QuotaService:
+    """
+    Enforce upload and practice limits with single conditional UPDATEs.
+
+    Each consume call checks the limit and increments the counter in one
+    statement, so concurrent requests can't race past the limit and the
+    request path never loads or saves the whole profile.
+    """
+
+    def try_consume_pitch_deck(self, user):
+        """
+        Reserve one pitch deck upload.
+
+        Returns:
+            bool: True if the upload is within the user's limit
+        """
+        updated = UserProfile.objects.filter(user_id=user.pk).filter(
+            ~Q(subscription_tier='free')
+            | Q(pitch_decks_uploaded__lt=F('pitch_decks_limit'))
+        ).update(pitch_decks_uploaded=F('pitch_decks_uploaded') + 1)
+
+        return updated == 1
+
+    def release_pitch_deck(self, user):
+        """Give back one pitch deck slot (deck deleted or upload failed)"""
+        UserProfile.objects.filter(user_id=user.pk, pitch_decks_uploaded__gt=0).update(
+            pitch_decks_uploaded=F('pitch_decks_uploaded') - 1
+        )
+
+    def try_consume_practice_session(self, user):
+        """
+        Reserve one practice session in the current month.
+
+        The counter resets itself when the stored month differs from the
+        current one, in the same UPDATE that increments it.
+
+        Returns:
+            bool: True if the session is within the user's monthly limit
+        """
+        month = current_quota_month()
+        updated = UserProfile.objects.filter(user_id=user.pk).filter(
+            ~Q(subscription_tier='free')
+            | ~Q(practice_quota_month=month)
+            | Q(practice_sessions_this_month__lt=F('practice_sessions_limit'))
+        ).update(
+            practice_sessions_this_month=Case(
+                When(practice_quota_month=month, then=F('practice_sessions_this_month') + 1),
+                default=Value(1),
+            ),
+            practice_quota_month=month,
+        )
+
+        return updated == 1
+
+    def release_practice_session(self, user):
+        """Give back one practice session reserved this month"""
+        UserProfile.objects.filter(
+            user_id=user.pk,
+            practice_quota_month=current_quota_month(),
+            practice_sessions_this_month__gt=0,
+        ).update(practice_sessions_this_month=F('practice_sessions_this_month') - 1)
+
+    def get_limits(self, user):
+        """Configured limits, only needed to build error messages"""
+        return UserProfile.objects.filter(user_id=user.pk).values(
+            'pitch_decks_limit', 'practice_sessions_limit'
+        ).first() or {}
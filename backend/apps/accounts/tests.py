@@ -1,3 +1,63 @@
+import datetime
+from unittest import mock
+from django.contrib.auth.models import User
 from django.test import TestCase
+from .models import UserProfile
+from .services.quota import QuotaService
 
-# Create your tests here.
+
+class QuotaServiceTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('founder', password='pw')
+        self.quota = QuotaService()
+
+    def profile(self):
+        return UserProfile.objects.get(user=self.user)
+
+    def set_profile(self, **fields):
+        UserProfile.objects.filter(user=self.user).update(**fields)
+
+    def test_free_tier_deck_limit(self):
+        self.set_profile(pitch_decks_limit=2)
+
+        self.assertEqual([self.quota.try_consume_pitch_deck(self.user) for _ in range(3)], [True, True, False])
+        self.assertEqual(self.profile().pitch_decks_uploaded, 2)
+
+        self.quota.release_pitch_deck(self.user)
+        self.assertTrue(self.quota.try_consume_pitch_deck(self.user))
+
+    def test_release_never_goes_negative(self):
+        self.quota.release_pitch_deck(self.user)
+        self.quota.release_practice_session(self.user)
+
+        profile = self.profile()
+        self.assertEqual((profile.pitch_decks_uploaded, profile.practice_sessions_this_month), (0, 0))
+
+    def test_paid_tiers_are_unlimited(self):
+        self.set_profile(subscription_tier='pro', pitch_decks_limit=0, practice_sessions_limit=0)
+
+        self.assertTrue(self.quota.try_consume_pitch_deck(self.user))
+        self.assertTrue(self.quota.try_consume_practice_session(self.user))
+
+    def test_practice_counter_resets_with_the_month(self):
+        self.set_profile(practice_sessions_limit=2)
+        self.assertEqual([self.quota.try_consume_practice_session(self.user) for _ in range(3)], [True, True, False])
+
+        next_month = datetime.date(2099, 1, 1)
+        with mock.patch('apps.accounts.services.quota.current_quota_month', return_value=next_month):
+            self.assertTrue(self.quota.try_consume_practice_session(self.user))
+
+        profile = self.profile()
+        self.assertEqual((profile.practice_quota_month, profile.practice_sessions_this_month), (next_month, 1))
+
+    def test_release_ignores_sessions_from_another_month(self):
+        self.set_profile(practice_quota_month=datetime.date(2000, 1, 1), practice_sessions_this_month=5)
+
+        self.quota.release_practice_session(self.user)
+
+        self.assertEqual(self.profile().practice_sessions_this_month, 5)
+
+    def test_get_limits(self):
+        self.assertEqual(self.quota.get_limits(self.user), {'pitch_decks_limit': 3, 'practice_sessions_limit': 10})
+        self.assertEqual(self.quota.get_limits(User(pk=0)), {})
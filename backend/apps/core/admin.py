@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import ChunkedUpload
+
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    """Admin for ChunkedUpload"""
+    list_display = ('filename', 'owner', 'purpose', 'offset', 'size', 'status', 'created_at', 'expires_at')
+    list_filter = ('purpose', 'status')
+    search_fields = ('filename', 'owner__username')
+    raw_id_fields = ('owner',)
+    readonly_fields = ('id', 'offset', 'content_hash', 'created_at', 'updated_at')
@@ -0,0 +1,117 @@
+"""
+Check what the web process imports at startup, and how long it takes.
+
+Starts a fresh interpreter under `python -X importtime`, loads Django, the
+URLconf and the task modules the views import to queue work, then fails if
+a document, PDF or LLM library was loaded or the imports ran over budget.
+Cold starts matter on scale-to-zero containers. The test suite runs it
+(ImportBudgetTests) with a loose time budget; run it with the default
+budget on the deploy image.
+"""
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Modules the web process loads besides the URLconf (views import them to call .delay)
+WEB_MODULES = [
+    'apps.pitches.tasks',
+    'apps.practice.tasks',
+    'apps.qa.tasks',
+]
+
+# Libraries only workers (or specific requests) should load
+WORKER_ONLY_PACKAGES = [
+    'PyPDF2', 'pptx', 'pdf2image', 'PIL', 'unoserver',
+    'groq', 'openai', 'pydantic', 'nltk',
+]
+
+CHILD_SCRIPT = """
+import importlib
+import django
+django.setup()
+from django.conf import settings
+for name in [settings.ROOT_URLCONF, *{modules!r}]:
+    importlib.import_module(name)
+"""
+
+# import time: self [us] | cumulative | <indent>module
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)')
+
+
+class Command(BaseCommand):
+    help = 'Fail if web process startup imports worker-only libraries or exceeds the import-time budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget-ms',
+            type=float,
+            default=1000,
+            help='Maximum total import time in milliseconds (default: 1000)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='Number of slowest packages to list',
+        )
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT.format(modules=WEB_MODULES)],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Web startup failed:\n{result.stderr[-2000:]}")
+
+        total_us, packages = self._parse(result.stderr)
+
+        self.stdout.write("Slowest packages at web startup:")
+        for name, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+        total_ms = total_us / 1000
+        self.stdout.write(f"Total import time: {total_ms:.1f}ms (budget {options['budget_ms']:.0f}ms)")
+
+        loaded = sorted(name for name in WORKER_ONLY_PACKAGES if name in packages)
+        if loaded:
+            raise CommandError(
+                f"Web startup imports worker-only packages: {', '.join(loaded)}. "
+                f"Import them inside the functions that need them."
+            )
+        if total_ms > options['budget_ms']:
+            raise CommandError(f"Web startup imports take {total_ms:.1f}ms, over the {options['budget_ms']:.0f}ms budget")
+
+        self.stdout.write(self.style.SUCCESS("Web startup imports are within budget"))
+
+    def _parse(self, output):
+        """
+        Total import time and cumulative time per top-level package.
+
+        Returns:
+            tuple: (total microseconds, {package: cumulative microseconds})
+        """
+        total = 0
+        packages = defaultdict(int)
+        for line in output.splitlines():
+            match = IMPORTTIME_RE.match(line)
+            if not match:
+                continue
+            cumulative, indent, module = int(match.group(2)), len(match.group(3)), match.group(4)
+
+            # Outermost imports add up to the total
+            if indent == 1:
+                total += cumulative
+            # A package's own line covers its submodules imported with it
+            if '.' not in module:
+                packages[module] = max(packages[module], cumulative)
+            else:
+                packages.setdefault(module.split('.')[0], 0)
+        return total, packages
@@ -0,0 +1,61 @@
+from django.db import models
+from django.contrib.auth.models import User
+import uuid
+
+
+class ChunkedUpload(models.Model):
+    """A file uploaded in resumable chunks (see ChunkedUploadService)"""
+
+    # Primary Key
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Relationships
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='chunked_uploads',
+        db_index=True
+    )
+
+    # What the file will be used for (decides size and type limits)
+    PURPOSE_CHOICES = [
+        ('pitch_deck', 'Pitch Deck'),
+        ('practice_audio', 'Practice Audio'),
+    ]
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    filename = models.CharField(max_length=255)
+
+    # Direct uploads are PUT straight to media storage and on completion
+    # copied to a name only the server writes, stored in storage_name;
+    # chunked ones stay stored as parts, read back in order
+    direct = models.BooleanField(default=False)
+    storage_name = models.CharField(max_length=500, blank=True)
+    parts = models.JSONField(default=list, blank=True)  # Storage names of accepted chunks, in order
+
+    # Progress
+    size = models.BigIntegerField()  # Declared total size in bytes
+    offset = models.BigIntegerField(default=0)  # Bytes received so far
+    content_hash = models.CharField(max_length=64, blank=True)  # SHA-256, set on completion
+
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    ]
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)  # Abandoned uploads are deleted after this
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Chunked Upload'
+        verbose_name_plural = 'Chunked Uploads'
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size}) by {self.owner.username}"
+
+    @property
+    def extension(self):
+        return self.filename.split('.')[-1].lower()
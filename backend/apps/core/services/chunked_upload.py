@@ -0,0 +1,488 @@
+"""
+Chunked Upload Service
+Resumable uploads (tus-style: create, append chunks at an offset, complete).
+Each chunk is stored as its own part in media storage, so any web node can
+take the next one, and is hashed as it arrives. The parts are read back in
+order only once, when the finished file is stored where it is used.
+Direct uploads skip the web workers and are PUT straight to media storage
+"""
+import io
+import os
+import uuid
+import bisect
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from ..models import ChunkedUpload
+from .storage import ObjectStorage, COPY_BUFFER_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Bytes read from the request body at a time
+READ_BUFFER_SIZE = 64 * 1024
+
+# Storage prefixes for chunk parts and completed direct uploads
+PARTS_DIR = 'uploads/parts'
+COMPLETE_DIR = 'uploads/complete'
+
+
+class UploadOffsetConflict(Exception):
+    """A chunk was sent for an offset other than the upload's current one"""
+
+    def __init__(self, expected):
+        self.expected = expected
+        super().__init__(f"Upload is at offset {expected}")
+
+
+class UploadStorageError(Exception):
+    """A chunk arrived but could not be written to storage"""
+
+
+class UploadPartsFile(io.RawIOBase):
+    """
+    Seekable, read-only view of a chunked upload's parts as one file.
+    Wrap it in io.BufferedReader.
+    """
+
+    def __init__(self, upload):
+        self.storage = ObjectStorage()
+        self.parts = upload.parts
+        # Part names start with the offset they were written at
+        self.starts = [int(os.path.basename(name).split('-')[0]) for name in upload.parts]
+        self.size = upload.size
+        self.position = 0
+        self.part = None
+        self.part_end = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._close_part()
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer):
+        if self.position >= self.size:
+            return 0
+        if self.part is None or self.position >= self.part_end:
+            self._close_part()
+            index = bisect.bisect_right(self.starts, self.position) - 1
+            self.part = self.storage.open(self.parts[index])
+            self.part.seek(self.position - self.starts[index])
+            self.part_end = self.starts[index + 1] if index + 1 < len(self.starts) else self.size
+
+        data = self.part.read(min(len(buffer), self.part_end - self.position))
+        if not data:
+            raise OSError(f"Upload part ending at {self.part_end} is shorter than recorded")
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+    def close(self):
+        self._close_part()
+        super().close()
+
+    def _close_part(self):
+        if self.part is not None:
+            self.part.close()
+            self.part = None
+
+
+class ChunkedUploadService:
+    """
+    Create, append to and finish resumable uploads.
+
+    A client creates an upload with the file's name and total size, sends
+    chunks with the offset they start at, and after a dropped connection
+    asks for the current offset and resumes from there.
+
+    No row lock is held while a chunk streams in: the part is stored first,
+    then the offset moves forward only if it is still where the chunk
+    started, so of two requests racing for one offset exactly one wins.
+
+    Each process keeps the running SHA-256 of uploads it received every
+    chunk of (hash objects can't be shared between processes); an upload
+    whose chunks were spread over several processes is hashed on completion.
+    """
+
+    # Running digests kept per process, least recently used dropped first
+    RUNNING_DIGESTS_KEPT = 256
+    _running_digests = OrderedDict()  # upload id -> (offset, digest)
+    _digests_lock = threading.Lock()
+
+    # Allowed extensions and size per purpose
+    LIMITS = {
+        'pitch_deck': (settings.ALLOWED_PITCH_DECK_EXTENSIONS, settings.MAX_PITCH_DECK_SIZE),
+        'practice_audio': (['mp3', 'mp4', 'mpeg', 'mpga', 'm4a', 'wav', 'webm'], 25 * 1024 * 1024),
+    }
+
+    def create(self, owner, purpose, filename, size, direct=False):
+        """
+        Start an upload.
+
+        Args:
+            owner (User):    Uploading user
+            purpose (str):   'pitch_deck' or 'practice_audio'
+            filename (str):  Original file name
+            size (int):      Total size in bytes
+            direct (bool):   The client PUTs the file to media storage itself
+                             (see presigned_upload) instead of sending chunks
+
+        Returns:
+            ChunkedUpload
+
+        Raises:
+            ValueError: If the purpose, file type or size is not allowed
+        """
+        if purpose not in self.LIMITS:
+            raise ValueError(f"Unknown upload purpose '{purpose}'")
+
+        allowed_extensions, max_size = self.LIMITS[purpose]
+        extension = filename.split('.')[-1].lower()
+        if extension not in allowed_extensions:
+            raise ValueError(
+                f"File type '{extension}' not allowed. Allowed types: {', '.join(allowed_extensions)}"
+            )
+        if size <= 0 or size > max_size:
+            raise ValueError(
+                f"File size must be between 1 byte and {max_size // (1024 * 1024)}MB"
+            )
+
+        self.delete_expired()
+
+        upload = ChunkedUpload(
+            owner=owner,
+            purpose=purpose,
+            filename=os.path.basename(filename)[:255],
+            size=size,
+            direct=direct,
+            expires_at=timezone.now() + timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS),
+        )
+        if direct:
+            upload.storage_name = self._direct_name(upload)
+        upload.save()
+
+        logger.info(f"Started chunked upload {upload.id}: {upload.filename} ({size} bytes)")
+        return upload
+
+    def append(self, upload, offset, stream, length):
+        """
+        Store one chunk of the upload.
+
+        A chunk cut short by a dropped connection still counts for the
+        bytes that arrived; the client resumes from the returned offset.
+
+        Args:
+            upload (ChunkedUpload): Upload being written
+            offset (int):           Offset the chunk starts at
+            stream:                 Readable request body
+            length (int):           Chunk size in bytes (Content-Length)
+
+        Returns:
+            int: New offset
+
+        Raises:
+            UploadOffsetConflict: If offset is not the upload's current offset
+            UploadStorageError: If the chunk could not be stored
+            ValueError: If the upload is complete or the chunk is too large
+        """
+        if length > settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+            raise ValueError(
+                f"Chunk too large. Maximum: {settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE} bytes"
+            )
+
+        upload = ChunkedUpload.objects.get(id=upload.id)
+        if upload.direct:
+            raise ValueError("Direct uploads are sent to storage, not in chunks")
+        if upload.status != 'uploading':
+            raise ValueError("Upload is already complete")
+        if offset != upload.offset:
+            raise UploadOffsetConflict(upload.offset)
+        if offset + length > upload.size:
+            raise ValueError("Chunk goes past the declared upload size")
+
+        storage = ObjectStorage().storage
+        digest = self._digest_at(upload.id, offset)
+        # Spool to disk past 1MB so the chunk never sits in memory whole
+        with tempfile.SpooledTemporaryFile(max_size=COPY_BUFFER_SIZE) as tmp:
+            written = 0
+            try:
+                while written < length:
+                    data = stream.read(min(READ_BUFFER_SIZE, length - written))
+                    if not data:
+                        break
+                    tmp.write(data)
+                    if digest is not None:
+                        digest.update(data)
+                    written += len(data)
+            except OSError as e:
+                # Client went away mid-chunk: keep what arrived
+                logger.warning(f"Chunk for upload {upload.id} cut short after {written} bytes: {str(e)}")
+
+            if not written:
+                return upload.offset
+
+            tmp.seek(0)
+            part_name = f"{PARTS_DIR}/{upload.id}/{offset:012d}-{uuid.uuid4().hex[:8]}.part"
+            try:
+                part_name = storage.save(part_name, File(tmp, name=part_name))
+            except Exception as e:
+                logger.error(f"❌ Could not store chunk for upload {upload.id}: {str(e)}")
+                raise UploadStorageError(f"Could not store chunk: {str(e)}")
+
+        # Move the offset only if no other request got there first
+        advanced = ChunkedUpload.objects.filter(
+            id=upload.id, status='uploading', offset=offset
+        ).update(
+            offset=offset + written,
+            parts=upload.parts + [part_name],
+            updated_at=timezone.now(),
+        )
+        if not advanced:
+            storage.delete(part_name)
+            current = ChunkedUpload.objects.filter(id=upload.id).values_list('offset', flat=True).first()
+            raise UploadOffsetConflict(current or 0)
+
+        if digest is not None:
+            self._keep_digest(upload.id, offset + written, digest)
+        return offset + written
+
+    def complete(self, upload):
+        """
+        Finish an upload once every byte has arrived.
+
+        Chunked uploads stay stored as their parts; open_file reads them
+        back in order, so the whole file is only written once, by whoever
+        stores it where it is used.
+
+        Args:
+            upload (ChunkedUpload): Upload to finish
+
+        Returns:
+            ChunkedUpload: With status 'complete' and content_hash set
+
+        Raises:
+            ValueError: If bytes are still missing
+        """
+        if upload.status == 'complete':
+            return upload
+        if upload.direct:
+            return self._complete_direct(upload)
+        if upload.offset != upload.size:
+            raise ValueError(f"Upload incomplete: {upload.offset}/{upload.size} bytes received")
+
+        digest = self._digest_at(upload.id, upload.size)
+        if digest is None:
+            # Chunks were received by other processes too: hash the parts
+            digest = hashlib.sha256()
+            with self._open_parts(upload) as f:
+                for data in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+                    digest.update(data)
+
+        completed = ChunkedUpload.objects.filter(
+            id=upload.id, status='uploading', offset=upload.size
+        ).update(
+            content_hash=digest.hexdigest(),
+            status='complete',
+            updated_at=timezone.now(),
+        )
+        self._forget_digest(upload.id)
+        if not completed:
+            # Completed by a concurrent request
+            return ChunkedUpload.objects.get(id=upload.id)
+
+        upload.refresh_from_db()
+
+        logger.info(f"✅ Completed chunked upload {upload.id} ({upload.size} bytes)")
+        return upload
+
+    def presigned_upload(self, upload):
+        """Where the client PUTs a direct upload (see ObjectStorage.presigned_upload)"""
+        return ObjectStorage().presigned_upload(self._direct_name(upload), upload.size)
+
+    def receive_direct(self, token, stream, length):
+        """
+        Store the body of a local direct-upload PUT, unless the upload it
+        was signed for is already complete (or gone).
+
+        Raises:
+            ValueError: If the token is invalid, the upload is no longer
+                        open or the size is wrong
+        """
+        storage = ObjectStorage()
+        target = storage.direct_upload_target(token)
+        if not ChunkedUpload.objects.filter(storage_name=target['name'], direct=True, status='uploading').exists():
+            raise ValueError("Upload is already complete")
+        return storage.receive_direct_upload(target, stream, length)
+
+    def _complete_direct(self, upload):
+        """
+        Check a direct upload landed whole, then copy it to a name no
+        upload URL points at and hash the copy: bytes PUT afterwards (the
+        presigned URL stays valid until it expires) can't change the file
+        the hash describes.
+        """
+        storage = ObjectStorage()
+        source = self._direct_name(upload)
+        if not storage.storage.exists(source):
+            raise ValueError("Upload incomplete: the file has not been stored yet")
+
+        stored_size = storage.storage.size(source)
+        if stored_size != upload.size:
+            raise ValueError(f"Upload incomplete: {stored_size}/{upload.size} bytes stored")
+
+        name = storage.copy(source, f"{COMPLETE_DIR}/{upload.id}.{upload.extension}")
+        digest = hashlib.sha256()
+        copied_size = 0
+        with storage.open(name) as f:
+            for chunk in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+                digest.update(chunk)
+                copied_size += len(chunk)
+        if copied_size != upload.size:
+            # Replaced mid-copy by a PUT of another size
+            storage.storage.delete(name)
+            raise ValueError(f"Upload incomplete: {copied_size}/{upload.size} bytes stored")
+
+        completed = ChunkedUpload.objects.filter(id=upload.id, status='uploading').update(
+            storage_name=name,
+            offset=copied_size,
+            content_hash=digest.hexdigest(),
+            status='complete',
+            updated_at=timezone.now(),
+        )
+        if not completed:
+            # Completed by a concurrent request
+            storage.storage.delete(name)
+            return ChunkedUpload.objects.get(id=upload.id)
+
+        storage.storage.delete(source)
+        upload.refresh_from_db()
+
+        logger.info(f"✅ Completed direct upload {upload.id} ({upload.size} bytes)")
+        return upload
+
+    def get_completed(self, owner, upload_id, purpose):
+        """
+        A finished upload of the user's, for the given purpose.
+
+        Returns:
+            ChunkedUpload or None (unknown id, someone else's, or unfinished)
+        """
+        try:
+            return ChunkedUpload.objects.get(id=upload_id, owner=owner, purpose=purpose, status='complete')
+        except (ChunkedUpload.DoesNotExist, ValidationError, ValueError):
+            return None
+
+    def open_file(self, upload):
+        """
+        The finished upload as a Django UploadedFile, ready for a FileField
+        or a service that takes request.FILES objects.
+
+        Args:
+            upload (ChunkedUpload): Completed upload
+
+        Returns:
+            UploadedFile: With content_hash set (see apps.core.upload_handlers)
+        """
+        if upload.direct:
+            file = ObjectStorage().open(upload.storage_name)
+        else:
+            file = self._open_parts(upload)
+        uploaded_file = UploadedFile(
+            file=file,
+            name=upload.filename,
+            size=upload.size,
+        )
+        uploaded_file.content_hash = upload.content_hash
+        return uploaded_file
+
+    def discard(self, upload):
+        """Delete an upload and its bytes"""
+        storage = ObjectStorage().storage
+        if upload.direct:
+            # Also whatever was PUT to the upload URL after completion
+            storage.delete(self._direct_name(upload))
+        else:
+            self._delete_parts(upload)
+        if upload.storage_name:
+            storage.delete(upload.storage_name)
+        upload.delete()
+
+    def delete_expired(self):
+        """Delete abandoned uploads past their expiry"""
+        for upload in ChunkedUpload.objects.filter(expires_at__lt=timezone.now())[:100]:
+            self.discard(upload)
+
+    @staticmethod
+    def _open_parts(upload):
+        """A chunked upload's parts, read in order as one file"""
+        return io.BufferedReader(UploadPartsFile(upload), buffer_size=COPY_BUFFER_SIZE)
+
+    @classmethod
+    def _digest_at(cls, upload_id, offset):
+        """
+        A copy of the upload's running digest if it covers exactly the
+        first offset bytes, else None (this process missed a chunk)
+        """
+        if offset == 0:
+            return hashlib.sha256()
+        with cls._digests_lock:
+            entry = cls._running_digests.get(upload_id)
+            if entry is None or entry[0] != offset:
+                return None
+            cls._running_digests.move_to_end(upload_id)
+            return entry[1].copy()
+
+    @classmethod
+    def _keep_digest(cls, upload_id, offset, digest):
+        with cls._digests_lock:
+            cls._running_digests[upload_id] = (offset, digest)
+            cls._running_digests.move_to_end(upload_id)
+            while len(cls._running_digests) > cls.RUNNING_DIGESTS_KEPT:
+                cls._running_digests.popitem(last=False)
+
+    @classmethod
+    def _forget_digest(cls, upload_id):
+        with cls._digests_lock:
+            cls._running_digests.pop(upload_id, None)
+
+    @staticmethod
+    def _direct_name(upload):
+        """Storage name a direct upload is PUT to"""
+        return f"uploads/direct/{upload.id}.{upload.extension}"
+
+    @staticmethod
+    def _delete_parts(upload):
+        """Delete the upload's chunk parts, including ones that lost an offset race"""
+        storage = ObjectStorage()
+        directory = f"{PARTS_DIR}/{upload.id}"
+        try:
+            _, files = storage.storage.listdir(directory)
+        except FileNotFoundError:
+            return
+        for filename in files:
+            storage.storage.delete(f"{directory}/{filename}")
+        if not storage.is_remote:
+            try:
+                os.rmdir(storage.storage.path(directory))
+            except OSError:
+                pass
@@ -0,0 +1,157 @@
+"""
+JSON Stream Parser
+Incrementally parses a streamed JSON completion and reports top-level
+values (object fields or array elements) as soon as each one is complete
+"""
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalJSONParser:
+    """
+    Feed completion chunks in as they arrive; each call returns the top-level
+    values that became complete.
+
+    For an object root, values are reported as (key, value). For an array
+    root, as (index, value). Elements of an array held directly by a
+    top-level key (e.g. {"questions": [...]}) are also reported one by one,
+    as ((key, index), value). Text before the root (e.g. a stray markdown
+    fence) is ignored. Other nested values are only reported once whole.
+    """
+
+    def __init__(self):
+        self._text = ''
+        self._pos = 0
+        self._depth = 0
+        self._root = None
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self._index = 0
+        self._array_key = None
+        self._element_start = None
+        self._element_index = 0
+        self.done = False
+
+    def feed(self, chunk):
+        """
+        Consume the next chunk of text.
+
+        Args:
+            chunk (str): Next piece of the completion
+
+        Returns:
+            list: (key or index, value) pairs completed by this chunk
+        """
+        self._text += chunk
+        completed = []
+
+        while self._pos < len(self._text) and not self.done:
+            pos = self._pos
+            char = self._text[pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = self._loads(self._text[self._key_start:pos + 1])
+                        self._key_start = None
+                continue
+
+            if self._root is None:
+                # Skip anything before the root value
+                if char in '{[':
+                    self._root = char
+                    self._depth = 1
+                    self._expect_key = char == '{'
+                    self._value_start = pos + 1 if char == '[' else None
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = pos
+                    self._expect_key = False
+            elif char in '{[':
+                self._depth += 1
+                if (
+                    char == '[' and self._depth == 2 and self._root == '{'
+                    and self._text[self._value_start:pos].strip() == ''
+                ):
+                    # A top-level key holding an array: report its elements too
+                    self._array_key = self._key
+                    self._element_start = pos + 1
+                    self._element_index = 0
+            elif char in '}]':
+                if self._depth == 1:
+                    self._complete(pos, completed)
+                    self.done = True
+                elif self._depth == 2 and self._array_key is not None:
+                    self._complete_element(pos, completed)
+                    self._array_key = None
+                self._depth -= 1
+            elif self._depth == 2 and char == ',' and self._array_key is not None:
+                self._complete_element(pos, completed)
+                self._element_start = pos + 1
+            elif self._depth == 1:
+                if char == ':' and self._root == '{':
+                    self._value_start = pos + 1
+                elif char == ',':
+                    self._complete(pos, completed)
+                    if self._root == '{':
+                        self._expect_key = True
+                    else:
+                        self._value_start = pos + 1
+
+        return completed
+
+    def _complete(self, end, completed):
+        """Report the top-level value that ends at `end`, if it parses"""
+        if self._value_start is None:
+            return
+
+        raw = self._text[self._value_start:end].strip()
+        self._value_start = None
+        if not raw:
+            return
+
+        value = self._loads(raw)
+        if value is None and raw != 'null':
+            return
+
+        if self._root == '{':
+            if self._key is not None:
+                completed.append((self._key, value))
+            self._key = None
+        else:
+            completed.append((self._index, value))
+            self._index += 1
+
+    def _complete_element(self, end, completed):
+        """Report an element of a top-level key's array, if it parses"""
+        raw = self._text[self._element_start:end].strip()
+        if not raw:
+            return
+
+        value = self._loads(raw)
+        if value is not None or raw == 'null':
+            completed.append(((self._array_key, self._element_index), value))
+        self._element_index += 1
+
+    @staticmethod
+    def _loads(raw):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            logger.debug(f"Could not parse streamed JSON value: {raw[:80]}")
+            return None
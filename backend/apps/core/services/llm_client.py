@@ -0,0 +1,112 @@
+"""
+LLM Client Service
+Shared LLM call path: provider routing, rate-limit retries and optional
+streaming with incremental JSON parsing
+"""
+import time
+import logging
+from .json_stream import IncrementalJSONParser
+from .llm_router import get_router, is_rate_limit
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClient:
+    """
+    Chat completions for every AI service.
+
+    Shared per process (see apps.core.services.registry): keep call state
+    in locals; the router and its SDK clients are safe across threads.
+    """
+
+    MAX_RETRIES = 3
+
+    def __init__(self, router=None):
+        self.router = router or get_router()
+
+    def warm_up(self):
+        """Create the provider SDK clients ahead of the first call"""
+        self.router.warm_up()
+
+    def complete(self, messages, model, temperature=0.7, max_tokens=1000, on_value=None,
+                 response_format=None, label='LLM call'):
+        """
+        Run a chat completion and return its text.
+
+        With `on_value`, the completion is streamed and parsed as it arrives;
+        `on_value(key, value)` is called for each top-level JSON field (or
+        array element) as soon as it is complete.
+
+        The request goes to the fastest healthy provider (see LLMRouter).
+
+        Args:
+            messages (list):     Chat messages
+            model (str):         Model name
+            temperature (float): Sampling temperature
+            max_tokens (int):    Completion token limit
+            on_value (callable): Optional callback for streamed JSON values
+            response_format:     Optional response format, e.g. JSON mode
+            label (str):         What is being generated, for logs
+
+        Returns:
+            str: The full completion text
+
+        Raises:
+            Exception: The last error once retries are exhausted
+        """
+        options = {'response_format': response_format} if response_format else {}
+
+        def call(provider, provider_model):
+            if on_value is None:
+                response = provider.client.chat.completions.create(
+                    model=provider_model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **options,
+                )
+                return response.choices[0].message.content
+
+            return self._stream(provider.client, provider_model, messages, temperature, max_tokens, on_value, options)
+
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                # Streamed calls are never hedged: their callbacks must fire once
+                return self.router.run(call, model, hedge=on_value is None, label=label)
+
+            except Exception as e:
+                # Every provider is rate limited: wait it out
+                if is_rate_limit(e) and attempt < self.MAX_RETRIES - 1:
+                    wait_time = 10 * (attempt + 1)
+                    logger.warning(f"⏳ Rate limit on {label}, waiting {wait_time}s...")
+                    time.sleep(wait_time)
+                    continue
+
+                raise
+
+    def _stream(self, client, model, messages, temperature, max_tokens, on_value, options):
+        """Stream a completion, reporting JSON values as they complete"""
+        parser = IncrementalJSONParser()
+        parts = []
+
+        stream = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **options,
+        )
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            parts.append(delta)
+
+            for key, value in parser.feed(delta):
+                try:
+                    on_value(key, value)
+                except Exception as e:
+                    logger.warning(f"Streamed value callback failed for {key}: {str(e)}")
+
+        return ''.join(parts)
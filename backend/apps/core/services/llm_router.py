@@ -0,0 +1,361 @@
+"""
+LLM Router Service
+Routes chat completions across providers (Groq, any OpenAI-compatible API,
+a local stub) by rolling latency and error rate, with hedged requests
+"""
+import json
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import SimpleNamespace
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_rate_limit(error):
+    """
+    True for HTTP 429 / rate limit errors from any provider SDK.
+
+    Goes by the error's type and status code, never its message: a 400 such
+    as "Failed to generate JSON" must not put a provider in cooldown. The
+    SDKs aren't imported here, so their RateLimitError is matched by name.
+    """
+    if getattr(error, 'status_code', None) == 429:
+        return True
+    return any(cls.__name__ == 'RateLimitError' for cls in type(error).__mro__)
+
+
+class Provider:
+    """One LLM backend exposing an OpenAI-style chat.completions client"""
+
+    name = ''
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """SDK client, created on first use"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self.create_client()
+        return self._client
+
+    def create_client(self):
+        raise NotImplementedError
+
+    def is_configured(self):
+        return True
+
+    def model_for(self, model):
+        """Provider-specific name for a requested model"""
+        return model
+
+
+class GroqProvider(Provider):
+    name = 'groq'
+
+    def is_configured(self):
+        return bool(getattr(settings, 'GROQ_API_KEY', None))
+
+    def create_client(self):
+        try:
+            from groq import Groq
+        except ImportError:
+            raise ImportError(
+                "groq package is required. Install with: pip install groq"
+            )
+        return Groq(api_key=settings.GROQ_API_KEY)
+
+
+class OpenAIProvider(Provider):
+    """OpenAI or any OpenAI-compatible endpoint (settings.OPENAI_BASE_URL)"""
+
+    name = 'openai'
+
+    def is_configured(self):
+        return bool(getattr(settings, 'OPENAI_API_KEY', None))
+
+    def create_client(self):
+        try:
+            from openai import OpenAI
+        except ImportError:
+            raise ImportError(
+                "openai package is required. Install with: pip install openai"
+            )
+        return OpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=getattr(settings, 'OPENAI_BASE_URL', None) or None,
+        )
+
+    def model_for(self, model):
+        return getattr(settings, 'OPENAI_MODEL', None) or model
+
+
+class LocalProvider(Provider):
+    """
+    Offline stub for tests and local development: answers every request
+    with settings.LLM_LOCAL_RESPONSE (default: an empty JSON object).
+    """
+
+    name = 'local'
+
+    def create_client(self):
+        def create(stream=False, **kwargs):
+            content = getattr(settings, 'LLM_LOCAL_RESPONSE', None) or json.dumps({})
+            if stream:
+                return iter([
+                    SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+                ])
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+PROVIDERS = {
+    GroqProvider.name: GroqProvider,
+    OpenAIProvider.name: OpenAIProvider,
+    LocalProvider.name: LocalProvider,
+}
+
+
+class ProviderStats:
+    """Rolling latency and error rate for one provider + model"""
+
+    WINDOW = 50
+    MIN_SAMPLES = 5
+
+    def __init__(self):
+        self.samples = deque(maxlen=self.WINDOW)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok, rate_limited=False):
+        with self._lock:
+            self.samples.append((latency, ok))
+            if ok:
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            backoff = 30 if rate_limited else min(60, 5 * self.consecutive_failures)
+            self.cooldown_until = time.monotonic() + backoff
+
+    def percentile(self, fraction):
+        """Latency percentile of successful calls (None until there is enough data)"""
+        with self._lock:
+            latencies = sorted(latency for latency, ok in self.samples if ok)
+        if len(latencies) < self.MIN_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    @property
+    def p50(self):
+        return self.percentile(0.5)
+
+    @property
+    def p95(self):
+        return self.percentile(0.95)
+
+    @property
+    def error_rate(self):
+        with self._lock:
+            if not self.samples:
+                return 0.0
+            return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def is_healthy(self):
+        return time.monotonic() >= self.cooldown_until
+
+
+class LLMRouter:
+    """
+    Picks the fastest healthy provider for each request.
+
+    Providers are ranked by p50 latency (inflated by error rate); providers
+    without enough samples are assumed to match the fastest measured one and
+    go first, so a new or recovered provider is explored rather than starved.
+    Non-streamed requests are hedged: if the first provider has not answered
+    within its p95, the next one is asked too and the first answer wins.
+    Failures fall through to the remaining providers.
+
+    Stats live in the worker process, which is where the calls happen.
+    """
+
+    HEDGE_WORKERS = 8
+
+    def __init__(self, provider_names=None):
+        names = provider_names or getattr(settings, 'LLM_PROVIDERS', None) or ['groq']
+        self.providers = []
+        for name in names:
+            provider_class = PROVIDERS.get(name)
+            if provider_class is None:
+                logger.warning(f"Unknown LLM provider '{name}', skipping")
+                continue
+            provider = provider_class()
+            if not provider.is_configured():
+                logger.warning(f"LLM provider '{name}' has no API key, skipping")
+                continue
+            self.providers.append(provider)
+
+        if not self.providers:
+            raise ValueError("No LLM provider is configured. Set GROQ_API_KEY in settings or .env")
+
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._executor = None
+
+    def stats(self, provider, model):
+        key = (provider.name, model)
+        with self._stats_lock:
+            if key not in self._stats:
+                self._stats[key] = ProviderStats()
+            return self._stats[key]
+
+    def warm_up(self):
+        """Create every provider's SDK client now rather than on the first request"""
+        for provider in self.providers:
+            try:
+                provider.client
+            except Exception as e:
+                logger.warning(f"Could not create {provider.name} client: {str(e)}")
+
+    def snapshot(self):
+        """Current stats, for logs and debugging"""
+        with self._stats_lock:
+            items = list(self._stats.items())
+        return {
+            f"{name}:{model}": {
+                'p50': stats.p50,
+                'p95': stats.p95,
+                'error_rate': round(stats.error_rate, 3),
+                'healthy': stats.is_healthy(),
+            }
+            for (name, model), stats in items
+        }
+
+    def rank(self, model):
+        """Providers for a model, best first; unhealthy ones only as a last resort"""
+        def score(latency, stats):
+            return latency / max(0.05, 1 - stats.error_rate)
+
+        stats = {provider.name: self.stats(provider, model) for provider in self.providers}
+        measured = [score(s.p50, s) for s in stats.values() if s.p50 is not None]
+        # Optimistic prior: a provider without enough samples is assumed to be
+        # as fast as the best measured one (still inflated by its own errors),
+        # and wins the tie, so it gets traffic until it has a p50 of its own
+        prior = min(measured, default=0.0)
+
+        def key(indexed):
+            position, provider = indexed
+            provider_stats = stats[provider.name]
+            p50 = provider_stats.p50
+            if p50 is None:
+                return (score(prior, provider_stats), 0, position)
+            return (score(p50, provider_stats), 1, position)
+
+        ranked = [provider for _, provider in sorted(enumerate(self.providers), key=key)]
+        healthy = [p for p in ranked if stats[p.name].is_healthy()]
+        return healthy + [p for p in ranked if p not in healthy]
+
+    def run(self, call, model, hedge=True, label='LLM call'):
+        """
+        Run `call(provider, provider_model)` on the best provider.
+
+        Args:
+            call (callable): Does the request with the given provider's client
+            model (str):     Requested model name
+            hedge (bool):    Allow a hedged second request (not for streams,
+                             whose callbacks must only fire once)
+            label (str):     What is being generated, for logs
+
+        Returns:
+            Whatever `call` returns
+
+        Raises:
+            Exception: The last provider's error if every provider failed
+        """
+        ranked = self.rank(model)
+        last_error = None
+
+        if hedge and len(ranked) > 1:
+            try:
+                return self._hedged(call, model, ranked[0], ranked[1], label)
+            except Exception as e:
+                last_error = e
+            ranked = ranked[2:]
+
+        for provider in ranked:
+            try:
+                return self._timed(call, provider, model)
+            except Exception as e:
+                logger.warning(f"LLM provider {provider.name} failed on {label}: {str(e)}")
+                last_error = e
+
+        raise last_error
+
+    def _hedged(self, call, model, primary, backup, label):
+        """Ask primary; ask backup too if primary is slower than its p95"""
+        executor = self._get_executor()
+        delay = self.stats(primary, model).p95 or settings.LLM_HEDGE_AFTER_SECONDS
+
+        first = executor.submit(self._timed, call, primary, model)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            try:
+                return first.result()
+            except Exception as e:
+                logger.warning(f"LLM provider {primary.name} failed on {label}: {str(e)}")
+                return self._timed(call, backup, model)
+
+        logger.info(f"Hedging {label}: {primary.name} slower than {delay:.2f}s, asking {backup.name}")
+        pending = {first, executor.submit(self._timed, call, backup, model)}
+        last_error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    last_error = e
+        raise last_error
+
+    def _timed(self, call, provider, model):
+        """Run one call and record its latency and outcome"""
+        stats = self.stats(provider, model)
+        start = time.monotonic()
+        try:
+            result = call(provider, provider.model_for(model))
+        except Exception as e:
+            stats.record(time.monotonic() - start, ok=False, rate_limited=is_rate_limit(e))
+            raise
+        stats.record(time.monotonic() - start, ok=True)
+        return result
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._stats_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.HEDGE_WORKERS, thread_name_prefix='llm-hedge'
+                    )
+        return self._executor
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """Process-wide router, so latency stats are shared by every service"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = LLMRouter()
+    return _router
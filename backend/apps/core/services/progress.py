@@ -0,0 +1,56 @@
+"""
+Progress Channel Service
+Partial results published by background tasks while they run
+"""
+import logging
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# A task that dies mid-run must not leave its progress behind forever
+PROGRESS_TIMEOUT = 60 * 60
+
+
+class ProgressChannel:
+    """
+    Cache-backed scratchpad that a task fills while it runs and status
+    views read while they poll.
+
+    Each channel has a single writer (the task that owns it), so the
+    read-modify-write updates below never race with each other.
+    """
+
+    def __init__(self, name):
+        self.key = f"progress:{name}"
+
+    def read(self):
+        """Everything published so far (empty dict when idle)"""
+        return cache.get(self.key) or {}
+
+    def update(self, **fields):
+        """Set top-level fields, e.g. stage or counters"""
+        data = self.read()
+        data.update(fields)
+        self._write(data)
+
+    def merge(self, section, item, fields):
+        """Merge fields into one item of a section, e.g. slides -> '3' -> {...}"""
+        data = self.read()
+        data.setdefault(section, {}).setdefault(str(item), {}).update(fields)
+        self._write(data)
+
+    def append(self, section, value):
+        """Append a value to a list section, e.g. questions generated so far"""
+        data = self.read()
+        data.setdefault(section, []).append(value)
+        self._write(data)
+
+    def clear(self):
+        cache.delete(self.key)
+
+    def _write(self, data):
+        try:
+            cache.set(self.key, data, timeout=PROGRESS_TIMEOUT)
+        except Exception as e:
+            # Progress is best effort; never fail the task over it
+            logger.warning(f"Could not publish progress to {self.key}: {str(e)}")
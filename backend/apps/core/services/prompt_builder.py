@@ -0,0 +1,248 @@
+"""
+Prompt Builder Service
+Token-budgeted prompt compaction shared by every LLM caller
+"""
+import math
+import re
+import logging
+from collections import Counter
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Approximates the Llama 3 BPE: common words are one token, long words and
+# numbers split every few characters, punctuation is its own token
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+|\n+")
+_BULLET_PATTERN = re.compile(r"^[\s•▪●■◦►✓✔\-*–—]+")
+_NUMBER_PATTERN = re.compile(r"[$€£]?\d[\d,.]*\s*(%|[kmb]\b|x\b)?", re.IGNORECASE)
+_WORD_PATTERN = re.compile(r"[a-z][a-z'-]{3,}")
+
+# Footers are short; longer lines are content whatever words they contain
+FOOTER_MAX_WORDS = 8
+
+# Whole lines that carry no content for the model
+_BOILERPLATE_PATTERNS = [
+    re.compile(r"^(page|slide)\s*\d+(\s*(/|of)\s*\d+)?$", re.IGNORECASE),
+    re.compile(r"^\d+\s*(/|of)\s*\d+$", re.IGNORECASE),
+    re.compile(
+        r"^((strictly|private|highly)\s+(and\s+|&\s+)?)*confidential"
+        r"(\s+(and|&)\s+proprietary)?\.?(\s*[|–—-]\s*.*)?$",
+        re.IGNORECASE,
+    ),
+    re.compile(r"^(proprietary\s+(and|&)\s+confidential|all rights reserved)\.?$", re.IGNORECASE),
+    re.compile(r"^(do not (distribute|share|forward|copy)|for internal use only)\b.*$", re.IGNORECASE),
+    re.compile(r"^(©|(copyright|\(c\))\s*(©\s*)?\d{4}\b).*$", re.IGNORECASE),
+    re.compile(r"^(https?://|www\.)\S+$", re.IGNORECASE),
+]
+
+# Figures that are metrics (money, percentages, multiples), never footer text
+_METRIC_PATTERN = re.compile(r"[$€£]\s*\d|\d\s*(%|[kmb]\b|x\b)", re.IGNORECASE)
+
+_STOPWORDS = {
+    'about', 'also', 'been', 'both', 'each', 'from', 'have', 'into', 'just',
+    'more', 'most', 'much', 'only', 'other', 'over', 'same', 'some', 'such',
+    'than', 'that', 'their', 'them', 'then', 'there', 'these', 'they', 'this',
+    'very', 'were', 'what', 'when', 'which', 'while', 'will', 'with', 'would',
+    'your', 'our', 'ours',
+}
+
+ELLIPSIS = "…"
+
+
+def count_tokens(text):
+    """Approximate token count of a piece of text"""
+    return sum(
+        1 + (len(piece) - 1) // (3 if piece.isdigit() else 6)
+        for piece in _TOKEN_PATTERN.findall(text or '')
+    )
+
+
+@lru_cache(maxsize=64)
+def system_prompt(role, output_format='', rules=()):
+    """
+    Build a system prompt once per process.
+
+    The static parts of every call (persona, output schema, rules) live here
+    instead of in the per-call user prompt, so they are assembled once and
+    stay byte-identical across calls.
+
+    Args:
+        role (str):          Persona sentence
+        output_format (str): Compact description of the expected JSON
+        rules (tuple):       Extra rules, one per line
+
+    Returns:
+        str: The system prompt
+    """
+    parts = [role, "Always respond with valid JSON only — no markdown, no code fences, no extra text."]
+    if output_format:
+        parts.append(f"Output format:\n{output_format}")
+    if rules:
+        parts.append("Rules:\n" + "\n".join(f"- {rule}" for rule in rules))
+    return "\n\n".join(parts)
+
+
+class PromptBuilder:
+    """
+    Normalize and compress free text (slide text, transcripts, answers) so a
+    prompt fits a token budget while keeping its most informative sentences.
+    """
+
+    def normalize(self, text, drop_lines=(), page_number=None):
+        """
+        Collapse whitespace, strip bullet glyphs and drop short footer lines:
+        page numbers, copyright and confidentiality notices, bare URLs and
+        lines repeated across slides.
+
+        Args:
+            text (str):         Raw text
+            drop_lines (set):   Extra lines to drop, e.g. footers repeated on every slide
+            page_number (int):  Slide number; a line that is just this number is dropped
+
+        Returns:
+            str: Normalized text, one line per original line
+        """
+        lines = []
+        for line in (text or '').splitlines():
+            line = _BULLET_PATTERN.sub('', line)
+            line = ' '.join(line.split())
+            if not line or self._is_footer(line, drop_lines, page_number):
+                continue
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def compress(self, text, max_tokens, drop_lines=(), page_number=None):
+        """
+        Extractive compression to a token budget.
+
+        Sentences are scored by figures, distinct content words and position,
+        the best ones are kept up to the budget and returned in original order.
+
+        Args:
+            text (str):         Raw text
+            max_tokens (int):   Token budget for the result
+            drop_lines (set):   Extra lines to drop (see normalize)
+            page_number (int):  Slide number (see normalize)
+
+        Returns:
+            str: Compressed text
+        """
+        text = self.normalize(text, drop_lines, page_number)
+        if count_tokens(text) <= max_tokens:
+            return text
+
+        sentences = [s.strip() for s in _SENTENCE_PATTERN.split(text) if s.strip()]
+        costs = [count_tokens(s) for s in sentences]
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda i: self._score(sentences[i], i, costs[i]),
+            reverse=True,
+        )
+
+        # The best sentence alone is over budget: a cut of it beats filler
+        if costs[ranked[0]] > max_tokens:
+            return self._truncate(sentences[ranked[0]], max_tokens)
+
+        kept = set()
+        budget = max_tokens
+        for i in ranked:
+            if costs[i] <= budget:
+                kept.add(i)
+                budget -= costs[i]
+
+        parts = []
+        for i, sentence in enumerate(sentences):
+            if i in kept:
+                parts.append(sentence)
+            elif parts and parts[-1] != ELLIPSIS:
+                parts.append(ELLIPSIS)
+        return ' '.join(parts)
+
+    def compress_many(self, texts, max_tokens, page_numbers=None):
+        """
+        Compress several texts (e.g. all slides of a deck) into one shared budget.
+
+        Lines repeated on at least half of the texts are treated as footers
+        and dropped. Short texts give their unused share to longer ones.
+
+        Args:
+            texts (list):         Raw texts
+            max_tokens (int):     Total token budget
+            page_numbers (list):  Slide number of each text (see normalize)
+
+        Returns:
+            list: Compressed texts, same order
+        """
+        drop_lines = self._repeated_lines(texts)
+        page_numbers = page_numbers or [None] * len(texts)
+        normalized = [
+            self.normalize(text, drop_lines, number)
+            for text, number in zip(texts, page_numbers)
+        ]
+        costs = [count_tokens(t) for t in normalized]
+
+        # Water-filling: every text gets an equal share, leftovers flow on
+        shares = [0] * len(texts)
+        remaining = max_tokens
+        pending = sorted(range(len(texts)), key=lambda i: costs[i])
+        while pending:
+            share = remaining // len(pending)
+            i = pending.pop(0)
+            shares[i] = min(costs[i], share)
+            remaining -= shares[i]
+
+        return [
+            text if costs[i] <= shares[i] else self.compress(text, shares[i])
+            for i, text in enumerate(normalized)
+        ]
+
+    def _score(self, sentence, position, cost):
+        """Informativeness of one sentence"""
+        figures = len(_NUMBER_PATTERN.findall(sentence))
+        words = {w for w in _WORD_PATTERN.findall(sentence.lower()) if w not in _STOPWORDS}
+        score = 2.0 * min(figures, 3) + len(words) / math.sqrt(max(cost, 1))
+        if position == 0:
+            score += 1.5  # Headlines and opening sentences carry the point
+        return score
+
+    def _truncate(self, text, max_tokens):
+        """Cut text at a word boundary within the budget"""
+        words = []
+        used = 0
+        for word in text.split():
+            cost = count_tokens(word) + 1
+            if used + cost > max_tokens - 1:
+                break
+            words.append(word)
+            used += cost
+        return ' '.join(words) + ELLIPSIS
+
+    def _is_footer(self, line, drop_lines, page_number):
+        """Whether a normalized line is boilerplate rather than content"""
+        if len(line.split()) > FOOTER_MAX_WORDS:
+            return False
+        if line.lower() in drop_lines:
+            return True
+        if page_number is not None and line == str(page_number):
+            return True
+        return any(pattern.match(line) for pattern in _BOILERPLATE_PATTERNS)
+
+    def _repeated_lines(self, texts):
+        """Short, metric-free lines on at least half of the texts (footers, taglines)"""
+        if len(texts) < 3:
+            return set()
+        counts = Counter(
+            line
+            for text in texts
+            for line in {
+                ' '.join(_BULLET_PATTERN.sub('', l).split()).lower()
+                for l in (text or '').splitlines()
+            }
+            if line
+        )
+        return {
+            line for line, n in counts.items()
+            if n >= len(texts) / 2 and len(line.split()) <= FOOTER_MAX_WORDS
+            and not _METRIC_PATTERN.search(line)
+        }
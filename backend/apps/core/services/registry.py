@@ -0,0 +1,67 @@
+"""
+Service Registry
+One long-lived instance of each stateless service per process. Celery
+worker processes build them (and warm their clients and indexes) before
+taking their first task, so per-task setup costs nothing
+"""
+import time
+import logging
+import threading
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def get_service(service_class):
+    """
+    Shared instance of a service class, created on first use.
+
+    Only for services without per-call state: the instance is used by
+    every task (and thread) in the process.
+    """
+    instance = _instances.get(service_class)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(service_class)
+            if instance is None:
+                instance = service_class()
+                _instances[service_class] = instance
+    return instance
+
+
+def import_services():
+    """
+    Import the preloaded service modules. Run in the worker's main process,
+    so forked pool processes inherit them instead of importing each their own.
+    """
+    for path in settings.WORKER_PRELOADED_SERVICES:
+        try:
+            import_string(path)
+        except ImportError as e:
+            logger.error(f"❌ Could not import service {path}: {str(e)}")
+
+
+def preload_services():
+    """
+    Build every service in settings.WORKER_PRELOADED_SERVICES and run its
+    optional warm_up() (SDK clients, stemmers, embeddings). Failures are
+    logged: the task that needs the service raises the real error later.
+    """
+    started = time.perf_counter()
+    loaded = 0
+    for path in settings.WORKER_PRELOADED_SERVICES:
+        try:
+            service = get_service(import_string(path))
+            warm_up = getattr(service, 'warm_up', None)
+            if warm_up is not None:
+                warm_up()
+            loaded += 1
+        except Exception as e:
+            logger.error(f"❌ Could not preload service {path}: {str(e)}")
+
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.info(f"✅ Preloaded {loaded}/{len(settings.WORKER_PRELOADED_SERVICES)} services in {elapsed:.0f}ms")
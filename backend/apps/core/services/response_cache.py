@@ -0,0 +1,79 @@
+"""
+Response Cache Service
+Versioned rendered-JSON cache with ETag / Last-Modified handling
+"""
+import hashlib
+import logging
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Rendered responses are keyed by object version, so a long timeout is safe
+# as long as they hold no expiring data: link signed storage URLs through a
+# view that signs them per request instead (see pitches:file)
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _generation(namespace):
+    """Current invalidation generation for a namespace"""
+    return cache.get_or_set(f"response-gen:{namespace}", 1, timeout=None)
+
+
+def invalidate_namespace(namespace):
+    """
+    Drop every cached response in a namespace (e.g. all views of one deck).
+
+    Bumping the generation changes both the cache keys and the ETags, so
+    stale entries are never served and simply expire.
+    """
+    key = f"response-gen:{namespace}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+    logger.debug(f"Invalidated response cache namespace {namespace}")
+
+
+def cached_json_response(request, namespace, key, version, build_data, last_modified=None):
+    """
+    Serve a read-only JSON view from the rendered-response cache.
+
+    Args:
+        request:       Incoming request (used for If-None-Match / If-Modified-Since)
+        namespace:     Invalidation group, e.g. "pitch_deck:<id>"
+        key:           View within the namespace, e.g. "slide:3"
+        version:       Object version (typically updated_at / completed_at)
+        build_data:    Callable returning the response data on a cache miss
+        last_modified: Optional datetime for the Last-Modified header
+
+    Returns:
+        HttpResponse: 304 when the client copy is current, otherwise the JSON body
+    """
+    generation = _generation(namespace)
+    version_tag = f"{namespace}:{key}:{version}:{generation}"
+    etag = quote_etag(hashlib.md5(version_tag.encode()).hexdigest())
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified_ts
+    )
+    if not_modified is None:
+        cache_key = f"response:{version_tag}"
+        content = cache.get(cache_key)
+        if content is None:
+            content = JSONRenderer().render(build_data())
+            cache.set(cache_key, content, RESPONSE_CACHE_TIMEOUT)
+        response = HttpResponse(content, content_type='application/json')
+    else:
+        response = not_modified
+
+    response['ETag'] = etag
+    if last_modified_ts is not None:
+        response['Last-Modified'] = http_date(last_modified_ts)
+    # Per-user data: browsers may keep it but must revalidate every time
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,275 @@
+"""
+Object Storage Service
+One interface over the media storage backend, whether that is S3-compatible
+object storage (AWS S3, MinIO, R2) or the local MEDIA_ROOT stand-in:
+streaming and ranged reads, local copies for tools that need a path, and
+presigned direct-to-storage uploads
+"""
+import io
+import os
+import shutil
+import logging
+import tempfile
+import posixpath
+from contextlib import contextmanager
+from django.conf import settings
+from django.core import signing
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+# Salt for signed local direct-upload URLs
+DIRECT_UPLOAD_SALT = 'apps.core.direct-upload'
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class RangedStorageFile(io.RawIOBase):
+    """
+    Seekable, read-only view of a stored object that fetches only the byte
+    ranges it is asked for. Wrap it in io.BufferedReader.
+    """
+
+    def __init__(self, storage, name, size):
+        self.storage = storage
+        self.name = name
+        self.size = size
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer):
+        if self.position >= self.size:
+            return 0
+        end = min(self.size, self.position + len(buffer)) - 1
+        data = self.storage.read_range(self.name, self.position, end)
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+class ObjectStorage:
+    """
+    Media storage helpers that work the same on every backend.
+
+    Workers use this instead of FieldFile.path, which only exists when the
+    worker shares the web container's filesystem.
+    """
+
+    # Bytes fetched per ranged request when reading through open_ranged
+    RANGE_BUFFER_SIZE = 256 * 1024
+
+    def __init__(self, storage=None):
+        self.storage = storage or default_storage
+
+    @property
+    def is_remote(self):
+        """True when files have no local path (object storage)"""
+        try:
+            self.storage.path('')
+        except NotImplementedError:
+            return True
+        return False
+
+    def open(self, name):
+        """Stream a stored file"""
+        return self.storage.open(name, 'rb')
+
+    def open_ranged(self, name):
+        """
+        Seekable file that reads a remote object by byte ranges, so formats
+        with an index (ZIP-based PPTX, PDF xref) don't need a full download.
+        Local files are simply opened.
+        """
+        if not self.is_remote:
+            return self.storage.open(name, 'rb')
+
+        raw = RangedStorageFile(self, name, self.storage.size(name))
+        return io.BufferedReader(raw, buffer_size=self.RANGE_BUFFER_SIZE)
+
+    def read_range(self, name, start, end):
+        """
+        Bytes start..end (inclusive) of a stored file.
+
+        Args:
+            name (str):  Storage name
+            start (int): First byte
+            end (int):   Last byte
+
+        Returns:
+            bytes
+        """
+        client = self._s3_client()
+        if client is not None:
+            response = client.get_object(
+                Bucket=self.storage.bucket_name,
+                Key=self._s3_key(name),
+                Range=f"bytes={start}-{end}",
+            )
+            return response['Body'].read()
+
+        with self.storage.open(name, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    @contextmanager
+    def local_path(self, name):
+        """
+        A local path for tools that only take paths (poppler, LibreOffice):
+        the file itself on local storage, a streamed temporary copy otherwise.
+        """
+        if not self.is_remote:
+            yield self.storage.path(name)
+            return
+
+        suffix = os.path.splitext(name)[1]
+        with tempfile.NamedTemporaryFile(suffix=suffix) as tmp:
+            with self.storage.open(name, 'rb') as source:
+                shutil.copyfileobj(source, tmp, COPY_BUFFER_SIZE)
+            tmp.flush()
+            yield tmp.name
+
+    def url(self, name):
+        """URL to serve a file from (signed on private buckets)"""
+        return self.storage.url(name)
+
+    def presigned_upload(self, name, size, content_type='application/octet-stream'):
+        """
+        Where a client can PUT a file straight to storage, bypassing web workers.
+
+        On object storage this is a presigned S3 URL. The local stand-in
+        returns a signed URL to the direct-upload endpoint, which behaves
+        the same way.
+
+        Args:
+            name (str):         Storage name to write
+            size (int):         Expected size in bytes
+            content_type (str): Content-Type the client must send
+
+        Returns:
+            dict: {'method': 'PUT', 'url': str, 'headers': dict}
+        """
+        expires = settings.STORAGE_PRESIGNED_EXPIRY_SECONDS
+        client = self._s3_client()
+        if client is not None:
+            url = client.generate_presigned_url(
+                'put_object',
+                Params={
+                    'Bucket': self.storage.bucket_name,
+                    'Key': self._s3_key(name),
+                    'ContentType': content_type,
+                },
+                ExpiresIn=expires,
+            )
+        else:
+            token = signing.dumps({'name': name, 'size': size}, salt=DIRECT_UPLOAD_SALT)
+            url = reverse('core:direct-upload', args=[token])
+
+        return {
+            'method': 'PUT',
+            'url': url,
+            'headers': {'Content-Type': content_type},
+            'expires_in': expires,
+        }
+
+    def direct_upload_target(self, token):
+        """
+        What a local direct-upload token was signed for.
+
+        Args:
+            token (str): Token from presigned_upload
+
+        Returns:
+            dict: {'name': storage name, 'size': expected bytes}
+
+        Raises:
+            ValueError: If the token is invalid or expired
+        """
+        try:
+            return signing.loads(
+                token, salt=DIRECT_UPLOAD_SALT, max_age=settings.STORAGE_PRESIGNED_EXPIRY_SECONDS
+            )
+        except signing.BadSignature:
+            raise ValueError("Invalid or expired upload URL")
+
+    def receive_direct_upload(self, target, stream, length):
+        """
+        Local stand-in for a presigned PUT: store the request body under the
+        name a token was signed for (see direct_upload_target).
+
+        Args:
+            target (dict): Signed {'name', 'size'}
+            stream:        Readable request body
+            length (int):  Content-Length
+
+        Returns:
+            str: Storage name written
+
+        Raises:
+            ValueError: If the size is wrong
+        """
+        if length != target['size']:
+            raise ValueError(f"Expected {target['size']} bytes, got {length}")
+
+        # Spool to disk past 1MB so the body never sits in memory whole
+        with tempfile.SpooledTemporaryFile(max_size=COPY_BUFFER_SIZE) as tmp:
+            remaining = length
+            while remaining:
+                data = stream.read(min(COPY_BUFFER_SIZE, remaining))
+                if not data:
+                    raise ValueError("Upload body ended early")
+                tmp.write(data)
+                remaining -= len(data)
+            tmp.seek(0)
+
+            # A retried PUT replaces the earlier attempt
+            if self.storage.exists(target['name']):
+                self.storage.delete(target['name'])
+            return self.storage.save(target['name'], File(tmp, name=target['name']))
+
+    def copy(self, source, target):
+        """
+        Copy a stored file (server-side on object storage).
+
+        Returns:
+            str: Storage name of the copy
+        """
+        client = self._s3_client()
+        if client is not None:
+            client.copy_object(
+                Bucket=self.storage.bucket_name,
+                CopySource={'Bucket': self.storage.bucket_name, 'Key': self._s3_key(source)},
+                Key=self._s3_key(target),
+            )
+            return target
+
+        with self.storage.open(source, 'rb') as f:
+            return self.storage.save(target, File(f, name=target))
+
+    def _s3_client(self):
+        """boto3 client of an S3-compatible backend (None on other backends)"""
+        connection = getattr(self.storage, 'connection', None)
+        if connection is None or not getattr(self.storage, 'bucket_name', None):
+            return None
+        return connection.meta.client
+
+    def _s3_key(self, name):
+        location = getattr(self.storage, 'location', '') or ''
+        return posixpath.join(location, name) if location else name
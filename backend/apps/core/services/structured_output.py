@@ -0,0 +1,246 @@
+"""
+Structured Output Service
+Schema-validated JSON completions: JSON mode, repair of truncated output
+and targeted re-asks for only the fields that came back missing or invalid
+"""
+import json
+import logging
+from typing import Annotated
+from pydantic import BeforeValidator, ValidationError
+
+logger = logging.getLogger(__name__)
+
+JSON_MODE = {"type": "json_object"}
+
+
+def _to_score(value):
+    """Coerce "85", 85.4 or 140 into an int score within 0-100"""
+    return max(0, min(100, round(float(value))))
+
+
+def _to_non_negative(value):
+    """Coerce "45", 45.5 or -3 into a non-negative int"""
+    return max(0, round(float(value)))
+
+
+def _to_choice(value):
+    """Normalize enum-like strings, e.g. "Business Model" -> business_model"""
+    return str(value).strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def _drop_invalid_items(item_schema):
+    """Keep the valid items of a list; a list with no valid item is an error"""
+    def validator(items):
+        if not isinstance(items, list):
+            return items
+        kept = []
+        for item in items:
+            try:
+                kept.append(item_schema.model_validate(item))
+            except ValidationError:
+                logger.warning(f"Dropping invalid {item_schema.__name__}: {str(item)[:80]}")
+        if items and not kept:
+            raise ValueError(f"no valid {item_schema.__name__} items")
+        return kept
+    return BeforeValidator(validator)
+
+
+# Field types shared by the LLM output schemas
+Score = Annotated[int, BeforeValidator(_to_score)]
+NonNegative = Annotated[int, BeforeValidator(_to_non_negative)]
+Choice = BeforeValidator(_to_choice)
+ValidItems = _drop_invalid_items
+
+
+class StructuredOutputError(Exception):
+    """The model never produced a valid value for some fields"""
+
+    def __init__(self, label, fields):
+        self.fields = fields
+        super().__init__(f"Invalid structured output for {label}: {', '.join(fields)}")
+
+
+def parse_json(text):
+    """
+    Parse a JSON object out of a completion, repairing it if needed.
+
+    Handles markdown fences, leading/trailing chatter and output that was
+    cut off by max_tokens (open strings and brackets are closed, the
+    incomplete trailing member is dropped).
+
+    Returns:
+        dict: Parsed object ({} if nothing usable)
+    """
+    text = (text or '').strip()
+    start = text.find('{')
+    if start == -1:
+        return {}
+    text = text[start:]
+
+    end = text.rfind('}')
+    if end != -1:
+        try:
+            data = json.loads(text[:end + 1])
+            return data if isinstance(data, dict) else {}
+        except ValueError:
+            pass
+
+    return repair_json(text)
+
+
+def repair_json(text):
+    """Best-effort parse of a truncated JSON object"""
+    candidate = text
+    for _ in range(50):
+        try:
+            data = json.loads(_close(candidate))
+            return data if isinstance(data, dict) else {}
+        except ValueError:
+            pass
+
+        # Drop the last (incomplete) member and try again
+        cut = candidate.rstrip().rstrip(',').rfind(',')
+        if cut <= 0:
+            break
+        candidate = candidate[:cut]
+
+    logger.warning("Could not repair JSON output")
+    return {}
+
+
+def _close(text):
+    """Close an open string and any open brackets, dropping a dangling separator"""
+    stack = []
+    in_string = False
+    escape = False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+        elif char in '}]' and stack:
+            stack.pop()
+
+    if in_string:
+        if escape:
+            text = text[:-1]  # A dangling backslash would escape the closing quote
+        text += '"'
+    text = text.rstrip()
+    if text.endswith((',', ':')):
+        text = text[:-1]
+    return text + ''.join(reversed(stack))
+
+
+class StructuredOutput:
+    """
+    Run a completion and return it as a validated Pydantic model.
+
+    Malformed output is repaired locally first; fields that are still
+    missing or invalid are re-asked for in a short follow-up call, instead
+    of re-running the whole prompt.
+    """
+
+    MAX_REASKS = 1
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def complete(self, messages, schema, model, temperature=0.7, max_tokens=1000,
+                 on_value=None, label='LLM call'):
+        """
+        Args:
+            messages (list):     Chat messages
+            schema:              Pydantic model class for the JSON object
+            model (str):         Model name
+            temperature (float): Sampling temperature
+            max_tokens (int):    Completion token limit
+            on_value (callable): Optional streaming callback (see LLMClient)
+            label (str):         What is being generated, for logs
+
+        Returns:
+            BaseModel: Validated instance of `schema`
+
+        Raises:
+            StructuredOutputError: If fields stay invalid after re-asking
+        """
+        # Groq's JSON mode cannot be combined with streaming; streamed calls
+        # rely on the prompt plus local repair instead
+        response_text = self.llm.complete(
+            messages=messages,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            on_value=on_value,
+            response_format=None if on_value else JSON_MODE,
+            label=label,
+        )
+        data = parse_json(response_text)
+        result, invalid = self.validate(schema, data)
+
+        for _ in range(self.MAX_REASKS):
+            if not invalid:
+                break
+            logger.warning(f"Re-asking for {', '.join(invalid)} in {label}")
+            data.update(self._reask(messages, response_text, schema, invalid, model, label))
+            result, invalid = self.validate(schema, data)
+
+        if invalid:
+            raise StructuredOutputError(label, invalid)
+        return result
+
+    def validate(self, schema, data):
+        """
+        Validate data against a schema.
+
+        Returns:
+            tuple: (instance or None, sorted list of invalid top-level fields)
+        """
+        try:
+            return schema.model_validate(data), []
+        except ValidationError as e:
+            fields = sorted({str(error['loc'][0]) for error in e.errors() if error['loc']})
+            return None, fields or list(schema.model_fields)
+
+    def _reask(self, messages, response_text, schema, fields, model, label):
+        """Ask only for the fields that were missing or invalid"""
+        json_schema = schema.model_json_schema()
+        properties = json_schema.get('properties', {})
+        wanted = {field: properties.get(field, {}) for field in fields}
+        if '$defs' in json_schema:
+            wanted['$defs'] = json_schema['$defs']
+
+        followup = messages + [
+            {"role": "assistant", "content": response_text or "{}"},
+            {
+                "role": "user",
+                "content": (
+                    "These fields were missing or invalid in your JSON: "
+                    f"{', '.join(fields)}.\n"
+                    f"Field schemas: {json.dumps(wanted)}\n"
+                    "Return a JSON object with only these fields."
+                ),
+            },
+        ]
+
+        try:
+            patch_text = self.llm.complete(
+                messages=followup,
+                model=model,
+                temperature=0.2,
+                max_tokens=600,
+                response_format=JSON_MODE,
+                label=f"{label} (re-ask)",
+            )
+        except Exception as e:
+            logger.error(f"Re-ask failed for {label}: {str(e)}")
+            return {}
+
+        patch = parse_json(patch_text)
+        return {field: patch[field] for field in fields if field in patch}
@@ -0,0 +1,478 @@
+import io
+import shutil
+import hashlib
+import tempfile
+from unittest import mock
+from pydantic import BaseModel
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from .models import ChunkedUpload
+from .services.json_stream import IncrementalJSONParser
+from .services.llm_router import LLMRouter
+from .services.prompt_builder import ELLIPSIS, PromptBuilder, count_tokens
+from .services.structured_output import Score, StructuredOutput, StructuredOutputError, parse_json, repair_json
+from .services.chunked_upload import ChunkedUploadService, UploadOffsetConflict, UploadPartsFile
+from .services.storage import ObjectStorage, RangedStorageFile
+
+
+class FakeS3Client:
+    """Just enough of a boto3 S3 client, backed by a dict, counting requests"""
+
+    def __init__(self, objects):
+        self.objects = objects
+        self.ranges = []
+
+    def get_object(self, Bucket, Key, Range):
+        start, end = (int(value) for value in Range[len('bytes='):].split('-'))
+        self.ranges.append((start, end))
+        return {'Body': io.BytesIO(self.objects[Key][start:end + 1])}
+
+    def copy_object(self, Bucket, CopySource, Key):
+        self.objects[Key] = self.objects[CopySource['Key']]
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://{Params['Bucket']}.s3.example.com/{Params['Key']}?expires={ExpiresIn}"
+
+
+class FakeS3Storage:
+    """Stand-in for storages.backends.s3.S3Storage (no local paths)"""
+
+    bucket_name = 'decks'
+    location = 'media'
+
+    def __init__(self, objects):
+        self.client = FakeS3Client(objects)
+        self.connection = type('Connection', (), {'meta': type('Meta', (), {'client': self.client})})
+
+    def path(self, name):
+        raise NotImplementedError
+
+    def size(self, name):
+        return len(self.client.objects[f"media/{name}"])
+
+    def open(self, name, mode='rb'):
+        return ContentFile(self.client.objects[f"media/{name}"])
+
+
+class TempMediaMixin:
+    """Media storage in a throwaway directory"""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.media = override_settings(MEDIA_ROOT=self.media_root)
+        self.media.enable()
+
+    def tearDown(self):
+        self.media.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        super().tearDown()
+
+
+class RangedStorageFileTests(TestCase):
+
+    def setUp(self):
+        self.data = bytes(range(256)) * 40
+        self.storage = ObjectStorage(FakeS3Storage({'media/deck.pptx': self.data}))
+
+    def test_reads_only_requested_ranges(self):
+        f = RangedStorageFile(self.storage, 'deck.pptx', len(self.data))
+        f.seek(-10, io.SEEK_END)
+        self.assertEqual(f.read(10), self.data[-10:])
+        f.seek(100)
+        self.assertEqual(f.read(5), self.data[100:105])
+        self.assertEqual(self.storage.storage.client.ranges, [(len(self.data) - 10, len(self.data) - 1), (100, 104)])
+
+    def test_read_past_end_returns_nothing(self):
+        f = RangedStorageFile(self.storage, 'deck.pptx', len(self.data))
+        f.seek(len(self.data) + 5)
+        self.assertEqual(f.read(10), b'')
+
+    def test_open_ranged_buffers_remote_reads(self):
+        with self.storage.open_ranged('deck.pptx') as f:
+            f.seek(1000)
+            self.assertEqual(f.read(20), self.data[1000:1020])
+            self.assertEqual(f.read(20), self.data[1020:1040])
+        # Both reads came out of one buffered range request
+        self.assertEqual(len(self.storage.storage.client.ranges), 1)
+
+
+class ObjectStorageTests(TempMediaMixin, TestCase):
+
+    def test_local_storage(self):
+        storage = ObjectStorage(FileSystemStorage())
+        name = storage.storage.save('decks/a.pdf', ContentFile(b'0123456789'))
+
+        self.assertFalse(storage.is_remote)
+        self.assertEqual(storage.read_range(name, 2, 4), b'234')
+        with storage.local_path(name) as path:
+            self.assertEqual(path, storage.storage.path(name))
+        with storage.open_ranged(name) as f:
+            self.assertEqual(f.read(), b'0123456789')
+
+        copy = storage.copy(name, 'decks/b.pdf')
+        with storage.open(copy) as f:
+            self.assertEqual(f.read(), b'0123456789')
+
+    def test_remote_storage(self):
+        objects = {'media/decks/a.pdf': b'remote bytes'}
+        storage = ObjectStorage(FakeS3Storage(objects))
+
+        self.assertTrue(storage.is_remote)
+        with storage.local_path('decks/a.pdf') as path:
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), b'remote bytes')
+
+        self.assertEqual(storage.copy('decks/a.pdf', 'decks/b.pdf'), 'decks/b.pdf')
+        self.assertEqual(objects['media/decks/b.pdf'], b'remote bytes')
+
+        upload = storage.presigned_upload('uploads/direct/x.pdf', 12)
+        self.assertEqual(upload['method'], 'PUT')
+        self.assertTrue(upload['url'].startswith('https://decks.s3.example.com/media/uploads/direct/x.pdf'))
+
+    def test_local_presigned_upload_is_signed(self):
+        storage = ObjectStorage(FileSystemStorage())
+        upload = storage.presigned_upload('uploads/direct/x.pdf', 12)
+        token = upload['url'].rstrip('/').split('/')[-1]
+
+        self.assertEqual(storage.direct_upload_target(token), {'name': 'uploads/direct/x.pdf', 'size': 12})
+        with self.assertRaises(ValueError):
+            storage.direct_upload_target(token[:-2] + 'xx')
+
+
+class DirectUploadViewTests(TempMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('founder', password='pw')
+        self.service = ChunkedUploadService()
+        self.data = b'%PDF-1.4 deck'
+        self.upload = self.service.create(self.user, 'pitch_deck', 'deck.pdf', len(self.data), direct=True)
+        self.url = self.service.presigned_upload(self.upload)['url']
+        self.client = APIClient()
+
+    def put(self, data, url=None):
+        return self.client.put(url or self.url, data, content_type='application/octet-stream')
+
+    def test_put_then_complete(self):
+        self.assertEqual(self.put(self.data).status_code, 200)
+        upload = self.service.complete(self.upload)
+
+        self.assertEqual(upload.status, 'complete')
+        with self.service.open_file(upload) as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_wrong_size_is_refused(self):
+        self.assertEqual(self.put(self.data + b'!').status_code, 400)
+
+    def test_tampered_token_is_refused(self):
+        self.assertEqual(self.put(self.data, self.url.rstrip('/')[:-2] + 'xx/').status_code, 400)
+
+    def test_put_after_completion_is_refused(self):
+        self.put(self.data)
+        upload = self.service.complete(self.upload)
+
+        self.assertEqual(self.put(b'%PDF-1.4 evil').status_code, 400)
+        with self.service.open_file(upload) as f:
+            self.assertEqual(f.read(), self.data)
+
+
+@override_settings(CHUNKED_UPLOAD_MAX_CHUNK_SIZE=8)
+class ChunkedUploadTests(TempMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        ChunkedUploadService._running_digests.clear()
+        self.user = User.objects.create_user('founder', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = b'%PDF-1.4 twenty bytes'
+        response = self.client.post(
+            '/api/uploads/',
+            {'filename': 'deck.pdf', 'size': len(self.data), 'purpose': 'pitch_deck'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.url = response['Location']
+        self.upload_id = response.data['upload_id']
+
+    def patch(self, offset, data):
+        return self.client.generic(
+            'PATCH', self.url, data,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def send_all(self):
+        for offset in range(0, len(self.data), 8):
+            self.assertEqual(self.patch(offset, self.data[offset:offset + 8]).status_code, 204)
+
+    def complete(self):
+        return self.client.post(f'{self.url}complete/')
+
+    def test_chunks_resume_from_the_stored_offset(self):
+        self.assertEqual(self.patch(0, self.data[:8])['Upload-Offset'], '8')
+
+        # A retried or out-of-order chunk is refused with the current offset
+        for offset in (0, 16):
+            response = self.patch(offset, self.data[offset:offset + 8])
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response['Upload-Offset'], '8')
+
+        self.assertEqual(self.client.get(self.url).data['offset'], 8)
+        self.assertEqual(self.patch(8, self.data[8:]).status_code, 400)  # Larger than a chunk
+        self.assertEqual(self.complete().status_code, 409)
+
+        self.patch(8, self.data[8:16])
+        self.patch(16, self.data[16:])
+        self.assertEqual(self.patch(len(self.data), b'!').status_code, 400)  # Past the size
+
+        response = self.complete()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['sha256'], hashlib.sha256(self.data).hexdigest())
+
+    def test_lost_offset_race_keeps_the_winning_chunk(self):
+        service = ChunkedUploadService()
+        upload = service.create(self.user, 'pitch_deck', 'deck.pdf', 4)
+        stale = ChunkedUpload.objects.get(id=upload.id)
+
+        service.append(upload, 0, io.BytesIO(b'good'), 4)
+        # The loser read the row before the winner moved the offset
+        with mock.patch.object(ChunkedUpload.objects, 'get', return_value=stale):
+            with self.assertRaises(UploadOffsetConflict) as conflict:
+                service.append(stale, 0, io.BytesIO(b'evil'), 4)
+        self.assertEqual(conflict.exception.expected, 4)
+
+        upload = service.complete(ChunkedUpload.objects.get(id=upload.id))
+        self.assertEqual(len(FileSystemStorage().listdir(f'uploads/parts/{upload.id}')[1]), 1)
+        with service.open_file(upload) as f:
+            self.assertEqual(f.read(), b'good')
+
+    def test_chunks_are_hashed_as_they_arrive(self):
+        self.send_all()
+        with mock.patch.object(UploadPartsFile, 'readinto', side_effect=AssertionError):
+            response = self.complete()
+        self.assertEqual(response.data['sha256'], hashlib.sha256(self.data).hexdigest())
+
+    def test_chunks_received_elsewhere_are_hashed_on_completion(self):
+        self.send_all()
+        ChunkedUploadService._running_digests.clear()
+        self.assertEqual(self.complete().data['sha256'], hashlib.sha256(self.data).hexdigest())
+
+    def test_parts_read_back_as_one_file(self):
+        self.send_all()
+        self.complete()
+        service = ChunkedUploadService()
+        upload = service.get_completed(self.user, self.upload_id, 'pitch_deck')
+
+        with service.open_file(upload) as f:
+            self.assertEqual(f.read(), self.data)
+            f.seek(6)
+            self.assertEqual(f.read(5), self.data[6:11])
+            self.assertEqual(b''.join(f.chunks()), self.data)
+
+        service.discard(upload)
+        self.assertEqual(FileSystemStorage().listdir('uploads/parts'), ([], []))
+
+
+@override_settings(GROQ_API_KEY='x', OPENAI_API_KEY='x')
+class LLMRouterRankTests(TestCase):
+
+    def setUp(self):
+        self.router = LLMRouter(['groq', 'openai', 'local'])
+        self.groq, self.openai, self.local = self.router.providers
+
+    def measure(self, provider, latency):
+        stats = self.router.stats(provider, 'm')
+        for _ in range(stats.MIN_SAMPLES):
+            stats.record(latency, ok=True)
+
+    def names(self):
+        return [provider.name for provider in self.router.rank('m')]
+
+    def test_unmeasured_providers_keep_configured_order(self):
+        self.assertEqual(self.names(), ['groq', 'openai', 'local'])
+
+    def test_unmeasured_provider_is_explored_before_measured_ones(self):
+        self.measure(self.groq, 0.2)
+        self.measure(self.openai, 0.5)
+        self.assertEqual(self.names(), ['local', 'groq', 'openai'])
+
+        self.measure(self.local, 0.9)
+        self.assertEqual(self.names(), ['groq', 'openai', 'local'])
+
+    def test_failing_unmeasured_provider_drops_behind_the_prior(self):
+        self.measure(self.groq, 0.2)
+        self.measure(self.openai, 0.5)
+        stats = self.router.stats(self.local, 'm')
+        stats.samples.extend([(1.0, False), (1.0, True), (1.0, True), (1.0, True)])
+
+        self.assertEqual(self.names(), ['groq', 'local', 'openai'])
+
+
+class IncrementalJSONParserTests(TestCase):
+
+    def feed_by_char(self, text):
+        parser = IncrementalJSONParser()
+        steps = [parser.feed(char) for char in text]
+        return parser, steps
+
+    def test_object_fields_are_reported_as_they_close(self):
+        text = '```json\n{"score": 72, "summary": "Clear, {concise} \\"ask\\"", "tags": {"a": [1, 2]}}'
+        parser, steps = self.feed_by_char(text)
+
+        completed = [pair for step in steps for pair in step]
+        self.assertEqual(completed, [
+            ('score', 72), ('summary', 'Clear, {concise} "ask"'), ('tags', {'a': [1, 2]}),
+        ])
+        self.assertTrue(parser.done)
+        # "score" is reported at the comma after it, before the rest arrives
+        self.assertEqual(steps[text.index(', "summary"')], [('score', 72)])
+
+    def test_top_level_array_elements_are_reported_one_by_one(self):
+        parser = IncrementalJSONParser()
+        first = parser.feed('{"questions": [{"q": "Why now?"}, {"q": "Who')
+        rest = parser.feed(' else?"}], "count": 2}')
+
+        self.assertEqual(first, [(('questions', 0), {'q': 'Why now?'})])
+        self.assertEqual(rest, [
+            (('questions', 1), {'q': 'Who else?'}),
+            ('questions', [{'q': 'Why now?'}, {'q': 'Who else?'}]),
+            ('count', 2),
+        ])
+
+    def test_array_root_and_trailing_text(self):
+        parser = IncrementalJSONParser()
+        completed = parser.feed('[1, null, "x"] and then some prose {"ignored": true}')
+
+        self.assertEqual(completed, [(0, 1), (1, None), (2, 'x')])
+        self.assertTrue(parser.done)
+        self.assertEqual(parser.feed('{"more": 1}'), [])
+
+    def test_unparseable_values_are_skipped(self):
+        parser = IncrementalJSONParser()
+        self.assertEqual(parser.feed('{"a": nope, "b": 2}'), [('b', 2)])
+
+
+class RepairJSONTests(TestCase):
+
+    def test_parse_json_strips_fences_and_chatter(self):
+        text = 'Sure! ```json\n{"score": 80, "notes": ["a"]}\n``` Hope that helps.'
+        self.assertEqual(parse_json(text), {'score': 80, 'notes': ['a']})
+        self.assertEqual(parse_json('no json here'), {})
+        self.assertEqual(parse_json(None), {})
+
+    def test_open_strings_and_brackets_are_closed(self):
+        self.assertEqual(
+            repair_json('{"score": 80, "notes": ["clear ask", "weak mar'),
+            {'score': 80, 'notes': ['clear ask', 'weak mar']},
+        )
+        self.assertEqual(repair_json('{"a": {"b": [1, 2'), {'a': {'b': [1, 2]}})
+
+    def test_dangling_separators_and_escapes_are_dropped(self):
+        self.assertEqual(repair_json('{"score": 80,'), {'score': 80})
+        self.assertEqual(repair_json('{"score": 80, "summary":'), {'score': 80})
+        self.assertEqual(repair_json('{"quote": "say \\'), {'quote': 'say '})
+
+    def test_incomplete_trailing_member_is_dropped(self):
+        self.assertEqual(repair_json('{"score": 80, "strengths": tr'), {'score': 80})
+        self.assertEqual(repair_json('{"broken'), {})
+
+
+class FeedbackSchema(BaseModel):
+    score: Score
+    summary: str
+
+
+class StructuredOutputTests(TestCase):
+
+    def test_only_invalid_fields_are_reasked(self):
+        llm = mock.Mock()
+        llm.complete.side_effect = ['{"score": "140", "summary": ', '{"summary": "Tight pitch", "score": 3}']
+
+        result = StructuredOutput(llm).complete([{'role': 'user', 'content': 'Rate it'}], FeedbackSchema, 'm')
+
+        self.assertEqual((result.score, result.summary), (100, 'Tight pitch'))
+        self.assertIn('summary', llm.complete.call_args.kwargs['messages'][-1]['content'])
+
+    def test_fields_still_invalid_after_reasking_raise(self):
+        llm = mock.Mock()
+        llm.complete.side_effect = ['{"score": "high"}', '{}']
+
+        with self.assertRaises(StructuredOutputError) as raised:
+            StructuredOutput(llm).complete([], FeedbackSchema, 'm')
+        self.assertEqual(raised.exception.fields, ['score', 'summary'])
+
+
+class PromptCompressionTests(TestCase):
+
+    def setUp(self):
+        self.builder = PromptBuilder()
+
+    def test_normalize_drops_bullets_and_footers(self):
+        text = '• We grow 30% MoM\n  Page 3 of 12\nConfidential | Acme Inc\n3\nwww.acme.io\n- Team of 12'
+        self.assertEqual(self.builder.normalize(text, page_number=3), 'We grow 30% MoM\nTeam of 12')
+
+    def test_text_within_budget_is_only_normalized(self):
+        self.assertEqual(self.builder.compress('  Revenue is   $2M ARR.  ', 50), 'Revenue is $2M ARR.')
+
+    def test_compression_keeps_the_informative_sentences_in_order(self):
+        text = (
+            'Acme automates freight invoicing for mid-size carriers. '
+            'We think this is a really big deal. '
+            'Revenue grew from $200k to $1.2M ARR in 2024 with 140% net retention. '
+            'It is very nice. '
+            'Gross margin is 78%.'
+        )
+
+        compressed = self.builder.compress(text, 46)
+
+        self.assertLessEqual(count_tokens(compressed), 46)
+        self.assertIn('$1.2M ARR', compressed)
+        self.assertIn('78%', compressed)
+        self.assertNotIn('very nice', compressed)
+        self.assertLess(compressed.index('$1.2M'), compressed.index('78%'))
+        self.assertIn(ELLIPSIS, compressed)
+
+    def test_an_oversized_best_sentence_is_truncated(self):
+        compressed = self.builder.compress(' '.join(['market'] * 100) + ' $5B.', 10)
+        self.assertTrue(compressed.endswith(ELLIPSIS))
+        self.assertLessEqual(count_tokens(compressed), 10)
+
+    def test_compress_many_shares_the_budget_and_drops_repeated_footers(self):
+        slides = [
+            'Acme Inc — Seed 2025\nProblem: carriers lose 4% of revenue to invoice errors.',
+            'Acme Inc — Seed 2025\nSolution',
+            'Acme Inc — Seed 2025\n' + ' '.join(f'Carrier {i} saved ${i}k last quarter.' for i in range(40)),
+        ]
+
+        compressed = self.builder.compress_many(slides, 120)
+
+        self.assertFalse(any('Seed 2025' in slide for slide in compressed))
+        self.assertEqual(compressed[:2], ['Problem: carriers lose 4% of revenue to invoice errors.', 'Solution'])
+        self.assertLessEqual(sum(count_tokens(slide) for slide in compressed), 120)
+
+
+class ImportBudgetTests(TestCase):
+    """Runs check_import_budget the way CI would; wall-clock budgets are left loose here"""
+
+    def run_check(self, **options):
+        out = io.StringIO()
+        call_command('check_import_budget', stdout=out, **options)
+        return out.getvalue()
+
+    def test_web_startup_does_not_import_worker_only_packages(self):
+        self.assertIn('within budget', self.run_check(budget_ms=60000))
+
+    def test_worker_only_import_fails_the_check(self):
+        modules = ['apps.core.services.structured_output']
+        with mock.patch('apps.core.management.commands.check_import_budget.WEB_MODULES', modules):
+            with self.assertRaisesMessage(CommandError, 'pydantic'):
+                self.run_check(budget_ms=60000)
+
+    def test_over_budget_fails_the_check(self):
+        with self.assertRaisesMessage(CommandError, 'over the 1ms budget'):
+            self.run_check(budget_ms=1)
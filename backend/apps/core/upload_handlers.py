@@ -0,0 +1,70 @@
+"""
+Upload Handlers
+Django's upload handlers, extended to compute each file's SHA-256 while
+the request body is streamed in, so nothing has to read the file again
+"""
+import hashlib
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+def content_hash(uploaded_file):
+    """
+    SHA-256 of an uploaded file: the one computed during upload when the
+    hashing handlers are installed, otherwise read from the file's chunks.
+
+    Args:
+        uploaded_file: Django UploadedFile
+
+    Returns:
+        str: Hex digest
+    """
+    file_hash = getattr(uploaded_file, 'content_hash', None)
+    if file_hash:
+        return file_hash
+
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    uploaded_file.content_hash = digest.hexdigest()
+    return uploaded_file.content_hash
+
+
+class HashingMemoryFileUploadHandler(MemoryFileUploadHandler):
+    """In-memory uploads (small files), hashed chunk by chunk"""
+
+    def new_file(self, *args, **kwargs):
+        # Set up first: the in-memory handler raises StopFutureHandlers
+        # from new_file when it takes the file
+        self.digest = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # Files too large for memory pass through to the next handler,
+        # which hashes them instead
+        if self.activated:
+            self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.content_hash = self.digest.hexdigest()
+        return uploaded_file
+
+
+class HashingTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """Uploads streamed to a temporary file, hashed chunk by chunk"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        uploaded_file.content_hash = self.digest.hexdigest()
+        return uploaded_file
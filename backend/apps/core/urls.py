@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    # Resumable uploads
+    path('', views.create_upload, name='upload-create'),
+    path('<uuid:upload_id>/', views.upload_detail, name='upload-detail'),
+    path('<uuid:upload_id>/complete/', views.complete_upload, name='upload-complete'),
+    path('direct/<str:token>/', views.direct_upload, name='direct-upload'),
+]
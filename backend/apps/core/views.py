@@ -0,0 +1,172 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from .models import ChunkedUpload
+from .services.chunked_upload import ChunkedUploadService, UploadOffsetConflict, UploadStorageError
+
+TUS_VERSION = '1.0.0'
+
+
+def _upload_response(upload, data=None, status_code=status.HTTP_204_NO_CONTENT):
+    """Response carrying the upload's offset headers"""
+    response = Response(data, status=status_code)
+    response['Upload-Offset'] = str(upload.offset)
+    response['Upload-Length'] = str(upload.size)
+    response['Tus-Resumable'] = TUS_VERSION
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_upload(request):
+    """
+    Start a resumable upload.
+
+    Expected request (JSON):
+        - filename: Original file name (required)
+        - size:     Total size in bytes (required)
+        - purpose:  'pitch_deck' or 'practice_audio' (required)
+        - direct:   true to PUT the file straight to storage (optional)
+
+    Then PATCH the chunks to the returned location with an Upload-Offset
+    header (or PUT the whole file to direct_upload.url), and POST to
+    .../complete/ once every byte is sent.
+    """
+    try:
+        size = int(request.data.get('size', 0))
+    except (TypeError, ValueError):
+        size = 0
+
+    try:
+        upload = ChunkedUploadService().create(
+            owner=request.user,
+            purpose=request.data.get('purpose', ''),
+            filename=request.data.get('filename', ''),
+            size=size,
+            direct=request.data.get('direct') in (True, 'true', '1'),
+        )
+    except ValueError as e:
+        return Response(
+            {'error': 'Invalid upload', 'detail': str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    data = {
+        'upload_id': str(upload.id),
+        'offset': upload.offset,
+        'size': upload.size,
+        'max_chunk_size': settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE,
+        'expires_at': upload.expires_at,
+    }
+    if upload.direct:
+        data['direct_upload'] = ChunkedUploadService().presigned_upload(upload)
+
+    response = _upload_response(upload, data, status.HTTP_201_CREATED)
+    response['Location'] = reverse('core:upload-detail', args=[upload.id])
+    return response
+
+
+@api_view(['GET', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_detail(request, upload_id):
+    """
+    GET/HEAD: current offset, to resume after a dropped connection
+    PATCH:    append a chunk; body is the raw bytes, Upload-Offset says where they start
+    DELETE:   abandon the upload
+    """
+    upload = get_object_or_404(ChunkedUpload, id=upload_id, owner=request.user)
+    service = ChunkedUploadService()
+
+    if request.method == 'DELETE':
+        service.discard(upload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    if request.method == 'GET':
+        return _upload_response(upload, {
+            'upload_id': str(upload.id),
+            'offset': upload.offset,
+            'size': upload.size,
+            'status': upload.status,
+        }, status.HTTP_200_OK)
+
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+        length = int(request.headers.get('Content-Length', ''))
+    except ValueError:
+        return Response(
+            {'error': 'Upload-Offset and Content-Length headers are required'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        # Read the raw body stream: the chunk never sits in memory whole
+        upload.offset = service.append(upload, offset, request.stream, length)
+    except UploadOffsetConflict as e:
+        upload.offset = e.expected
+        return _upload_response(
+            upload, {'error': 'Offset mismatch', 'detail': str(e)}, status.HTTP_409_CONFLICT
+        )
+    except ValueError as e:
+        return _upload_response(
+            upload, {'error': 'Invalid chunk', 'detail': str(e)}, status.HTTP_400_BAD_REQUEST
+        )
+    except UploadStorageError as e:
+        # Offset unchanged: the client retries the same chunk
+        return _upload_response(
+            upload, {'error': 'Chunk not stored', 'detail': str(e)}, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    return _upload_response(upload)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def complete_upload(request, upload_id):
+    """
+    Finish an upload once every byte has been sent.
+
+    The returned upload_id can then be passed as 'upload_id' to the pitch
+    deck upload or practice audio endpoints instead of a multipart file.
+    """
+    upload = get_object_or_404(ChunkedUpload, id=upload_id, owner=request.user)
+
+    try:
+        upload = ChunkedUploadService().complete(upload)
+    except ValueError as e:
+        return _upload_response(
+            upload, {'error': 'Upload incomplete', 'detail': str(e)}, status.HTTP_409_CONFLICT
+        )
+
+    return _upload_response(upload, {
+        'upload_id': str(upload.id),
+        'filename': upload.filename,
+        'size': upload.size,
+        'sha256': upload.content_hash,
+        'purpose': upload.purpose,
+    }, status.HTTP_200_OK)
+
+
+@api_view(['PUT'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def direct_upload(request, token):
+    """
+    Local stand-in for a presigned object storage PUT, used when no bucket
+    is configured. The signed token decides where the body is stored; it
+    is refused once the upload is complete.
+    """
+    try:
+        length = int(request.headers.get('Content-Length', ''))
+        ChunkedUploadService().receive_direct(token, request.stream, length)
+    except ValueError as e:
+        return Response(
+            {'error': 'Invalid upload', 'detail': str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    return Response(status=status.HTTP_200_OK)
@@ -20,6 +20,7 @@ class PitchDeckAdmin(admin.ModelAdmin):
         'id',
         'slug',
         'file_size',
+        'content_hash',
         'uploaded_at',
         'updated_at',
         'analyzed_at',
@@ -30,7 +31,7 @@ class PitchDeckAdmin(admin.ModelAdmin):
             'fields': ('id', 'owner', 'title', 'slug')
         }),
         ('File Info', {
-            'fields': ('uploaded_file', 'file_type', 'file_size')
+            'fields': ('uploaded_file', 'file_type', 'file_size', 'content_hash')
         }),
         ('Status', {
             'fields': ('status', 'total_slides', 'analyzed', 'analyzed_at')
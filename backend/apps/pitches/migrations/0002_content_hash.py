@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:09
+
+import apps.pitches.models
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pitches', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pitchdeck',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='pitchdeck',
+            name='uploaded_file',
+            field=models.FileField(max_length=500, upload_to=apps.pitches.models.pitch_deck_upload_path, validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'pptx', 'ppt'])]),
+        ),
+    ]
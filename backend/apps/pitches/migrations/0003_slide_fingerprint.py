@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pitches', '0002_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slide',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
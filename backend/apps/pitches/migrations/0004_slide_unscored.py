@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pitches', '0003_slide_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='slide',
+            name='quality_score',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -1,9 +1,24 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.text import slugify
+import secrets
 import uuid
 
+# Retries when a freshly allocated slug collides under concurrency
+SLUG_ALLOCATION_ATTEMPTS = 5
+
+
+def pitch_deck_upload_path(instance, filename):
+    """One stored blob per content hash; unhashed files are organized by date"""
+    extension = filename.split('.')[-1].lower()
+    if instance.content_hash:
+        return f"pitch_decks/blobs/{instance.content_hash[:2]}/{instance.content_hash}.{extension}"
+    return timezone.now().strftime('pitch_decks/%Y/%m/%d/') + filename
+
 
 class PitchDeck(models.Model):
     """Main pitch deck uploaded by user"""
@@ -25,12 +40,13 @@ class PitchDeck(models.Model):
     
     # File Storage
     uploaded_file = models.FileField(
-        upload_to='pitch_decks/%Y/%m/%d/',  # Organized by date
+        upload_to=pitch_deck_upload_path,  # Deduplicated by content hash
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'pptx', 'ppt'])],
         max_length=500
     )
     file_type = models.CharField(max_length=10)
     file_size = models.BigIntegerField(default=0)  # Store file size in bytes
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of the file
     
     # Status & Metadata
     STATUS_CHOICES = [
@@ -62,15 +78,34 @@ class PitchDeck(models.Model):
     
     def save(self, *args, **kwargs):
         """Auto-generate slug on save"""
-        if not self.slug:
-            base_slug = slugify(self.title)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        
+        base_slug = slugify(self.title)[:240] or 'pitch-deck'
+        
+        # One probe for the plain slug; taken titles get a short random suffix
+        # instead of walking -1, -2, ... so the cost doesn't grow with popularity
+        if PitchDeck.objects.filter(slug=base_slug).exists():
+            slug = self._random_slug(base_slug)
+        else:
             slug = base_slug
-            counter = 1
-            while PitchDeck.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
+        
+        for attempt in range(SLUG_ALLOCATION_ATTEMPTS):
             self.slug = slug
-        super().save(*args, **kwargs)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError as e:
+                # Another upload claimed the same slug between probe and insert
+                if 'slug' not in str(e) or attempt == SLUG_ALLOCATION_ATTEMPTS - 1:
+                    self.slug = ''
+                    raise
+                slug = self._random_slug(base_slug)
+    
+    @staticmethod
+    def _random_slug(base_slug):
+        """Slug with a short random suffix, e.g. seed-round-3f9a1c"""
+        return f"{base_slug}-{secrets.token_hex(3)}"
     
     @property
     def file_size_mb(self):
@@ -81,6 +116,11 @@ class PitchDeck(models.Model):
     def is_processed(self):
         """Check if deck has been fully processed"""
         return self.status == 'completed' and self.analyzed
+    
+    @property
+    def cache_namespace(self):
+        """Response cache namespace shared by all views of this deck"""
+        return f"pitch_deck:{self.id}"
 
 
 class Slide(models.Model):
@@ -102,6 +142,7 @@ class Slide(models.Model):
     text_content = models.TextField(blank=True)
     has_images = models.BooleanField(default=False)
     has_charts = models.BooleanField(default=False)
+    fingerprint = models.CharField(max_length=64, blank=True, db_index=True)  # Content hash, see FileProcessor
     
     # AI Analysis
     SLIDE_TYPES = [
@@ -119,6 +160,7 @@ class Slide(models.Model):
         ('other', 'Other'),
     ]
     slide_type = models.CharField(max_length=50, choices=SLIDE_TYPES, blank=True, db_index=True)
+    KEY_SLIDE_TYPES = ('problem', 'solution', 'market', 'ask')
     
     # JSON Fields for flexibility
     strengths = models.JSONField(default=list, blank=True)
@@ -131,7 +173,7 @@ class Slide(models.Model):
     estimated_speaking_time = models.IntegerField(default=0)  # seconds
     
     # Quality Score
-    quality_score = models.FloatField(default=0, db_index=True)  # 0-100
+    quality_score = models.FloatField(null=True, blank=True, db_index=True)  # 0-100, null when unscored
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -153,4 +195,15 @@ class Slide(models.Model):
     @property
     def is_key_slide(self):
         """Identify critical slides"""
-        return self.slide_type in ['problem', 'solution', 'market', 'ask']
\ No newline at end of file
+        return self.slide_type in self.KEY_SLIDE_TYPES
+
+
+# Deck files are shared by content hash: delete one only when its last deck goes
+@receiver(post_delete, sender=PitchDeck)
+def delete_unused_deck_file(sender, instance, **kwargs):
+    """Delete the deck's stored file once no other deck references it"""
+    name = instance.uploaded_file.name
+    if not name:
+        return
+    from .services.deck_dedup import DeckDeduplicator
+    transaction.on_commit(lambda: DeckDeduplicator().delete_unused_blob(name, instance.content_hash))
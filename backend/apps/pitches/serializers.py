@@ -1,5 +1,9 @@
+from django.db import transaction
+from django.urls import reverse
 from rest_framework import serializers
-from .models import PitchDeck, Slide
+from apps.core.upload_handlers import content_hash
+from .models import PitchDeck, Slide, pitch_deck_upload_path
+from .services.deck_dedup import DeckDeduplicator
 
 
 class SlideSerializer(serializers.ModelSerializer):
@@ -38,6 +42,8 @@ class SlideSerializer(serializers.ModelSerializer):
 class SlideListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for listing slides"""
     
+    thumbnail_url = serializers.SerializerMethodField()
+    
     class Meta:
         model = Slide
         fields = [
@@ -46,7 +52,11 @@ class SlideListSerializer(serializers.ModelSerializer):
             'slide_type',
             'quality_score',
             'has_images',
+            'thumbnail_url',
         ]
+    
+    def get_thumbnail_url(self, obj):
+        return reverse('pitches:slide-thumbnail', args=[obj.pitch_deck_id, obj.slide_number])
 
 
 class PitchDeckSerializer(serializers.ModelSerializer):
@@ -56,6 +66,7 @@ class PitchDeckSerializer(serializers.ModelSerializer):
     slides = SlideListSerializer(many=True, read_only=True)
     file_size_mb = serializers.ReadOnlyField()
     is_processed = serializers.ReadOnlyField()
+    uploaded_file = serializers.SerializerMethodField()
     
     class Meta:
         model = PitchDeck
@@ -91,6 +102,11 @@ class PitchDeckSerializer(serializers.ModelSerializer):
             'updated_at',
             'analyzed_at',
         ]
+    
+    def get_uploaded_file(self, obj):
+        # A stable API URL: the signed storage URL it redirects to expires,
+        # and this payload sits in the response cache for much longer
+        return reverse('pitches:file', args=[obj.id])
 
 
 class PitchDeckListSerializer(serializers.ModelSerializer):
@@ -149,13 +165,26 @@ class PitchDeckUploadSerializer(serializers.ModelSerializer):
         file_extension = uploaded_file.name.split('.')[-1].lower()
         file_size = uploaded_file.size
         
-        pitch_deck = PitchDeck.objects.create(
+        pitch_deck = PitchDeck(
             owner=self.context['request'].user,
             title=validated_data['title'],
-            uploaded_file=uploaded_file,
             file_type=file_extension,
             file_size=file_size,
+            content_hash=content_hash(uploaded_file),  # Computed while the upload streamed in
             status='pending',
         )
         
+        # Identical bytes are stored once: reuse the blob of a deck with the
+        # same hash (locked, so its deletion can't remove the blob meanwhile)
+        blob_name = pitch_deck_upload_path(pitch_deck, uploaded_file.name)
+        if pitch_deck.content_hash:
+            with transaction.atomic():
+                if DeckDeduplicator().stored_blob(blob_name, pitch_deck.content_hash):
+                    pitch_deck.uploaded_file.name = blob_name
+                    pitch_deck.save()
+                    return pitch_deck
+        
+        pitch_deck.uploaded_file = uploaded_file
+        pitch_deck.save()
+        
         return pitch_deck
\ No newline at end of file
@@ -1,195 +1,282 @@
 """
 AI Analyzer Service
-Uses Groq (Llama 3.3 70B) to analyze pitch deck slides
-Fast inference, no rate limit headaches like Gemini free tier
+Uses Groq to analyze pitch deck slides in two tiers: a small, fast model
+types and scores every slide of a deck in one call, and Llama 3.3 70B
+writes the coaching
 """
-import os
-import json
 import logging
-import time
-from django.conf import settings
+from typing import Annotated, Literal
+from pydantic import BaseModel
+from apps.core.services.llm_client import LLMClient
+from apps.core.services.prompt_builder import PromptBuilder, system_prompt
+from apps.core.services.structured_output import Choice, NonNegative, Score, StructuredOutput, ValidItems
 
 logger = logging.getLogger(__name__)
 
+SlideType = Literal[
+    'title', 'problem', 'solution', 'product', 'market', 'business_model',
+    'traction', 'competition', 'team', 'financials', 'ask', 'other',
+]
+
+
+class SlideCoaching(BaseModel):
+    """Schema of the coaching report for an already classified slide"""
+    strengths: list[str]
+    weaknesses: list[str]
+    suggestions: str
+    coaching_script: str
+    key_points: list[str]
+    estimated_speaking_time: NonNegative
+
+
+class SlideAnalysis(SlideCoaching):
+    """Schema of the full slide report (type, score and coaching)"""
+    slide_type: Annotated[SlideType, Choice]
+    quality_score: Score
+
+
+class SlideClassification(BaseModel):
+    """Schema of one slide's type and first-impression score"""
+    number: int
+    slide_type: Annotated[SlideType, Choice]
+    quality_score: Score
+
+
+class SlideClassifications(BaseModel):
+    """Schema of the deck classification response"""
+    slides: Annotated[list[SlideClassification], ValidItems(SlideClassification)]
+
 
 class AIAnalyzer:
-    """Analyze pitch deck slides using Groq"""
+    """
+    Analyze pitch deck slides using Groq.
+
+    Shared per worker process via get_service: everything a deck needs
+    (slides, progress channel) is passed in, never kept on the instance.
+    """
 
     MODEL = "llama-3.3-70b-versatile"
 
+    # Small model for slide typing and obvious quality signals
+    CLASSIFIER_MODEL = "llama-3.1-8b-instant"
+
+    # Token budget for a slide's text inside the prompt
+    SLIDE_TEXT_TOKENS = 180
+    CLASSIFIER_TEXT_TOKENS = 80
+
+    # Slides typed per classifier call
+    CLASSIFIER_BATCH_SIZE = 20
+
+    SYSTEM_ROLE = "You are an expert pitch coach analyzing startup pitch deck slides."
+    OUTPUT_FORMAT = (
+        '{"slide_type": str, "quality_score": int, "strengths": [str], "weaknesses": [str], '
+        '"suggestions": str, "coaching_script": str, "key_points": [str], "estimated_speaking_time": int}'
+    )
+    COACHING_FORMAT = (
+        '{"strengths": [str], "weaknesses": [str], "suggestions": str, '
+        '"coaching_script": str, "key_points": [str], "estimated_speaking_time": int}'
+    )
+    RULES = (
+        "slide_type must be one of: title, problem, solution, product, market, business_model, "
+        "traction, competition, team, financials, ask, other",
+        "quality_score is 0-100",
+        "estimated_speaking_time is in seconds",
+        "strengths and weaknesses are lists of 2-3 short strings",
+        "coaching_script is what the founder should say, in the first person",
+    )
+
+    CLASSIFIER_ROLE = "You classify startup pitch deck slides and give each a first-impression score."
+    CLASSIFIER_FORMAT = '{"slides": [{"number": int, "slide_type": str, "quality_score": int}]}'
+    CLASSIFIER_RULES = (
+        "One entry per slide, with the slide's number",
+        "slide_type must be one of: title, problem, solution, product, market, business_model, "
+        "traction, competition, team, financials, ask, other",
+        "quality_score is 0-100: one clear message, readable amount of text, supporting visuals",
+    )
+
+    # Fields published to the progress channel as soon as they stream in
+    PREVIEW_FIELDS = ('slide_type', 'quality_score')
+
     def __init__(self):
-        try:
-            from groq import Groq
-            api_key = getattr(settings, 'GROQ_API_KEY', None) or os.getenv('GROQ_API_KEY')
-            if not api_key:
-                raise ValueError("GROQ_API_KEY is not set in settings or .env")
-            self.client = Groq(api_key=api_key)
-        except ImportError:
-            raise ImportError(
-                "groq package is required. Install with: pip install groq"
-            )
+        self.llm = LLMClient()
+        self.structured = StructuredOutput(self.llm)
+        self.prompt_builder = PromptBuilder()
 
-    def analyze_slide(self, slide_number, text_content, has_images=False, has_charts=False):
+    def classify_slides(self, slides_data, progress=None, total_slides=None):
         """
-        Analyze a single slide with Groq AI.
+        Type and score every slide with the small model, batching the deck
+        into as few calls as possible.
 
         Args:
-            slide_number (int):   Slide number
-            text_content (str):   Text extracted from slide
-            has_images (bool):    Whether slide has images
-            has_charts (bool):    Whether slide has charts
+            slides_data (list): Slide dicts from FileProcessor
+            progress:           Optional ProgressChannel; each classification is
+                                published as soon as it streams in
+            total_slides (int): Deck length, when only some slides are classified
 
         Returns:
-            dict: Analysis results
+            dict: {slide number: {'slide_type': ..., 'quality_score': ...}};
+                  slides the model skipped are left out
         """
-        prompt = self._build_slide_analysis_prompt(
-            slide_number, text_content, has_images, has_charts
-        )
-
-        max_retries = 3
-        for attempt in range(max_retries):
+        classifications = {}
+
+        on_value = None
+        if progress is not None:
+            def on_value(key, value):
+                # Elements of "slides" arrive as (("slides", index), value)
+                if not isinstance(key, tuple):
+                    return
+                try:
+                    item = SlideClassification.model_validate(value)
+                except Exception:
+                    return
+                progress.merge('slides', item.number, {
+                    'slide_type': item.slide_type,
+                    'quality_score': item.quality_score,
+                })
+
+        for start in range(0, len(slides_data), self.CLASSIFIER_BATCH_SIZE):
+            batch = slides_data[start:start + self.CLASSIFIER_BATCH_SIZE]
+            label = f"classification of slides {batch[0]['number']}-{batch[-1]['number']}"
             try:
-                logger.info(
-                    f"Analyzing slide {slide_number} with Groq "
-                    f"(attempt {attempt + 1}/{max_retries})"
-                )
-
-                response = self.client.chat.completions.create(
-                    model=self.MODEL,
+                result = self.structured.complete(
                     messages=[
                         {
                             "role": "system",
-                            "content": (
-                                "You are an expert pitch coach. "
-                                "Always respond with valid JSON only — "
-                                "no markdown, no code fences, no extra text."
+                            "content": system_prompt(
+                                self.CLASSIFIER_ROLE, self.CLASSIFIER_FORMAT, self.CLASSIFIER_RULES
                             ),
                         },
                         {
                             "role": "user",
-                            "content": prompt,
+                            "content": self._build_classification_prompt(batch, total_slides or len(slides_data)),
                         },
                     ],
-                    temperature=0.7,
-                    max_tokens=800,
+                    schema=SlideClassifications,
+                    model=self.CLASSIFIER_MODEL,
+                    temperature=0.2,
+                    max_tokens=40 * len(batch) + 100,
+                    on_value=on_value,
+                    label=label,
                 )
+            except Exception as e:
+                # Unclassified slides fall back to the full analysis
+                logger.error(f"❌ Error on {label}: {str(e)}")
+                continue
+
+            numbers = {slide['number'] for slide in batch}
+            for item in result.slides:
+                if item.number in numbers:
+                    classifications[item.number] = {
+                        'slide_type': item.slide_type,
+                        'quality_score': item.quality_score,
+                    }
+
+        logger.info(f"✅ Classified {len(classifications)}/{len(slides_data)} slides")
+        return classifications
+
+    def analyze_slide(self, slide_number, text_content, has_images=False, has_charts=False,
+                      classification=None, model=None, progress=None, layout=None):
+        """
+        Analyze a single slide with Groq AI.
 
-                response_text = response.choices[0].message.content
-                analysis = self._parse_analysis_response(response_text)
+        With a classification from classify_slides, only the coaching is
+        generated; otherwise the model also types and scores the slide.
 
-                logger.info(f"✅ Slide {slide_number} analyzed successfully")
-                return analysis
+        Args:
+            slide_number (int):    Slide number
+            text_content (str):    Text extracted from slide
+            has_images (bool):     Whether slide has images
+            has_charts (bool):     Whether slide has charts
+            classification (dict): Optional slide_type and quality_score
+            model (str):           Coaching model (defaults to MODEL)
+            progress:              Optional ProgressChannel; the response is then
+                                   streamed and preview fields published early
+            layout (dict):         Optional PDF layout signals (see PdfLayoutAnalyzer)
 
-            except Exception as e:
-                error_str = str(e)
+        Returns:
+            dict: Analysis results
 
-                # Handle rate limit (Groq is generous but just in case)
-                if '429' in error_str or 'rate' in error_str.lower():
-                    wait_time = 10 * (attempt + 1)
-                    logger.warning(
-                        f"⏳ Rate limit on slide {slide_number}, "
-                        f"waiting {wait_time}s..."
-                    )
-                    time.sleep(wait_time)
-                    continue
+        Raises:
+            StructuredOutputError: If the model's output stays invalid
+        """
+        prompt = self._build_slide_analysis_prompt(
+            slide_number, text_content, has_images, has_charts, classification, layout
+        )
+        schema = SlideCoaching if classification else SlideAnalysis
+        output_format = self.COACHING_FORMAT if classification else self.OUTPUT_FORMAT
+
+        # Classified slides already published their preview fields
+        on_value = None
+        if progress is not None and not classification:
+            def on_value(field, value):
+                if field in self.PREVIEW_FIELDS:
+                    progress.merge('slides', slide_number, {field: value})
+
+        logger.info(f"Analyzing slide {slide_number} with Groq")
+
+        result = self.structured.complete(
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt(self.SYSTEM_ROLE, output_format, self.RULES),
+                },
+                {
+                    "role": "user",
+                    "content": prompt,
+                },
+            ],
+            schema=schema,
+            model=model or self.MODEL,
+            temperature=0.7,
+            max_tokens=800,
+            on_value=on_value,
+            label=f"slide {slide_number}",
+        )
+        analysis = {**(classification or {}), **result.model_dump()}
+
+        logger.info(f"✅ Slide {slide_number} analyzed successfully")
+        return analysis
+
+    def _build_classification_prompt(self, slides_data, total_slides):
+        """One compact line per slide for the classifier"""
+        lines = []
+        for slide in slides_data:
+            content = self.prompt_builder.compress(
+                slide['text'], self.CLASSIFIER_TEXT_TOKENS, page_number=slide['number']
+            ) or "[No text content]"
+            lines.append(
+                f"Slide {slide['number']}/{total_slides} "
+                f"(words: {slide.get('word_count', 0)}, "
+                f"images: {'yes' if slide.get('has_images') else 'no'}, "
+                f"charts: {'yes' if slide.get('has_charts') else 'no'}): {content}"
+            )
 
-                logger.error(f"❌ Error on slide {slide_number}: {error_str}")
-                return self._get_default_analysis()
+        slides_text = "\n".join(lines)
 
-        logger.error(f"❌ All retries exhausted for slide {slide_number}. Using default.")
-        return self._get_default_analysis()
+        return f"""Classify these slides.
 
-    def _build_slide_analysis_prompt(self, slide_number, text_content, has_images, has_charts):
+{slides_text}"""
+
+    def _build_slide_analysis_prompt(self, slide_number, text_content, has_images, has_charts,
+                                     classification=None, layout=None):
         """Build the analysis prompt"""
 
-        # Limit content to avoid token waste
-        content = text_content[:500] if text_content else "[No text content]"
+        # Keep the most informative sentences within the token budget
+        content = self.prompt_builder.compress(
+            text_content, self.SLIDE_TEXT_TOKENS, page_number=slide_number
+        ) or "[No text content]"
+
+        slide_type = f" ({classification['slide_type']} slide)" if classification else ""
 
-        prompt = f"""Analyze this startup pitch deck slide and return a JSON coaching report.
+        prompt = f"""Analyze this slide and return the JSON coaching report.
 
-Slide #{slide_number}
+Slide #{slide_number}{slide_type}
 Content: {content}
 Has images: {"Yes" if has_images else "No"}
-Has charts: {"Yes" if has_charts else "No"}
-
-Return ONLY this exact JSON, nothing else:
-{{
-  "slide_type": "problem",
-  "quality_score": 75,
-  "strengths": ["Clear problem statement", "Uses concrete examples"],
-  "weaknesses": ["Too much text", "No visual elements"],
-  "suggestions": "Reduce text by 50% and add a visual representation of the problem.",
-  "coaching_script": "The problem we are solving is...",
-  "key_points": ["State the problem clearly", "Show market impact", "Connect to customer pain"],
-  "estimated_speaking_time": 45
-}}
-
-Rules:
-- slide_type must be one of: title, problem, solution, product, market, business_model, traction, competition, team, financials, ask, other
-- quality_score is 0-100
-- estimated_speaking_time is in seconds
-- strengths and weaknesses are lists of 2-3 short strings
-- Return ONLY valid JSON, no other text"""
+Has charts: {"Yes" if has_charts else "No"}"""
 
-        return prompt
+        if layout:
+            title = "clear title" if layout['has_title'] else "no distinct title"
+            prompt += f"\nLayout: {title}, {layout['text_blocks']} text block(s)"
 
-    def _parse_analysis_response(self, response_text):
-        """Parse Groq JSON response"""
-        try:
-            text = response_text.strip()
-
-            # Strip accidental markdown fences
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-                text = text.strip()
-
-            analysis = json.loads(text)
-
-            # Ensure all required fields exist
-            required_fields = [
-                'slide_type', 'quality_score', 'strengths', 'weaknesses',
-                'suggestions', 'coaching_script', 'key_points', 'estimated_speaking_time'
-            ]
-            for field in required_fields:
-                if field not in analysis:
-                    logger.warning(f"Missing field in analysis: {field}")
-                    analysis[field] = self._get_default_value(field)
-
-            # Clamp quality_score to 0-100
-            analysis['quality_score'] = max(0, min(100, int(analysis['quality_score'])))
-
-            return analysis
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON from Groq: {str(e)}")
-            logger.debug(f"Raw response: {response_text}")
-            return self._get_default_analysis()
-
-    def _get_default_value(self, field):
-        """Default value for a single missing field"""
-        defaults = {
-            'slide_type': 'other',
-            'quality_score': 70,
-            'strengths': ['Content is present'],
-            'weaknesses': ['Needs improvement'],
-            'suggestions': 'Review and refine this slide for clarity and impact.',
-            'coaching_script': 'Present this slide with confidence and clarity.',
-            'key_points': ['Main point 1', 'Main point 2'],
-            'estimated_speaking_time': 30,
-        }
-        return defaults.get(field, '')
-
-    def _get_default_analysis(self):
-        """Full default analysis when Groq call fails"""
-        return {
-            'slide_type': 'other',
-            'quality_score': 70,
-            'strengths': ['Slide content is present'],
-            'weaknesses': ['Automated analysis unavailable'],
-            'suggestions': 'Please review this slide manually for improvements.',
-            'coaching_script': 'Present the key points from this slide clearly and confidently.',
-            'key_points': ['Review slide content', 'Identify main message', 'Practice delivery'],
-            'estimated_speaking_time': 30,
-        }
\ No newline at end of file
+        return prompt
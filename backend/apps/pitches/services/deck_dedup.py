@@ -0,0 +1,195 @@
+"""
+Deck Deduplication Service
+Reuses the analysis of a previously uploaded deck with identical bytes,
+or of individual unchanged slides from the owner's earlier decks
+"""
+import logging
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from ..models import PitchDeck, Slide
+
+logger = logging.getLogger(__name__)
+
+class DeckDeduplicator:
+    """Clone Slide rows from completed analyses of the same content"""
+
+    # Slide analysis fields, reused when a slide's content is unchanged
+    ANALYSIS_FIELDS = (
+        'slide_type',
+        'strengths',
+        'weaknesses',
+        'suggestions',
+        'suggested_script',
+        'key_points',
+        'estimated_speaking_time',
+        'quality_score',
+    )
+
+    # Slide fields produced by extraction and analysis
+    CLONED_FIELDS = (
+        'slide_number',
+        'text_content',
+        'has_images',
+        'has_charts',
+        'fingerprint',
+    ) + ANALYSIS_FIELDS
+
+    def find_analyzed_copy(self, pitch_deck):
+        """
+        Most recent completed deck stored in the same blob as this one.
+
+        Sharing the blob (not just the hash) means the earlier analysis was
+        made from exactly these bytes.
+
+        Args:
+            pitch_deck (PitchDeck): Newly uploaded deck
+
+        Returns:
+            PitchDeck or None
+        """
+        if not pitch_deck.content_hash or not pitch_deck.uploaded_file:
+            return None
+
+        return (
+            PitchDeck.objects
+            .filter(
+                content_hash=pitch_deck.content_hash,
+                uploaded_file=pitch_deck.uploaded_file.name,
+                status='completed',
+                analyzed=True,
+            )
+            .exclude(id=pitch_deck.id)
+            # Slides left unscored by a failed analysis get analyzed again
+            .exclude(slides__quality_score__isnull=True)
+            .order_by('-analyzed_at')
+            .first()
+        )
+
+    def stored_blob(self, name, file_hash):
+        """
+        Lock a deck already stored in the blob, so the blob can be shared
+        without being deleted before the caller's deck is saved. The hash
+        recorded for that deck was computed from its bytes when they were
+        stored, so the blob is trusted without reading it again.
+
+        Call inside transaction.atomic().
+
+        Args:
+            name (str):      Storage name of the blob
+            file_hash (str): SHA-256 of the new upload
+
+        Returns:
+            PitchDeck or None: A deck stored in the blob with that hash
+        """
+        return (
+            PitchDeck.objects
+            .select_for_update()
+            .filter(content_hash=file_hash, uploaded_file=name)
+            .only('id')
+            .first()
+        )
+
+    def delete_unused_blob(self, name, file_hash=''):
+        """
+        Delete a stored deck file once no deck references it.
+
+        Args:
+            name (str):      Storage name of the file
+            file_hash (str): Its SHA-256, narrowing the lookup (optional)
+        """
+        decks = PitchDeck.objects.filter(uploaded_file=name)
+        if file_hash:
+            decks = decks.filter(content_hash=file_hash)
+        if decks.exists():
+            return
+
+        default_storage.delete(name)
+        logger.info(f"Deleted unused deck file {name}")
+
+    def clone_analysis(self, pitch_deck):
+        """
+        Copy the slides of an identical, already analyzed deck.
+
+        Args:
+            pitch_deck (PitchDeck): Deck without slides yet
+
+        Returns:
+            bool: True if the analysis was reused
+        """
+        source = self.find_analyzed_copy(pitch_deck)
+        if source is None:
+            return False
+
+        slides = [
+            Slide(pitch_deck=pitch_deck, **{field: getattr(slide, field) for field in self.CLONED_FIELDS})
+            for slide in source.slides.all()
+        ]
+        if not slides:
+            return False
+
+        with transaction.atomic():
+            Slide.objects.bulk_create(slides, ignore_conflicts=True)
+            pitch_deck.total_slides = len(slides)
+            pitch_deck.analyzed = True
+            pitch_deck.status = 'completed'
+            pitch_deck.analyzed_at = timezone.now()
+            pitch_deck.save(update_fields=['total_slides', 'analyzed', 'status', 'analyzed_at', 'updated_at'])
+
+        logger.info(f"✅ Reused analysis of {source.id} for {pitch_deck.id} ({len(slides)} slides)")
+        return True
+
+    def previous_slide_analyses(self, pitch_deck, slides_data):
+        """
+        Latest analysis of each unchanged slide from the owner's completed decks.
+
+        Args:
+            pitch_deck (PitchDeck): Deck being analyzed
+            slides_data (list):     Slide dicts from FileProcessor (with fingerprints)
+
+        Returns:
+            dict: {fingerprint: Slide}
+        """
+        fingerprints = {slide['fingerprint'] for slide in slides_data if slide.get('fingerprint')}
+        if not fingerprints:
+            return {}
+
+        previous = (
+            Slide.objects
+            .filter(
+                fingerprint__in=fingerprints,
+                pitch_deck__owner_id=pitch_deck.owner_id,
+                pitch_deck__status='completed',
+                quality_score__isnull=False,
+            )
+            .exclude(pitch_deck_id=pitch_deck.id)
+            .order_by('-pitch_deck__analyzed_at')
+            .only('fingerprint', *self.ANALYSIS_FIELDS)
+        )
+
+        analyses = {}
+        for slide in previous:
+            analyses.setdefault(slide.fingerprint, slide)
+        return analyses
+
+    def reuse_slide_analysis(self, pitch_deck, slide_data, previous):
+        """
+        Slide row for an unchanged slide, with the previous analysis copied over.
+
+        Args:
+            pitch_deck (PitchDeck): Deck being analyzed
+            slide_data (dict):      Extracted slide
+            previous (Slide):       Earlier analysis with the same fingerprint
+
+        Returns:
+            Slide: Unsaved slide
+        """
+        return Slide(
+            pitch_deck=pitch_deck,
+            slide_number=slide_data['number'],
+            text_content=slide_data['text'],
+            has_images=slide_data['has_images'],
+            has_charts=slide_data.get('has_charts', False),
+            fingerprint=slide_data['fingerprint'],
+            **{field: getattr(previous, field) for field in self.ANALYSIS_FIELDS},
+        )
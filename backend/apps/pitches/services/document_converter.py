@@ -0,0 +1,362 @@
+"""
+Document Converter Service
+Converts legacy and PowerPoint decks with LibreOffice: a pool of warm,
+pre-started headless instances (via unoserver) each with its own profile,
+job queue and timeout, and converted files cached by content hash.
+Every LibreOffice process runs under memory (and, when one-off, CPU) limits
+"""
+import os
+import atexit
+import queue
+import shutil
+import signal
+import socket
+import logging
+import tempfile
+import threading
+import subprocess
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from apps.core.services.storage import ObjectStorage
+
+logger = logging.getLogger(__name__)
+
+CONVERSION_DIR = 'conversions'
+
+
+class ConversionError(Exception):
+    """A document could not be converted"""
+
+
+class PoolStopped(ConversionError):
+    """The pool was stopped before a conversion could run on it"""
+
+
+def _free_port():
+    """A TCP port nothing is listening on right now"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _with_limits(command, cpu_seconds=None):
+    """
+    Run a LibreOffice command under a shell that caps its address space
+    (and CPU time) first, so a malicious or pathological deck can't exhaust
+    the worker's host. The limits are set before exec, with no Python code
+    running in the child (preexec_fn isn't safe in threaded workers), and
+    carry over to the soffice process unoserver starts.
+    """
+    limits = []
+    if settings.LIBREOFFICE_MEMORY_LIMIT_MB > 0:
+        limits.append(f"ulimit -v {settings.LIBREOFFICE_MEMORY_LIMIT_MB * 1024}")
+    if cpu_seconds:
+        limits.append(f"ulimit -t {int(cpu_seconds)}")
+    if not limits:
+        return command
+    return ['/bin/sh', '-c', ' && '.join(limits) + ' && exec "$@"', 'libreoffice', *command]
+
+
+def _kill_session(process):
+    """Kill a process started with start_new_session and everything it spawned"""
+    if process is None or process.poll() is not None:
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    process.wait()
+
+
+class LibreOfficeInstance:
+    """
+    One headless LibreOffice behind unoserver, with a throwaway user profile
+    and a thread working through its own job queue. Each conversion is timed
+    from when the thread picks it up, not from when it was queued; an
+    instance that times out or dies is killed and restarted on its next job.
+    """
+
+    # Seconds to wait for a fresh instance to accept connections
+    START_TIMEOUT = 60
+
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.port = None
+        self.profile_dir = None
+        self.closed = False
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(
+            target=self._work, name=f"libreoffice-{index}", daemon=True
+        )
+        self.thread.start()
+
+    def start(self):
+        """Launch the server and wait until it accepts conversions"""
+        try:
+            import unoserver  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "unoserver package is required. Install with: pip install unoserver"
+            )
+
+        self.stop()
+        self.port = _free_port()
+        self.profile_dir = tempfile.mkdtemp(prefix=f"libreoffice-{self.index}-")
+        self.process = subprocess.Popen(
+            _with_limits([
+                settings.UNOSERVER_BINARY,
+                '--interface', '127.0.0.1',
+                '--port', str(self.port),
+                '--uno-port', str(_free_port()),
+                '--executable', shutil.which(settings.LIBREOFFICE_BINARY) or settings.LIBREOFFICE_BINARY,
+                '--user-installation', Path(self.profile_dir).as_uri(),
+            ]),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise ConversionError(f"LibreOffice instance {self.index} exited on start")
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=1).close()
+                logger.info(f"✅ LibreOffice instance {self.index} ready on port {self.port}")
+                return
+            except OSError:
+                time.sleep(0.25)
+
+        self.stop()
+        raise ConversionError(f"LibreOffice instance {self.index} did not start in {self.START_TIMEOUT}s")
+
+    def stop(self):
+        """Kill the server (and its soffice) and remove its profile"""
+        _kill_session(self.process)
+        self.process = None
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+    def close(self):
+        """Stop for good: queued and running jobs fail with PoolStopped"""
+        self.closed = True
+        self.stop()
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def submit(self, inpath, outpath, target):
+        """Queue a conversion; the returned Future resolves to outpath"""
+        future = Future()
+        self.jobs.put((future, inpath, outpath, target))
+        return future
+
+    def _work(self):
+        while True:
+            future, inpath, outpath, target = self.jobs.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if self.closed:
+                    raise PoolStopped(f"LibreOffice instance {self.index} was stopped")
+                if not self.alive:
+                    self.start()
+
+                from unoserver.client import UnoClient
+                timeout = settings.LIBREOFFICE_CONVERSION_TIMEOUT
+                expired = threading.Event()
+                timer = threading.Timer(timeout, self._expire, args=(expired,))
+                timer.start()
+                try:
+                    UnoClient(server='127.0.0.1', port=str(self.port)).convert(
+                        inpath=inpath, outpath=outpath, convert_to=target
+                    )
+                except Exception:
+                    if expired.is_set():
+                        raise ConversionError(f"Conversion timed out after {timeout}s")
+                    if self.closed:
+                        raise PoolStopped(f"LibreOffice instance {self.index} was stopped")
+                    raise
+                finally:
+                    timer.cancel()
+                if not os.path.exists(outpath):
+                    raise ConversionError(f"LibreOffice produced no {target} output")
+                future.set_result(outpath)
+            except Exception as e:
+                future.set_exception(e)
+
+    def _expire(self, expired):
+        """Conversion ran out of time: killing the server unblocks the thread"""
+        expired.set()
+        logger.warning(f"LibreOffice instance {self.index} timed out, restarting it")
+        _kill_session(self.process)
+
+
+class LibreOfficePool:
+    """
+    Warm LibreOffice instances shared by every conversion in this process.
+
+    Started by the Celery worker_process_init hook (or on first use), so a
+    conversion never pays LibreOffice's multi-second cold start, and stopped
+    by worker_process_shutdown: the instances run in their own sessions and
+    pool processes exit without running atexit handlers.
+    """
+
+    _instances = []
+    _unavailable = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def start(cls):
+        """Start the pool's instances; False when pooling is off or unavailable"""
+        with cls._lock:
+            if cls._instances:
+                return True
+            if cls._unavailable or settings.LIBREOFFICE_POOL_SIZE <= 0:
+                return False
+
+            instances = [LibreOfficeInstance(index) for index in range(settings.LIBREOFFICE_POOL_SIZE)]
+            try:
+                for instance in instances:
+                    instance.start()
+            except (ImportError, OSError, ConversionError) as e:
+                logger.warning(f"LibreOffice pool unavailable, converting with one-off processes: {str(e)}")
+                for instance in instances:
+                    instance.close()
+                cls._unavailable = True
+                return False
+
+            cls._instances = instances
+            # Processes outside Celery (shell, management commands) still exit normally
+            atexit.register(cls.stop)
+            return True
+
+    @classmethod
+    def stop(cls):
+        with cls._lock:
+            for instance in cls._instances:
+                instance.close()
+            cls._instances = []
+
+    @classmethod
+    def convert(cls, inpath, outpath, target):
+        """
+        Convert on the least busy instance. Time spent queued behind other
+        conversions doesn't count toward the timeout.
+
+        Raises:
+            PoolStopped: If the pool is (or gets) stopped before the
+                         conversion runs
+            ConversionError: If the conversion fails or times out (the
+                             instance is then restarted)
+        """
+        instances = cls._instances
+        if not instances:
+            raise PoolStopped("LibreOffice pool is not running")
+        instance = min(instances, key=lambda candidate: candidate.jobs.qsize())
+        future = instance.submit(inpath, outpath, target)
+        try:
+            return future.result()
+        except ConversionError:
+            raise
+        except Exception as e:
+            raise ConversionError(str(e))
+
+
+class DocumentConverter:
+    """Convert decks between formats with LibreOffice"""
+
+    def converted(self, name, file_hash, target):
+        """
+        Stored copy of a file in another format, converted once per content hash.
+
+        Args:
+            name (str):      Storage name of the source file
+            file_hash (str): SHA-256 of the source file
+            target (str):    Target extension ('pptx' or 'pdf')
+
+        Returns:
+            str: Storage name of the converted file
+        """
+        converted_name = f"{CONVERSION_DIR}/{file_hash[:2]}/{file_hash}.{target}"
+        if default_storage.exists(converted_name):
+            return converted_name
+
+        with ObjectStorage().local_path(name) as path, tempfile.TemporaryDirectory() as outdir:
+            output = self.convert_file(path, outdir, target)
+            with open(output, 'rb') as f:
+                converted_name = default_storage.save(converted_name, File(f))
+
+        logger.info(f"✅ Converted {name} to {target}")
+        return converted_name
+
+    def convert_file(self, path, outdir, target):
+        """
+        Convert a local file into outdir.
+
+        Uses the warm pool when it is running, otherwise a one-off LibreOffice
+        process with its own temporary profile.
+
+        Args:
+            path (str):   Local source file
+            outdir (str): Directory for the output
+            target (str): Target extension
+
+        Returns:
+            str: Path of the converted file
+
+        Raises:
+            ConversionError: If the conversion fails or times out
+        """
+        outpath = os.path.join(outdir, f"{Path(path).stem}.{target}")
+
+        if LibreOfficePool.start():
+            try:
+                return LibreOfficePool.convert(path, outpath, target)
+            except PoolStopped as e:
+                logger.warning(f"{str(e)}, converting with a one-off process")
+
+        timeout = settings.LIBREOFFICE_CONVERSION_TIMEOUT
+        with tempfile.TemporaryDirectory(prefix='libreoffice-') as profile_dir:
+            try:
+                # Own session: on timeout the whole tree goes, soffice.bin included
+                process = subprocess.Popen(
+                    _with_limits([
+                        settings.LIBREOFFICE_BINARY,
+                        f"-env:UserInstallation={Path(profile_dir).as_uri()}",
+                        '--headless', '--convert-to', target, '--outdir', outdir, path,
+                    ], cpu_seconds=timeout),
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    start_new_session=True,
+                )
+            except OSError as e:
+                raise ConversionError(str(e))
+            try:
+                _, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                _kill_session(process)
+                raise ConversionError(f"Conversion timed out after {timeout}s")
+            finally:
+                # soffice.bin can outlive the launcher it was started by
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except (ProcessLookupError, PermissionError):
+                    pass
+            if process.returncode != 0:
+                raise ConversionError(
+                    f"LibreOffice exited with {process.returncode}: {stderr.decode(errors='replace')[-500:]}"
+                )
+
+        if not os.path.exists(outpath):
+            raise ConversionError(f"LibreOffice produced no {target} output")
+        return outpath
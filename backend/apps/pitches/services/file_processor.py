@@ -3,48 +3,88 @@ File Processor Service
 Extracts slides from PDF and PPTX files
 """
 import os
-from pptx import Presentation
-from PyPDF2 import PdfReader
-from pdf2image import convert_from_path
+import re
+import shutil
+import hashlib
+import tempfile
 import logging
+from .document_converter import DocumentConverter
+from .pdf_layout import PdfLayoutAnalyzer
+from .pptx_reader import PptxReader
 
 logger = logging.getLogger(__name__)
 
 
 class FileProcessor:
-    """Process pitch deck files and extract slide content"""
+    """
+    Process pitch deck files and extract slide content.
+
+    One instance serves every task and thread in a worker process, so
+    nothing about the file being read may be stored on self.
+    """
     
     def __init__(self):
         self.supported_formats = ['pdf', 'pptx', 'ppt']
     
-    def extract_slides(self, file_path):
+    def extract_slides(self, file_path, file_extension=None):
         """
         Main method to extract slides from any supported file type
         
         Args:
-            file_path (str): Path to the uploaded file
+            file_path:            Path to the uploaded file, or a seekable binary
+                                  file object (e.g. ObjectStorage.open_ranged)
+            file_extension (str): File type, required for file objects
             
         Returns:
             list: List of slide dictionaries with extracted content
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        file_extension = file_path.split('.')[-1].lower()
+        if isinstance(file_path, str):
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"File not found: {file_path}")
+            file_extension = file_extension or file_path.split('.')[-1].lower()
         
-        if file_extension in ['pptx', 'ppt']:
-            return self._extract_from_pptx(file_path)
+        if file_extension == 'pptx':
+            slides_data = self._extract_from_pptx(file_path)
+        elif file_extension == 'ppt':
+            slides_data = self._extract_from_ppt(file_path)
         elif file_extension == 'pdf':
-            return self._extract_from_pdf(file_path)
+            slides_data = self._extract_from_pdf(file_path)
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
+        
+        for slide_data in slides_data:
+            slide_data['fingerprint'] = self.fingerprint(slide_data)
+        
+        return slides_data
+    
+    @staticmethod
+    def fingerprint(slide_data):
+        """
+        Identify a slide's content independently of its position and formatting
+        
+        Text is lowercased with punctuation and whitespace collapsed, so
+        re-exported or re-flowed slides still match; images and charts are
+        part of the structure.
+        
+        Args:
+            slide_data (dict): Extracted slide
+            
+        Returns:
+            str: SHA-256 hex digest
+        """
+        text = re.sub(r'[^\w%$€£]+', ' ', slide_data['text'].lower()).strip()
+        structure = f"images={int(slide_data['has_images'])};charts={int(slide_data.get('has_charts', False))}"
+        return hashlib.sha256(f"{structure}\n{text}".encode('utf-8')).hexdigest()
     
     def _extract_from_pptx(self, file_path):
         """
         Extract content from PowerPoint files
         
+        Streams the slide and notes XML (see PptxReader) instead of loading
+        the whole presentation, so embedded media never reaches memory.
+        
         Args:
-            file_path (str): Path to PPTX file
+            file_path: Path to PPTX file, or a file object
             
         Returns:
             list: Slide data
@@ -52,63 +92,59 @@ class FileProcessor:
         slides_data = []
         
         try:
-            prs = Presentation(file_path)
-            logger.info(f"Processing PPTX with {len(prs.slides)} slides")
-            
-            for idx, slide in enumerate(prs.slides, start=1):
-                text_content = []
-                has_images = False
-                has_charts = False
-                
-                # Extract text from all shapes
-                for shape in slide.shapes:
-                    # Text content
-                    if hasattr(shape, "text") and shape.text.strip():
-                        text_content.append(shape.text.strip())
-                    
-                    # Check for images
-                    if shape.shape_type == 13:  # Picture
-                        has_images = True
-                    
-                    # Check for charts
-                    if hasattr(shape, "has_chart") and shape.has_chart:
-                        has_charts = True
-                
-                # Extract notes (speaker notes)
-                notes_text = ""
-                if slide.has_notes_slide:
-                    notes_slide = slide.notes_slide
-                    if notes_slide.notes_text_frame:
-                        notes_text = notes_slide.notes_text_frame.text.strip()
-                
-                slide_data = {
-                    'number': idx,
-                    'text': '\n'.join(text_content),
-                    'notes': notes_text,
-                    'has_images': has_images,
-                    'has_charts': has_charts,
-                    'word_count': len(' '.join(text_content).split()),
-                }
-                
-                slides_data.append(slide_data)
-                logger.info(f"Extracted slide {idx}: {len(text_content)} text blocks")
+            with PptxReader(file_path) as reader:
+                for slide_data in reader.slides():
+                    slides_data.append(slide_data)
+                    logger.info(f"Extracted slide {slide_data['number']}: {slide_data['word_count']} words")
             
+            logger.info(f"Processed PPTX with {len(slides_data)} slides")
             return slides_data
             
         except Exception as e:
             logger.error(f"Error extracting from PPTX: {str(e)}")
             raise
     
+    def _extract_from_ppt(self, file_path):
+        """
+        Extract content from legacy PowerPoint (.ppt) files
+        
+        python-pptx and PptxReader only read PPTX, so the file is converted
+        with LibreOffice first (see DocumentConverter).
+        
+        Args:
+            file_path: Path to PPT file, or a file object
+            
+        Returns:
+            list: Slide data
+        """
+        with tempfile.TemporaryDirectory() as workdir:
+            source = file_path
+            if not isinstance(file_path, str):
+                source = os.path.join(workdir, 'deck.ppt')
+                with open(source, 'wb') as f:
+                    shutil.copyfileobj(file_path, f, 1024 * 1024)
+            
+            converted = DocumentConverter().convert_file(source, workdir, 'pptx')
+            logger.info("Converted PPT to PPTX for extraction")
+            return self._extract_from_pptx(converted)
+    
     def _extract_from_pdf(self, file_path):
         """
         Extract content from PDF files
         
         Args:
-            file_path (str): Path to PDF file
+            file_path: Path to PDF file, or a file object
             
         Returns:
             list: Slide data
         """
+        try:
+            from PyPDF2 import PdfReader
+        except ImportError:
+            raise ImportError(
+                "PyPDF2 package is required. Install with: pip install PyPDF2"
+            )
+        
         slides_data = []
         
         try:
@@ -116,26 +152,24 @@ class FileProcessor:
             total_pages = len(reader.pages)
             logger.info(f"Processing PDF with {total_pages} pages")
             
-            for idx, page in enumerate(reader.pages, start=1):
+            # Charts, images and text hierarchy from the content streams (no rendering)
+            layouts = PdfLayoutAnalyzer().analyze_pages(reader.pages)
+            
+            for idx, (page, layout) in enumerate(zip(reader.pages, layouts), start=1):
                 # Extract text
                 text = page.extract_text()
                 
-                # Check for images (basic check)
-                has_images = False
-                if '/XObject' in page['/Resources']:
-                    xObject = page['/Resources']['/XObject'].get_object()
-                    for obj in xObject:
-                        if xObject[obj]['/Subtype'] == '/Image':
-                            has_images = True
-                            break
-                
                 slide_data = {
                     'number': idx,
                     'text': text.strip() if text else '',
                     'notes': '',  # PDFs don't have speaker notes
-                    'has_images': has_images,
-                    'has_charts': False,  # Hard to detect in PDFs
+                    'has_images': layout['has_images'],
+                    'has_charts': layout['has_charts'],
                     'word_count': len(text.split()) if text else 0,
+                    'layout': {
+                        field: layout[field]
+                        for field in ('text_blocks', 'has_title', 'title_size', 'body_size', 'vector_paths')
+                    },
                 }
                 
                 slides_data.append(slide_data)
@@ -0,0 +1,242 @@
+"""
+PDF Layout Service
+Cheap layout signals for PDF slides read straight from the page content
+streams (no rasterizing): vector-path density for charts, drawn images,
+text blocks and the title/body font-size hierarchy. Results are cached per
+page content, so unchanged pages of a re-uploaded deck are never re-scanned
+"""
+import hashlib
+import logging
+import math
+import re
+from collections import Counter
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# One content-stream token: strings, arrays, dictionaries, names, numbers, operators
+TOKEN_RE = re.compile(rb"""
+    (?P<string>\((?:\\.|[^\\()]|\((?:\\.|[^\\()])*\))*\))
+  | (?P<hex><[0-9A-Fa-f\s]*>)
+  | (?P<name>/[^\s/\[\]()<>{}%]*)
+  | (?P<number>[+-]?(?:\d+\.?\d*|\.\d+))
+  | (?P<op>[A-Za-z'"][A-Za-z0-9'"*]*)
+  | (?P<comment>%[^\r\n]*)
+""", re.VERBOSE | re.DOTALL)
+
+# Inline image data ends at EI
+INLINE_IMAGE_END_RE = re.compile(rb"\sEI(?=\s|$)")
+
+PATH_SEGMENT_OPS = {b'l', b'c', b'v', b'y', b're'}
+PATH_PAINT_OPS = {b'S', b's', b'f', b'F', b'f*', b'B', b'B*', b'b', b'b*'}
+TEXT_SHOW_OPS = {b'Tj', b'TJ', b"'", b'"'}
+
+CACHE_PREFIX = 'pdf_layout'
+CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+# Form XObjects are followed this deep
+MAX_FORM_DEPTH = 3
+
+
+class PdfLayoutAnalyzer:
+    """
+    Layout signals for PyPDF2 pages.
+
+    A slide counts as having a chart when it paints many vector paths
+    (bars, axes, gridlines); it has a title when its largest text is
+    clearly bigger than the body text.
+    """
+
+    # Painted paths from which a page is treated as a chart
+    CHART_MIN_PATHS = 12
+
+    # Title text is at least this much larger than body text
+    TITLE_RATIO = 1.3
+
+    def analyze_pages(self, pages):
+        """
+        Layout of every page, from the cache where possible.
+
+        Args:
+            pages (list): PyPDF2 page objects
+
+        Returns:
+            list: One layout dict per page (see scan)
+        """
+        streams = [self._page_stream(page) for page in pages]
+        keys = [
+            f"{CACHE_PREFIX}:{hashlib.sha256(data + b'|' + b','.join(sorted(images))).hexdigest()}"
+            for data, images in streams
+        ]
+        cached = cache.get_many(keys)
+
+        layouts = []
+        missing = {}
+        for key, (data, images) in zip(keys, streams):
+            if key not in cached:
+                try:
+                    missing[key] = self.scan(data, images)
+                except Exception as e:
+                    logger.warning(f"Could not scan PDF page layout: {str(e)}")
+                    missing[key] = self.scan(b'', set())
+            layouts.append(cached.get(key) or missing[key])
+
+        if missing:
+            cache.set_many(missing, timeout=CACHE_TIMEOUT)
+        logger.info(f"Scanned layout of {len(missing)}/{len(pages)} PDF pages ({len(pages) - len(missing)} cached)")
+        return layouts
+
+    def scan(self, data, image_names):
+        """
+        Walk a content stream's operators once.
+
+        Args:
+            data (bytes):      Decoded page content (forms appended)
+            image_names (set): XObject names that are images
+
+        Returns:
+            dict: has_images, image_count, has_charts, vector_paths,
+                  text_blocks, title_size, body_size, has_title
+        """
+        operands = []
+        scale_stack = []
+        ctm_scale = 1.0
+        text_scale = 1.0
+        font_size = 0.0
+        line_y = 0.0
+        leading = 0.0
+
+        image_count = 0
+        painted_paths = 0
+        segments = 0
+        text_by_size = Counter()
+        text_blocks = 0
+        block = None  # (size, y) of the text block being written
+
+        pos = 0
+        length = len(data)
+        while pos < length:
+            match = TOKEN_RE.search(data, pos)
+            if match is None:
+                break
+            pos = match.end()
+            kind = match.lastgroup
+
+            if kind == 'number':
+                operands.append(float(match.group()))
+                continue
+            if kind in ('string', 'hex'):
+                operands.append(match.group())
+                continue
+            if kind == 'name':
+                operands.append(match.group()[1:])
+                continue
+            if kind != 'op':
+                continue
+
+            op = match.group()
+            numbers = [value for value in operands if isinstance(value, float)]
+
+            if op == b'q':
+                scale_stack.append(ctm_scale)
+            elif op == b'Q':
+                ctm_scale = scale_stack.pop() if scale_stack else 1.0
+            elif op == b'cm' and len(numbers) >= 6:
+                ctm_scale *= self._matrix_scale(numbers[-6:])
+            elif op == b'BT':
+                text_scale = 1.0
+                line_y = 0.0
+            elif op == b'Tm' and len(numbers) >= 6:
+                text_scale = self._matrix_scale(numbers[-6:])
+                line_y = numbers[-1]
+            elif op == b'Tf' and numbers:
+                font_size = abs(numbers[-1])
+            elif op == b'TL' and numbers:
+                leading = numbers[-1]
+            elif op in (b'Td', b'TD') and len(numbers) >= 2:
+                line_y += numbers[-1] * text_scale
+                if op == b'TD':
+                    leading = -numbers[-1]
+            elif op == b'T*':
+                line_y -= leading * text_scale
+            elif op in TEXT_SHOW_OPS:
+                if op in (b"'", b'"'):
+                    line_y -= leading * text_scale
+                chars = sum(self._string_length(value) for value in operands if isinstance(value, bytes))
+                size = round(font_size * text_scale * ctm_scale, 1)
+                if chars and size:
+                    text_by_size[size] += chars
+                    # A new block starts at a size change or a vertical jump
+                    if block is None or abs(block[0] - size) > 0.1 * size or abs(block[1] - line_y) > 2 * size:
+                        text_blocks += 1
+                    block = (size, line_y)
+            elif op in PATH_SEGMENT_OPS:
+                segments += 1
+            elif op in PATH_PAINT_OPS:
+                painted_paths += 1
+            elif op == b'Do' and operands and operands[-1] in image_names:
+                image_count += 1
+            elif op == b'ID':
+                # Skip inline image data, which isn't tokenizable
+                end = INLINE_IMAGE_END_RE.search(data, pos)
+                pos = end.end() if end else length
+                image_count += 1
+
+            operands = []
+
+        # Sizes carrying only a few characters (page numbers, footnotes) don't set the hierarchy
+        sizes = [size for size, chars in text_by_size.items() if chars >= 3]
+        title_size = max(sizes, default=0.0)
+        body_size = max(sizes, key=lambda size: (text_by_size[size], -size), default=0.0)
+
+        return {
+            'has_images': image_count > 0,
+            'image_count': image_count,
+            'has_charts': painted_paths >= self.CHART_MIN_PATHS and segments >= self.CHART_MIN_PATHS,
+            'vector_paths': painted_paths,
+            'text_blocks': text_blocks,
+            'title_size': title_size,
+            'body_size': body_size,
+            'has_title': bool(body_size) and title_size >= self.TITLE_RATIO * body_size,
+        }
+
+    def _page_stream(self, page):
+        """Decoded content of a page and the forms it draws, plus its image names"""
+        parts = []
+        images = set()
+        contents = page.get_contents()
+        if contents is not None:
+            parts.append(contents.get_data())
+        self._collect_xobjects(page.get('/Resources'), parts, images, depth=0)
+        return b'\n'.join(parts), images
+
+    def _collect_xobjects(self, resources, parts, images, depth):
+        if resources is None or depth > MAX_FORM_DEPTH:
+            return
+        resources = resources.get_object()
+        if '/XObject' not in resources:
+            return
+
+        xobjects = resources['/XObject'].get_object()
+        for name in xobjects:
+            xobject = xobjects[name].get_object()
+            subtype = xobject.get('/Subtype')
+            if subtype == '/Image':
+                images.add(name[1:].encode('latin-1'))
+            elif subtype == '/Form':
+                parts.append(xobject.get_data())
+                self._collect_xobjects(xobject.get('/Resources'), parts, images, depth + 1)
+
+    @staticmethod
+    def _matrix_scale(matrix):
+        """Uniform scale of a [a b c d e f] matrix"""
+        a, b, c, d = matrix[:4]
+        return math.sqrt(abs(a * d - b * c)) or 1.0
+
+    @staticmethod
+    def _string_length(token):
+        """Approximate characters in a literal or hex string token"""
+        if token.startswith(b'('):
+            return len(token) - 2 - token.count(b'\\')
+        digits = len(token) - 2 - sum(token.count(space) for space in (b' ', b'\n', b'\r', b'\t'))
+        return digits // 2
@@ -0,0 +1,184 @@
+"""
+PPTX Reader Service
+Streams the text, notes, picture and chart markers out of a PPTX without
+building python-pptx's object graph: only the presentation, slide and notes
+XML parts are read (with iterparse), embedded media is never decompressed
+"""
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+NS_P = 'http://schemas.openxmlformats.org/presentationml/2006/main'
+NS_A = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+NS_R = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_REL = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+REL_NOTES_SLIDE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide'
+CHART_URI = 'http://schemas.openxmlformats.org/drawingml/2006/chart'
+
+# Tags compared while streaming
+SLIDE_ID = f'{{{NS_P}}}sldId'
+SHAPE = f'{{{NS_P}}}sp'
+PICTURE = f'{{{NS_P}}}pic'
+GRAPHIC_DATA = f'{{{NS_A}}}graphicData'
+PARAGRAPH = f'{{{NS_A}}}p'
+TEXT = f'{{{NS_A}}}t'
+LINE_BREAK = f'{{{NS_A}}}br'
+PLACEHOLDER = f'{{{NS_P}}}ph'
+RELATIONSHIP = f'{{{NS_REL}}}Relationship'
+REL_ID = f'{{{NS_R}}}id'
+
+
+class PptxReader:
+    """
+    Memory-bounded PPTX slide extraction.
+
+    Works on a path or any seekable binary file, including a ranged reader
+    over object storage: the ZIP central directory tells where each XML part
+    is, so a 200MB image-heavy deck costs a few hundred KB of reads.
+    """
+
+    # Refuse XML parts that inflate past this (zip bombs)
+    MAX_PART_SIZE = 50 * 1024 * 1024
+
+    def __init__(self, file):
+        self.zip = zipfile.ZipFile(file)
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def slides(self):
+        """
+        Yield one dict per slide, in presentation order.
+
+        Yields:
+            dict: number, text, notes, has_images, has_charts, word_count
+        """
+        for number, slide_part in enumerate(self.slide_parts(), start=1):
+            texts, has_images, has_charts = self._read_slide(slide_part)
+            notes_part = self._related_part(slide_part, REL_NOTES_SLIDE)
+            notes = self._read_notes(notes_part) if notes_part else ''
+
+            yield {
+                'number': number,
+                'text': '\n'.join(texts),
+                'notes': notes,
+                'has_images': has_images,
+                'has_charts': has_charts,
+                'word_count': len(' '.join(texts).split()),
+            }
+
+    def slide_parts(self):
+        """Slide part names in the order of the presentation's slide list"""
+        rels = self._relationships('ppt/presentation.xml')
+        slide_rel_ids = [
+            elem.get(REL_ID)
+            for elem in self._iter_elements('ppt/presentation.xml', SLIDE_ID)
+        ]
+        return [rels[rel_id][1] for rel_id in slide_rel_ids if rel_id in rels]
+
+    def _read_slide(self, part):
+        """
+        Text of every shape (group members included), plus whether the
+        slide has pictures and charts.
+
+        Returns:
+            tuple: (list of shape texts, has_images, has_charts)
+        """
+        texts = []
+        has_images = False
+        has_charts = False
+
+        for elem in self._iter_elements(part, SHAPE, PICTURE, GRAPHIC_DATA):
+            if elem.tag == SHAPE:
+                text = self._shape_text(elem)
+                if text:
+                    texts.append(text)
+            elif elem.tag == PICTURE:
+                has_images = True
+            elif elem.get('uri') == CHART_URI:
+                has_charts = True
+
+        return texts, has_images, has_charts
+
+    def _read_notes(self, part):
+        """Speaker notes: the text of the notes slide's body placeholder"""
+        for shape in self._iter_elements(part, SHAPE):
+            placeholder = shape.find(f'.//{PLACEHOLDER}')
+            if placeholder is not None and placeholder.get('type') == 'body':
+                return self._shape_text(shape)
+        return ''
+
+    @staticmethod
+    def _shape_text(shape):
+        """Paragraphs of a shape's text body, one per line"""
+        paragraphs = []
+        for paragraph in shape.iter(PARAGRAPH):
+            runs = []
+            for elem in paragraph.iter():
+                if elem.tag == TEXT:
+                    runs.append(elem.text or '')
+                elif elem.tag == LINE_BREAK:
+                    runs.append('\n')
+            paragraphs.append(''.join(runs))
+        return '\n'.join(paragraphs).strip()
+
+    def _iter_elements(self, part, *tags):
+        """
+        Stream the complete elements with the given tags out of an XML part.
+
+        Each one is cleared once handed out, and nested matches (a shape
+        inside a group) come before their parent, so memory stays at one
+        shape's worth of XML.
+        """
+        with self._open_part(part) as f:
+            depth = 0
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                if elem.tag not in tags:
+                    continue
+                if event == 'start':
+                    depth += 1
+                    continue
+                depth -= 1
+                yield elem
+                # Keep a matched ancestor's subtree intact for its own turn
+                if depth == 0:
+                    elem.clear()
+
+    def _relationships(self, part):
+        """{rId: (type, target part name)} from a part's .rels file"""
+        directory, filename = posixpath.split(part)
+        rels_part = posixpath.join(directory, '_rels', f'{filename}.rels')
+        if rels_part not in self.zip.NameToInfo:
+            return {}
+
+        rels = {}
+        for elem in self._iter_elements(rels_part, RELATIONSHIP):
+            if elem.get('TargetMode') == 'External':
+                continue
+            target = elem.get('Target', '')
+            if target.startswith('/'):
+                target = target.lstrip('/')
+            else:
+                target = posixpath.normpath(posixpath.join(directory, target))
+            rels[elem.get('Id')] = (elem.get('Type'), target)
+        return rels
+
+    def _related_part(self, part, rel_type):
+        """First part related to this one by the given relationship type"""
+        for rel, target in self._relationships(part).values():
+            if rel == rel_type and target in self.zip.NameToInfo:
+                return target
+        return None
+
+    def _open_part(self, part):
+        info = self.zip.getinfo(part)
+        if info.file_size > self.MAX_PART_SIZE:
+            raise ValueError(f"PPTX part {part} is too large ({info.file_size} bytes)")
+        return self.zip.open(info)
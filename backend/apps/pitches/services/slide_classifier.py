@@ -0,0 +1,223 @@
+"""
+Slide Classifier Service
+Deterministic slide typing from keyword and phrase indexes plus the layout
+signals FileProcessor extracts. Runs in microseconds per slide, so decks
+get provisional slide types before any LLM call returns
+"""
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Terms that point to a slide type, with their weight. Multi-word entries
+# are matched as phrases.
+TYPE_TERMS = {
+    'title': {
+        'pitch deck': 2.0, 'investor presentation': 2.5, 'confidential': 1.0,
+        'presented by': 2.0, 'founder': 0.5, 'ceo': 0.5,
+    },
+    'problem': {
+        'problem': 3.0, 'problems': 2.0, 'pain': 2.0, 'pain point': 3.0, 'pain points': 3.0,
+        'challenge': 1.5, 'challenges': 1.5, 'struggle': 1.5, 'struggles': 1.5,
+        'frustrating': 1.5, 'inefficient': 1.5, 'costly': 1.0, 'broken': 1.0,
+        'today': 0.5, 'waste': 1.0, 'lack': 1.0, 'lack of': 1.5, 'status quo': 2.0,
+    },
+    'solution': {
+        'solution': 3.0, 'solutions': 2.0, 'we solve': 3.0, 'introducing': 2.0,
+        'our approach': 2.5, 'how it works': 2.0, 'platform': 1.0, 'enables': 1.0,
+        'allows': 0.5, 'simple': 0.5, 'easy': 0.5, 'instead': 0.5,
+    },
+    'product': {
+        'product': 2.5, 'demo': 3.0, 'features': 2.0, 'feature': 1.5, 'app': 1.0,
+        'dashboard': 1.5, 'screenshot': 2.5, 'interface': 1.5, 'mobile': 0.5,
+        'roadmap': 1.5, 'product roadmap': 3.0, 'integrations': 1.0, 'api': 1.0,
+    },
+    'market': {
+        'market': 2.5, 'market size': 3.5, 'market opportunity': 3.5, 'opportunity': 1.0,
+        'tam': 3.5, 'sam': 3.0, 'som': 3.0, 'addressable': 3.0,
+        'total addressable market': 4.0, 'serviceable': 2.0, 'cagr': 3.0,
+        'billion': 1.0, 'industry': 1.0, 'segment': 1.0, 'growing': 0.5,
+    },
+    'business_model': {
+        'business model': 4.0, 'revenue model': 4.0, 'pricing': 3.0, 'subscription': 2.0,
+        'saas': 1.5, 'monetization': 3.0, 'monetize': 2.5, 'per month': 1.5, 'per user': 1.5,
+        'per seat': 2.0, 'freemium': 2.5, 'commission': 2.0, 'fee': 1.0, 'fees': 1.0,
+        'unit economics': 3.0, 'ltv': 2.0, 'cac': 2.0, 'margin': 1.0, 'margins': 1.0,
+        'go to market': 2.0, 'sales channels': 2.0,
+    },
+    'traction': {
+        'traction': 4.0, 'milestones': 2.5, 'customers': 1.5, 'users': 1.5,
+        'active users': 2.5, 'mrr': 3.0, 'arr': 3.0, 'growth': 1.5, 'month over month': 3.0,
+        'mom': 2.5, 'pilots': 2.0, 'pilot': 1.5, 'signed': 1.5, 'waitlist': 2.0,
+        'retention': 2.0, 'downloads': 2.0, 'partnerships': 1.0, 'launched': 1.0,
+    },
+    'competition': {
+        'competition': 4.0, 'competitors': 4.0, 'competitor': 3.5, 'competitive': 3.0,
+        'landscape': 2.0, 'alternatives': 2.5, 'versus': 1.5, 'vs': 1.5,
+        'differentiation': 2.5, 'advantage': 1.5, 'competitive advantage': 3.0,
+        'incumbents': 2.5, 'moat': 2.5,
+    },
+    'team': {
+        'team': 3.5, 'our team': 4.0, 'founders': 3.0, 'cofounder': 3.0, 'co founder': 3.0,
+        'cto': 2.0, 'coo': 2.0, 'cfo': 1.5, 'advisors': 2.5, 'advisor': 2.0,
+        'experience': 1.0, 'formerly': 2.0, 'ex': 1.0, 'previously': 1.5, 'phd': 1.5,
+        'years of experience': 2.0, 'board': 1.0, 'hires': 1.0,
+    },
+    'financials': {
+        'financials': 4.0, 'financial projections': 4.0, 'projections': 3.0, 'forecast': 2.5,
+        'revenue': 1.5, 'ebitda': 3.0, 'profit': 1.5, 'burn': 2.0, 'burn rate': 3.0,
+        'runway': 1.5, 'break even': 2.5, 'gross margin': 2.0, 'expenses': 1.5,
+        'p&l': 3.0, 'cash flow': 2.5, 'year 1': 1.0, 'year 2': 1.0, 'year 3': 1.0,
+    },
+    'ask': {
+        'the ask': 4.0, 'ask': 2.0, 'raising': 3.0, 'we are raising': 4.0, 'investment': 2.0,
+        'funding': 2.5, 'seed': 2.0, 'pre seed': 2.5, 'series a': 3.0, 'round': 1.5,
+        'use of funds': 4.0, 'use of proceeds': 4.0, 'invest': 1.5, 'valuation': 2.0,
+        'safe': 1.0, 'allocation': 1.0,
+    },
+    'other': {
+        'thank you': 3.0, 'thanks': 2.0, 'questions': 1.5, 'contact': 2.0, 'contact us': 3.0,
+        'appendix': 3.5, 'agenda': 3.0, 'email': 1.0, 'www': 1.0,
+    },
+}
+
+# Layout signals: charts and images lean towards some slide types
+CHART_BOOST = {'traction': 1.5, 'financials': 1.5, 'market': 1.0, 'competition': 0.5}
+IMAGE_BOOST = {'product': 1.0, 'team': 0.75, 'title': 0.5}
+
+# Slide types that usually open or close a deck (by relative position)
+EARLY_TYPES = {'problem': 0.75, 'solution': 0.5}
+LATE_TYPES = {'financials': 0.5, 'ask': 1.0, 'team': 0.5}
+
+# Terms in the slide's heading (first line) count this much more
+HEADING_WEIGHT = 2.0
+
+# Below this score the slide is typed 'other'
+MIN_SCORE = 1.5
+
+TOKEN_RE = re.compile(r"[a-z0-9&]+")
+MONEY_RE = re.compile(r"[$€£]\s?\d|\d\s?(?:k|m|bn|b|million|billion)\b", re.IGNORECASE)
+
+
+def _build_indexes():
+    """
+    Build the lookup tables once at import:
+    token -> [(type, weight)] and first token -> [(phrase tokens, type, weight)]
+    """
+    token_index = {}
+    phrase_index = {}
+    for slide_type, terms in TYPE_TERMS.items():
+        for term, weight in terms.items():
+            tokens = tuple(TOKEN_RE.findall(term))
+            if len(tokens) == 1:
+                token_index.setdefault(tokens[0], []).append((slide_type, weight))
+            else:
+                phrase_index.setdefault(tokens[0], []).append((tokens, slide_type, weight))
+    return token_index, phrase_index
+
+
+TOKEN_INDEX, PHRASE_INDEX = _build_indexes()
+
+
+class SlideClassifier:
+    """
+    Classify slides without an LLM.
+
+    Shared by all tasks in a worker process: its keyword tables are read-only.
+    """
+
+    # Provisional types at or above this confidence are usually right
+    CONFIDENT = 0.6
+
+    def classify(self, slide, total_slides=None):
+        """
+        Classify one slide.
+
+        Args:
+            slide (dict):       Slide dict from FileProcessor
+            total_slides (int): Deck length, for position priors
+
+        Returns:
+            dict: {'slide_type': str, 'confidence': float 0-1}
+        """
+        text = slide.get('text') or ''
+        heading, _, body = text.strip().partition('\n')
+        scores = {}
+
+        self._score_terms(heading.lower(), HEADING_WEIGHT, scores)
+        self._score_terms(body.lower(), 1.0, scores)
+
+        if MONEY_RE.search(text):
+            for slide_type in ('ask', 'financials', 'market', 'traction'):
+                scores[slide_type] = scores.get(slide_type, 0) + 0.5
+
+        if slide.get('has_charts'):
+            for slide_type, boost in CHART_BOOST.items():
+                scores[slide_type] = scores.get(slide_type, 0) + boost
+        if slide.get('has_images'):
+            for slide_type, boost in IMAGE_BOOST.items():
+                scores[slide_type] = scores.get(slide_type, 0) + boost
+
+        self._score_position(slide.get('number'), total_slides, slide.get('word_count', 0), scores)
+
+        return self._decide(scores)
+
+    def classify_deck(self, slides_data):
+        """
+        Classify every slide of a deck.
+
+        Args:
+            slides_data (list): Slide dicts from FileProcessor
+
+        Returns:
+            dict: {slide number: {'slide_type': ..., 'confidence': ...}}
+        """
+        total = len(slides_data)
+        return {slide['number']: self.classify(slide, total) for slide in slides_data}
+
+    def _score_terms(self, text, weight, scores):
+        """Add the weight of every distinct indexed term and phrase in text"""
+        tokens = TOKEN_RE.findall(text)
+        seen = set()
+
+        for i, token in enumerate(tokens):
+            for slide_type, term_weight in TOKEN_INDEX.get(token, ()):
+                if (slide_type, token) not in seen:
+                    seen.add((slide_type, token))
+                    scores[slide_type] = scores.get(slide_type, 0) + term_weight * weight
+
+            for phrase, slide_type, term_weight in PHRASE_INDEX.get(token, ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase and (slide_type, phrase) not in seen:
+                    seen.add((slide_type, phrase))
+                    scores[slide_type] = scores.get(slide_type, 0) + term_weight * weight
+
+    def _score_position(self, number, total_slides, word_count, scores):
+        """Priors from where the slide sits in the deck"""
+        if not number or not total_slides:
+            return
+
+        if number == 1:
+            scores['title'] = scores.get('title', 0) + (4.0 if word_count <= 20 else 2.0)
+            return
+
+        position = (number - 1) / max(1, total_slides - 1)
+        if position <= 0.4:
+            for slide_type, boost in EARLY_TYPES.items():
+                scores[slide_type] = scores.get(slide_type, 0) + boost
+        elif position >= 0.6:
+            for slide_type, boost in LATE_TYPES.items():
+                scores[slide_type] = scores.get(slide_type, 0) + boost
+
+    def _decide(self, scores):
+        """Best type, with confidence from its margin over the runner-up"""
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] < MIN_SCORE:
+            return {'slide_type': 'other', 'confidence': 0.0}
+
+        best_type, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+
+        # A clear margin and enough evidence are both needed to be sure
+        margin = (best - runner_up) / best
+        evidence = min(1.0, best / 6.0)
+        return {'slide_type': best_type, 'confidence': round(margin * evidence, 2)}
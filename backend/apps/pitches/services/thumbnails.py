@@ -0,0 +1,207 @@
+"""
+Thumbnail Service
+Low-DPI WebP previews of deck pages, rasterized on demand by a Celery task
+and stored once per file hash and page
+"""
+import io
+import hashlib
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from apps.core.services.storage import ObjectStorage
+from .document_converter import DocumentConverter
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = 'thumbnails'
+
+
+def _rasterize_pages(pdf_path, first_page, last_page, dpi, width, quality):
+    """
+    Render a range of PDF pages to WebP bytes.
+
+    poppler runs as THUMBNAIL_WORKERS pdftoppm processes, each taking a
+    share of the pages; nothing is forked from the (threaded) worker itself.
+
+    Args:
+        pdf_path (str):   Local PDF path
+        first_page (int): 1-based first page
+        last_page (int):  Last page (pages past the end are skipped)
+        dpi (int):        Render resolution
+        width (int):      Thumbnail width in pixels (height keeps the aspect ratio)
+        quality (int):    WebP quality
+
+    Returns:
+        dict: {page: WebP bytes}
+    """
+    try:
+        from pdf2image import convert_from_path
+    except ImportError:
+        raise ImportError(
+            "pdf2image package is required. Install with: pip install pdf2image"
+        )
+
+    images = convert_from_path(
+        pdf_path, dpi=dpi, first_page=first_page, last_page=last_page, size=(width, None),
+        thread_count=settings.THUMBNAIL_WORKERS,
+    )
+
+    rendered = {}
+    for page, image in enumerate(images, start=first_page):
+        buffer = io.BytesIO()
+        image.save(buffer, format='WEBP', quality=quality, method=4)
+        rendered[page] = buffer.getvalue()
+    return rendered
+
+
+class ThumbnailService:
+    """
+    Slide thumbnails for the deck viewer.
+
+    The first request for a page queues a render of it and the next few
+    pages (viewers page forward); a worker rasterizes them in parallel, at
+    low DPI so it never spends time on full-resolution renders. Web requests
+    only ever look thumbnails up, never read the deck. Thumbnails are keyed
+    by the file's SHA-256, so every deck with the same bytes shares them.
+    """
+
+    DPI = 40
+    WIDTH = 480
+    WEBP_QUALITY = 70
+
+    # Pages rendered together on a cache miss
+    PAGE_RANGE = 4
+
+    # A failed render isn't retried for this long
+    FAILURE_TIMEOUT = 60 * 60
+
+    def lookup(self, pitch_deck, page):
+        """
+        Where a page's thumbnail stands, without rendering anything.
+
+        Queues the render on a miss (once per page, however many requests
+        ask for it while it runs).
+
+        Args:
+            pitch_deck (PitchDeck): Deck the page belongs to
+            page (int):             1-based page number
+
+        Returns:
+            tuple: ('ready', storage name), ('rendering', None) or ('failed', None)
+        """
+        # Held until the render finishes or the conversion could have timed out
+        timeout = settings.LIBREOFFICE_CONVERSION_TIMEOUT + 60
+
+        file_hash = pitch_deck.content_hash
+        if not file_hash:
+            # Decks uploaded before content hashing: the task hashes the file
+            if cache.add(self._queued_key(pitch_deck.id, page), True, timeout=timeout):
+                from ..tasks import render_thumbnails
+                render_thumbnails.delay(str(pitch_deck.id), page)
+            return 'rendering', None
+
+        name = self.thumbnail_name(file_hash, page)
+        if default_storage.exists(name):
+            return 'ready', name
+        if cache.get(self._failed_key(file_hash, page)):
+            return 'failed', None
+
+        if cache.add(self._queued_key(file_hash, page), True, timeout=timeout):
+            # The task renders the pages after this one too
+            for next_page in range(page + 1, page + self.PAGE_RANGE):
+                cache.add(self._queued_key(file_hash, next_page), True, timeout=timeout)
+            from ..tasks import render_thumbnails
+            render_thumbnails.delay(str(pitch_deck.id), page)
+        return 'rendering', None
+
+    def render(self, pitch_deck, page):
+        """
+        Render a page's range and store the thumbnails. Runs in a worker.
+
+        Args:
+            pitch_deck (PitchDeck): Deck the page belongs to
+            page (int):             1-based page number
+
+        Returns:
+            str: Storage name of the WebP thumbnail, or None if it can't be rendered
+        """
+        if not pitch_deck.content_hash:
+            cache.delete(self._queued_key(pitch_deck.id, page))
+        file_hash = self.file_hash(pitch_deck)
+        name = self.thumbnail_name(file_hash, page)
+        if default_storage.exists(name):
+            cache.delete(self._queued_key(file_hash, page))
+            return name
+
+        last_page = page + self.PAGE_RANGE - 1
+        if pitch_deck.total_slides:
+            last_page = min(last_page, pitch_deck.total_slides)
+
+        try:
+            # poppler needs a local file; remote decks are fetched once per range
+            with ObjectStorage().local_path(self._pdf_name(pitch_deck, file_hash)) as pdf_path:
+                self._render_range(pdf_path, file_hash, page, last_page)
+        except Exception as e:
+            logger.error(f"❌ Thumbnail rendering failed for {pitch_deck.id} page {page}: {str(e)}")
+        finally:
+            cache.delete_many([self._queued_key(file_hash, p) for p in range(page, last_page + 1)])
+
+        if not default_storage.exists(name):
+            cache.set(self._failed_key(file_hash, page), True, timeout=self.FAILURE_TIMEOUT)
+            return None
+        return name
+
+    def file_hash(self, pitch_deck):
+        """
+        SHA-256 of the uploaded file. Decks uploaded before content hashing
+        are hashed once here (in a worker) and keep the result.
+        """
+        if pitch_deck.content_hash:
+            return pitch_deck.content_hash
+
+        digest = hashlib.sha256()
+        with ObjectStorage().open(pitch_deck.uploaded_file.name) as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        pitch_deck.content_hash = digest.hexdigest()
+        type(pitch_deck).objects.filter(id=pitch_deck.id).update(content_hash=pitch_deck.content_hash)
+        return pitch_deck.content_hash
+
+    @staticmethod
+    def thumbnail_name(file_hash, page):
+        return f"{THUMBNAIL_DIR}/{file_hash[:2]}/{file_hash}/{page}.webp"
+
+    @staticmethod
+    def _queued_key(file_hash, page):
+        # Keyed by deck id instead while the file hash is unknown
+        return f"thumbnail_queued:{file_hash}:{page}"
+
+    @staticmethod
+    def _failed_key(file_hash, page):
+        return f"thumbnail_failed:{file_hash}:{page}"
+
+    def _render_range(self, pdf_path, file_hash, first_page, last_page):
+        """Rasterize the missing pages of a range and store them"""
+        pages = [
+            page for page in range(first_page, last_page + 1)
+            if not default_storage.exists(self.thumbnail_name(file_hash, page))
+        ]
+        if not pages:
+            return
+
+        images = _rasterize_pages(
+            pdf_path, min(pages), max(pages), self.DPI, self.WIDTH, self.WEBP_QUALITY
+        )
+        for page in pages:
+            if images.get(page):
+                default_storage.save(self.thumbnail_name(file_hash, page), ContentFile(images[page]))
+
+        logger.info(f"Rendered {len(images)}/{len(pages)} thumbnail(s) for {file_hash[:12]}")
+
+    def _pdf_name(self, pitch_deck, file_hash):
+        """Stored PDF to rasterize; PowerPoint files are converted once per hash"""
+        if pitch_deck.file_type == 'pdf':
+            return pitch_deck.uploaded_file.name
+        return DocumentConverter().converted(pitch_deck.uploaded_file.name, file_hash, 'pdf')
@@ -1,8 +1,13 @@
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
+from apps.core.services.progress import ProgressChannel
+from apps.core.services.registry import get_service
+from apps.core.services.response_cache import invalidate_namespace
+from apps.core.services.storage import ObjectStorage
 from .models import PitchDeck, Slide
-from .services.file_processor import FileProcessor
-from .services.ai_analyzer import AIAnalyzer
+from .services.deck_dedup import DeckDeduplicator
+from .services.thumbnails import ThumbnailService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,6 +18,13 @@ def analyze_pitch_deck(self, pitch_deck_id):
     """
     Background task to analyze a pitch deck with real services
     """
+    # Imported here so the web process, which only queues this task, never
+    # loads the document and LLM libraries
+    from .services.ai_analyzer import AIAnalyzer
+    from .services.document_converter import DocumentConverter
+    from .services.file_processor import FileProcessor
+    from .services.slide_classifier import SlideClassifier
+    
     try:
         # Get pitch deck
         pitch_deck = PitchDeck.objects.get(id=pitch_deck_id)
@@ -21,25 +33,92 @@ def analyze_pitch_deck(self, pitch_deck_id):
         pitch_deck.status = 'processing'
         pitch_deck.save()
         
+        # Same bytes analyzed before: reuse that analysis, through the same
+        # pending -> processing -> completed steps as a fresh one
+        if DeckDeduplicator().clone_analysis(pitch_deck):
+            invalidate_namespace(pitch_deck.cache_namespace)
+            return {
+                'status': 'success',
+                'pitch_deck_id': str(pitch_deck_id),
+                'total_slides': pitch_deck.total_slides
+            }
+        
         logger.info(f"Starting analysis of pitch deck: {pitch_deck.title}")
         
         # STEP 1: Extract slides
-        processor = FileProcessor()
-        slides_data = processor.extract_slides(pitch_deck.uploaded_file.path)
+        # Read through the storage backend: the worker may not share the web node's disk
+        processor = get_service(FileProcessor)
+        deck_name, deck_type = pitch_deck.uploaded_file.name, pitch_deck.file_type
+        if deck_type == 'ppt':
+            # Legacy PowerPoint: extract from a PPTX converted once per file hash
+            deck_name = DocumentConverter().converted(deck_name, ThumbnailService().file_hash(pitch_deck), 'pptx')
+            deck_type = 'pptx'
+        with ObjectStorage().open_ranged(deck_name) as deck_file:
+            slides_data = processor.extract_slides(deck_file, file_extension=deck_type)
         
         logger.info(f"Extracted {len(slides_data)} slides")
         
-        # STEP 2: Analyze each slide with AI
-        analyzer = AIAnalyzer()
+        # STEP 2: Reuse the analysis of slides unchanged since the owner's earlier decks
+        deduplicator = DeckDeduplicator()
+        previous = deduplicator.previous_slide_analyses(pitch_deck, slides_data)
+        reused = [
+            deduplicator.reuse_slide_analysis(pitch_deck, slide_data, previous[slide_data['fingerprint']])
+            for slide_data in slides_data
+            if slide_data['fingerprint'] in previous
+        ]
+        Slide.objects.bulk_create(reused)
+        changed = [slide_data for slide_data in slides_data if slide_data['fingerprint'] not in previous]
+        
+        logger.info(f"Reused {len(reused)} unchanged slides, analyzing {len(changed)}")
+        
+        # STEP 3: Type every changed slide, locally first, then with the small model
+        analyzer = get_service(AIAnalyzer)
+        progress = ProgressChannel(pitch_deck.cache_namespace)
+        
+        # Provisional slide types from the local classifier, shown until the LLM answers
+        provisional = get_service(SlideClassifier).classify_deck(slides_data)
+        slides_preview = {
+            str(slide_data['number']): {'provisional_type': provisional[slide_data['number']]['slide_type']}
+            for slide_data in changed
+        }
+        for slide in reused:
+            slides_preview[str(slide.slide_number)] = {
+                'slide_type': slide.slide_type,
+                'quality_score': slide.quality_score,
+            }
+        progress.update(
+            slides_total=len(slides_data),
+            slides_done=len(reused),
+            slides=slides_preview,
+        )
+        
+        classifications = analyzer.classify_slides(changed, progress=progress, total_slides=len(slides_data))
         
-        for slide_data in slides_data:
+        # STEP 4: Coach each changed slide, publishing results as they stream in
+        failed = 0
+        for slides_done, slide_data in enumerate(changed, start=len(reused) + 1):
             try:
+                classification = classifications.get(slide_data['number'])
+                
+                # Non-key slides can be coached by the small model too
+                model = None
+                if (
+                    classification
+                    and settings.SLIDE_COACHING_KEY_SLIDES_ONLY
+                    and classification['slide_type'] not in Slide.KEY_SLIDE_TYPES
+                ):
+                    model = analyzer.CLASSIFIER_MODEL
+                
                 # Analyze with AI
                 analysis = analyzer.analyze_slide(
                     slide_number=slide_data['number'],
                     text_content=slide_data['text'],
                     has_images=slide_data['has_images'],
-                    has_charts=slide_data.get('has_charts', False)
+                    has_charts=slide_data.get('has_charts', False),
+                    classification=classification,
+                    model=model,
+                    progress=progress,
+                    layout=slide_data.get('layout'),
                 )
                 
                 # Create slide in database
@@ -49,6 +128,7 @@ def analyze_pitch_deck(self, pitch_deck_id):
                     text_content=slide_data['text'],
                     has_images=slide_data['has_images'],
                     has_charts=slide_data.get('has_charts', False),
+                    fingerprint=slide_data['fingerprint'],
                     slide_type=analysis['slide_type'],
                     quality_score=analysis['quality_score'],
                     strengths=analysis['strengths'],
@@ -62,8 +142,25 @@ def analyze_pitch_deck(self, pitch_deck_id):
                 logger.info(f"Analyzed slide {slide_data['number']}")
                 
             except Exception as e:
+                # Keep the slide's content, but unscored: no made-up analysis
                 logger.error(f"Error analyzing slide {slide_data['number']}: {str(e)}")
-                continue
+                failed += 1
+                Slide.objects.create(
+                    pitch_deck=pitch_deck,
+                    slide_number=slide_data['number'],
+                    text_content=slide_data['text'],
+                    has_images=slide_data['has_images'],
+                    has_charts=slide_data.get('has_charts', False),
+                    fingerprint=slide_data['fingerprint'],
+                    slide_type=(classifications.get(slide_data['number']) or {}).get('slide_type', ''),
+                    quality_score=None,
+                )
+            
+            progress.update(slides_done=slides_done)
+        
+        if changed and failed == len(changed):
+            pitch_deck.slides.all().delete()
+            raise RuntimeError(f"Analysis failed for all {failed} changed slides")
         
         # Update pitch deck
         pitch_deck.total_slides = len(slides_data)
@@ -72,6 +169,10 @@ def analyze_pitch_deck(self, pitch_deck_id):
         pitch_deck.analyzed_at = timezone.now()
         pitch_deck.save()
         
+        # Drop rendered responses from any previous analysis
+        invalidate_namespace(pitch_deck.cache_namespace)
+        progress.clear()
+        
         logger.info(f"✅ Completed analysis of pitch deck: {pitch_deck.title}")
         
         return {
@@ -87,7 +188,28 @@ def analyze_pitch_deck(self, pitch_deck_id):
             pitch_deck = PitchDeck.objects.get(id=pitch_deck_id)
             pitch_deck.status = 'failed'
             pitch_deck.save()
+            ProgressChannel(pitch_deck.cache_namespace).clear()
         except:
             pass
         
-        return {'status': 'error', 'message': str(e)}
\ No newline at end of file
+        return {'status': 'error', 'message': str(e)}
+
+
+@shared_task(bind=True)
+def render_thumbnails(self, pitch_deck_id, page):
+    """
+    Background task to render a slide's thumbnail (and the next few pages)
+    """
+    try:
+        pitch_deck = PitchDeck.objects.get(id=pitch_deck_id)
+        name = ThumbnailService().render(pitch_deck, page)
+        
+        return {
+            'status': 'success' if name else 'error',
+            'pitch_deck_id': str(pitch_deck_id),
+            'page': page
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error rendering thumbnails: {str(e)}")
+        return {'status': 'error', 'message': str(e)}
@@ -1,3 +1,423 @@
-from django.test import TestCase
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .models import PitchDeck
+from .services.document_converter import (
+    ConversionError, DocumentConverter, LibreOfficePool, PoolStopped, _with_limits,
+)
+from .services.pdf_layout import PdfLayoutAnalyzer
+from .services.pptx_reader import PptxReader
+from .services.thumbnails import ThumbnailService
 
-# Create your tests here.
+
+class TempMediaMixin:
+    """Media storage in a throwaway directory"""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.media = override_settings(MEDIA_ROOT=self.media_root)
+        self.media.enable()
+
+    def tearDown(self):
+        self.media.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        super().tearDown()
+
+
+class PitchDeckFileTests(TempMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('founder', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.deck = PitchDeck(
+            owner=self.user, title='Seed', file_type='pdf', status='completed',
+            analyzed=True, analyzed_at=timezone.now(),
+        )
+        self.deck.uploaded_file.save('seed.pdf', ContentFile(b'%PDF-1.4 seed'))
+
+    def test_cached_detail_links_to_the_download_view(self):
+        url = f'/api/pitches/{self.deck.id}/'
+        first = self.client.get(url)
+        second = self.client.get(url)
+
+        self.assertEqual(first.json()['uploaded_file'], f'/api/pitches/{self.deck.id}/file/')
+        self.assertEqual(first.content, second.content)
+
+    def test_download_serves_the_file_to_its_owner_only(self):
+        response = self.client.get(f'/api/pitches/{self.deck.id}/file/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 seed')
+        response.close()
+
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user('investor', password='pw'))
+        self.assertEqual(other.get(f'/api/pitches/{self.deck.id}/file/').status_code, 404)
+
+
+@mock.patch('apps.pitches.tasks.analyze_pitch_deck.delay')
+class DeckBlobTests(TempMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('founder', password='pw')
+        self.user.profile.subscription_tier = 'pro'
+        self.user.profile.save()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = b'%PDF-1.4 shared'
+        file_hash = hashlib.sha256(self.data).hexdigest()
+        self.blob = f'pitch_decks/blobs/{file_hash[:2]}/{file_hash}.pdf'
+
+    def upload(self):
+        response = self.client.post('/api/pitches/upload/', {
+            'title': 'Seed',
+            'uploaded_file': SimpleUploadedFile('deck.pdf', self.data, content_type='application/pdf'),
+        })
+        self.assertEqual(response.status_code, 201)
+        return PitchDeck.objects.get(id=response.data['pitch_deck']['id'])
+
+    def delete(self, deck):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/pitches/{deck.id}/delete/')
+
+    def test_identical_decks_share_one_blob_until_the_last_is_deleted(self, delay):
+        first = self.upload()
+        with mock.patch.object(default_storage, 'open', side_effect=AssertionError):
+            second = self.upload()
+
+        self.assertEqual(first.uploaded_file.name, self.blob)
+        self.assertEqual(second.uploaded_file.name, self.blob)
+
+        self.delete(first)
+        self.assertTrue(default_storage.exists(self.blob))
+        self.delete(second)
+        self.assertFalse(default_storage.exists(self.blob))
+
+    def test_blob_without_a_deck_is_not_trusted(self, delay):
+        default_storage.save(self.blob, ContentFile(b'%PDF-1.4 other bytes'))
+
+        deck = self.upload()
+        self.assertNotEqual(deck.uploaded_file.name, self.blob)
+        with deck.uploaded_file.open('rb') as f:
+            self.assertEqual(f.read(), self.data)
+
+
+class ThumbnailServiceTests(TempMediaMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = User.objects.create_user('founder', password='pw')
+        self.data = b'%PDF-1.4 legacy'
+        self.deck = PitchDeck(owner=self.user, title='Legacy', file_type='pdf', total_slides=3)
+        self.deck.uploaded_file.save('legacy.pdf', ContentFile(self.data))
+
+    @mock.patch('apps.pitches.tasks.render_thumbnails.delay')
+    def test_lookup_never_hashes_in_the_request(self, delay):
+        with mock.patch.object(ThumbnailService, 'file_hash', side_effect=AssertionError):
+            self.assertEqual(ThumbnailService().lookup(self.deck, 1), ('rendering', None))
+            self.assertEqual(ThumbnailService().lookup(self.deck, 1), ('rendering', None))
+        delay.assert_called_once_with(str(self.deck.id), 1)
+
+    def test_render_hashes_legacy_decks_and_stores_the_range(self):
+        pages = {1: b'one', 2: b'two', 3: b'three'}
+        with mock.patch('apps.pitches.services.thumbnails._rasterize_pages', return_value=pages) as rasterize:
+            name = ThumbnailService().render(self.deck, 1)
+
+        file_hash = hashlib.sha256(self.data).hexdigest()
+        self.deck.refresh_from_db()
+        self.assertEqual(self.deck.content_hash, file_hash)
+        self.assertEqual(name, ThumbnailService.thumbnail_name(file_hash, 1))
+        self.assertEqual(rasterize.call_args.args[1:3], (1, 3))
+        with default_storage.open(ThumbnailService.thumbnail_name(file_hash, 3)) as f:
+            self.assertEqual(f.read(), b'three')
+
+    def test_failed_render_is_remembered(self):
+        with mock.patch('apps.pitches.services.thumbnails._rasterize_pages', side_effect=RuntimeError('poppler')):
+            self.assertIsNone(ThumbnailService().render(self.deck, 2))
+        self.assertEqual(ThumbnailService().lookup(self.deck, 2), ('failed', None))
+
+
+# Stand-in for soffice: converts by copying, or hangs with a child process
+FAKE_SOFFICE = """#!{python}
+import os, subprocess, sys, time
+args = sys.argv[1:]
+source, outdir, target = args[-1], args[args.index('--outdir') + 1], args[args.index('--convert-to') + 1]
+if 'hang' in source:
+    child = subprocess.Popen(['sleep', '60'])
+    with open(os.path.join(outdir, 'child.pid'), 'w') as f:
+        f.write(str(child.pid))
+    time.sleep(60)
+stem = os.path.splitext(os.path.basename(source))[0]
+with open(os.path.join(outdir, stem + '.' + target), 'w') as f:
+    f.write('converted')
+"""
+
+
+def _running(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().split()[2] != 'Z'
+    except FileNotFoundError:
+        return False
+
+
+class DocumentConverterTests(TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.binary = os.path.join(self.workdir, 'soffice')
+        with open(self.binary, 'w') as f:
+            f.write(FAKE_SOFFICE.format(python=sys.executable))
+        os.chmod(self.binary, 0o755)
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def source(self, name):
+        path = os.path.join(self.workdir, name)
+        with open(path, 'w') as f:
+            f.write('deck')
+        return path
+
+    @override_settings(LIBREOFFICE_MEMORY_LIMIT_MB=1024)
+    def test_limits_are_set_before_exec(self):
+        output = subprocess.run(
+            _with_limits(['/bin/sh', '-c', 'ulimit -v; ulimit -t'], cpu_seconds=30),
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        self.assertEqual(output, [str(1024 * 1024), '30'])
+
+    @override_settings(LIBREOFFICE_POOL_SIZE=0)
+    def test_one_off_conversion(self):
+        with override_settings(LIBREOFFICE_BINARY=self.binary):
+            output = DocumentConverter().convert_file(self.source('deck.ppt'), self.workdir, 'pptx')
+        self.assertEqual(output, os.path.join(self.workdir, 'deck.pptx'))
+
+    @override_settings(LIBREOFFICE_POOL_SIZE=0, LIBREOFFICE_CONVERSION_TIMEOUT=1)
+    def test_one_off_timeout_kills_the_process_tree(self):
+        with override_settings(LIBREOFFICE_BINARY=self.binary):
+            with self.assertRaises(ConversionError):
+                DocumentConverter().convert_file(self.source('hang.ppt'), self.workdir, 'pptx')
+
+        with open(os.path.join(self.workdir, 'child.pid')) as f:
+            child = int(f.read())
+        for _ in range(20):
+            if not _running(child):
+                break
+            time.sleep(0.1)
+        self.assertFalse(_running(child))
+
+    def test_stopped_pool_falls_back(self):
+        with self.assertRaises(PoolStopped):
+            LibreOfficePool.convert('in.ppt', 'out.pptx', 'pptx')
+
+        with mock.patch.object(LibreOfficePool, 'start', return_value=True), \
+                override_settings(LIBREOFFICE_BINARY=self.binary):
+            output = DocumentConverter().convert_file(self.source('deck.ppt'), self.workdir, 'pptx')
+        self.assertTrue(os.path.exists(output))
+
+
+PML = (
+    'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+)
+RELS = 'xmlns="http://schemas.openxmlformats.org/package/2006/relationships"'
+REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+
+def _shape(*paragraphs, placeholder=''):
+    body = ''.join(f'<a:p><a:r><a:t>{text}</a:t></a:r></a:p>' for text in paragraphs)
+    return f'<p:sp><p:nvSpPr>{placeholder}</p:nvSpPr><p:txBody>{body}</p:txBody></p:sp>'
+
+
+def build_pptx(path, media_size=0):
+    """A two-slide deck written by hand: slide order, a group, a picture, a chart and notes"""
+    problem = (
+        f'<p:sld {PML}><p:cSld><p:spTree>'
+        + _shape('Problem')
+        + '<p:grpSp>' + _shape('Carriers lose 4%', 'of revenue') + '</p:grpSp>'
+        + '<p:pic/></p:spTree></p:cSld></p:sld>'
+    )
+    traction = (
+        f'<p:sld {PML}><p:cSld><p:spTree>'
+        '<p:sp><p:txBody><a:p><a:r><a:t>ARR</a:t></a:r><a:br/><a:r><a:t>$1.2M</a:t></a:r></a:p></p:txBody></p:sp>'
+        '<p:graphicFrame><a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/chart"/>'
+        '</a:graphic></p:graphicFrame></p:spTree></p:cSld></p:sld>'
+    )
+    notes = (
+        f'<p:notes {PML}><p:cSld><p:spTree>'
+        + _shape('Slide image', placeholder='<p:nvPr><p:ph type="sldImg"/></p:nvPr>')
+        + _shape('Mention the pilot', placeholder='<p:nvPr><p:ph type="body"/></p:nvPr>')
+        + '</p:spTree></p:cSld></p:notes>'
+    )
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('ppt/presentation.xml', (
+            f'<p:presentation {PML}><p:sldIdLst>'
+            '<p:sldId id="256" r:id="rId3"/><p:sldId id="257" r:id="rId2"/>'
+            '</p:sldIdLst></p:presentation>'
+        ))
+        z.writestr('ppt/_rels/presentation.xml.rels', (
+            f'<Relationships {RELS}>'
+            f'<Relationship Id="rId2" Type="{REL_TYPE}/slide" Target="slides/slide1.xml"/>'
+            f'<Relationship Id="rId3" Type="{REL_TYPE}/slide" Target="slides/slide2.xml"/>'
+            f'<Relationship Id="rId9" Type="{REL_TYPE}/hyperlink" Target="https://acme.io" TargetMode="External"/>'
+            '</Relationships>'
+        ))
+        z.writestr('ppt/slides/slide1.xml', traction)
+        z.writestr('ppt/slides/slide2.xml', problem)
+        z.writestr('ppt/slides/_rels/slide2.xml.rels', (
+            f'<Relationships {RELS}>'
+            f'<Relationship Id="rId1" Type="{REL_TYPE}/notesSlide" Target="../notesSlides/notesSlide1.xml"/>'
+            '</Relationships>'
+        ))
+        z.writestr('ppt/notesSlides/notesSlide1.xml', notes)
+        if media_size:
+            z.writestr('ppt/media/image1.png', os.urandom(media_size), zipfile.ZIP_STORED)
+
+
+class CountingFile(io.RawIOBase):
+    """Seekable file wrapper that counts the bytes read through it"""
+
+    def __init__(self, f):
+        self.f = f
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=0):
+        return self.f.seek(offset, whence)
+
+    def tell(self):
+        return self.f.tell()
+
+    def readinto(self, buffer):
+        n = self.f.readinto(buffer)
+        self.bytes_read += n
+        return n
+
+
+class PptxReaderTests(TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir, ignore_errors=True)
+        self.path = os.path.join(self.workdir, 'deck.pptx')
+
+    def test_slides_follow_the_presentation_order(self):
+        build_pptx(self.path)
+
+        with PptxReader(self.path) as reader:
+            slides = list(reader.slides())
+
+        self.assertEqual(slides, [
+            {
+                'number': 1, 'text': 'Problem\nCarriers lose 4%\nof revenue', 'notes': 'Mention the pilot',
+                'has_images': True, 'has_charts': False, 'word_count': 6,
+            },
+            {
+                'number': 2, 'text': 'ARR\n$1.2M', 'notes': '',
+                'has_images': False, 'has_charts': True, 'word_count': 2,
+            },
+        ])
+
+    def test_media_is_never_read(self):
+        build_pptx(self.path, media_size=1024 * 1024)
+
+        with open(self.path, 'rb') as f:
+            counted = CountingFile(f)
+            with PptxReader(counted) as reader:
+                self.assertEqual(len(list(reader.slides())), 2)
+
+        self.assertGreater(counted.bytes_read, 0)
+        self.assertLess(counted.bytes_read, 64 * 1024)
+
+    def test_oversized_parts_are_refused(self):
+        build_pptx(self.path)
+
+        with PptxReader(self.path) as reader, mock.patch.object(PptxReader, 'MAX_PART_SIZE', 64):
+            with self.assertRaises(ValueError):
+                list(reader.slides())
+
+
+class FakePdfPage(dict):
+    """Just enough of a PyPDF2 page for the layout scan: contents, no resources"""
+
+    def __init__(self, data):
+        super().__init__()
+        self.contents = mock.Mock(get_data=mock.Mock(return_value=data))
+
+    def get_contents(self):
+        return self.contents
+
+
+class PdfLayoutAnalyzerTests(TestCase):
+
+    TITLE_SLIDE = (
+        b'BT /F1 36 Tf 1 0 0 1 72 500 Tm (Traction) Tj ET\n'
+        b'BT /F1 18 Tf 1 0 0 1 72 400 Tm 20 TL (Revenue grew 6x) Tj T* (Net retention 140%) Tj ET\n'
+        b'% footer\nBT /F1 8 Tf 1 0 0 1 700 20 Tm (3) Tj ET'
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.analyzer = PdfLayoutAnalyzer()
+
+    def test_title_hierarchy_and_text_blocks(self):
+        layout = self.analyzer.scan(self.TITLE_SLIDE, set())
+
+        self.assertEqual((layout['title_size'], layout['body_size']), (36.0, 18.0))
+        self.assertTrue(layout['has_title'])
+        self.assertEqual(layout['text_blocks'], 3)  # Title, body, footer
+        self.assertFalse(layout['has_charts'] or layout['has_images'])
+
+    def test_scaled_text_uses_the_rendered_size(self):
+        data = b'q 2 0 0 2 0 0 cm BT /F1 9 Tf (Big headline) Tj ET Q BT /F1 18 Tf (Body copy here) Tj ET'
+        layout = self.analyzer.scan(data, set())
+        self.assertEqual(layout['title_size'], 18.0)
+        self.assertFalse(layout['has_title'])
+
+    def test_many_painted_paths_are_a_chart(self):
+        bars = b''.join(b'%d 0 20 %d re f\n' % (i * 30, i * 10) for i in range(12))
+        layout = self.analyzer.scan(b'0 0 m 400 0 l S\n' + bars, set())
+        self.assertEqual(layout['vector_paths'], 13)
+        self.assertTrue(layout['has_charts'])
+
+    def test_images_drawn_and_inline(self):
+        data = b'q 100 0 0 100 0 0 cm /Im1 Do Q /Fm1 Do BI /W 2 /H 2 ID \x00)(\xff EI Q'
+        layout = self.analyzer.scan(data, {b'Im1'})
+        self.assertEqual(layout['image_count'], 2)
+        self.assertTrue(layout['has_images'])
+
+    def test_pages_are_cached_by_content(self):
+        pages = [FakePdfPage(self.TITLE_SLIDE), FakePdfPage(b'')]
+        first = self.analyzer.analyze_pages(pages)
+
+        with mock.patch.object(PdfLayoutAnalyzer, 'scan', side_effect=AssertionError):
+            again = self.analyzer.analyze_pages([FakePdfPage(self.TITLE_SLIDE), FakePdfPage(b'')])
+
+        self.assertEqual(again, first)
+        self.assertTrue(first[0]['has_title'])
@@ -9,6 +9,7 @@ urlpatterns = [
     path('', views.list_pitch_decks, name='list'),
     path('<uuid:deck_id>/', views.get_pitch_deck, name='detail'),
     path('<uuid:deck_id>/delete/', views.delete_pitch_deck, name='delete'),
+    path('<uuid:deck_id>/file/', views.download_pitch_deck, name='file'),
     
     # ===== NEW: STATUS CHECK =====
     path('<uuid:deck_id>/status/', views.check_analysis_status, name='analysis-status'),
@@ -17,4 +18,5 @@ urlpatterns = [
     path('<uuid:deck_id>/slides/', views.list_slides, name='slides-list'),
     path('<uuid:deck_id>/slides/<int:slide_number>/', views.get_slide, name='slide-detail'),
     path('<uuid:deck_id>/slides/<int:slide_number>/coaching/', views.get_slide_coaching, name='slide-coaching'),
+    path('<uuid:deck_id>/slides/<int:slide_number>/thumbnail/', views.get_slide_thumbnail, name='slide-thumbnail'),
 ]
\ No newline at end of file
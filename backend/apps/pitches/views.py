@@ -2,8 +2,17 @@ from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.http import FileResponse, HttpResponseNotModified, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
+from django.core.files.storage import default_storage
+from django.utils.cache import patch_cache_control
+from apps.accounts.services.quota import QuotaService
+from apps.core.services.chunked_upload import ChunkedUploadService
+from apps.core.services.progress import ProgressChannel
+from apps.core.services.storage import ObjectStorage
+from apps.core.services.response_cache import cached_json_response
 from .models import PitchDeck, Slide
+from .services.thumbnails import ThumbnailService
 from .serializers import (
     PitchDeckSerializer,
     PitchDeckListSerializer,
@@ -13,27 +22,76 @@ from .serializers import (
 )
 
 
+def _cached_deck_response(request, pitch_deck, key, build_data):
+    """Serve completed-deck views from the versioned response cache"""
+    if pitch_deck.status != 'completed':
+        return Response(build_data())
+    
+    return cached_json_response(
+        request,
+        namespace=pitch_deck.cache_namespace,
+        key=key,
+        version=pitch_deck.updated_at.isoformat(),
+        build_data=build_data,
+        last_modified=pitch_deck.analyzed_at or pitch_deck.updated_at,
+    )
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def upload_pitch_deck(request):
-    """Upload a new pitch deck"""
+    """
+    Upload a new pitch deck
+    
+    Send the file as multipart 'uploaded_file', or the 'upload_id' of a
+    completed resumable upload (see /api/uploads/).
+    """
+    data = request.data
+    chunked_upload = None
+    if request.data.get('upload_id'):
+        uploads = ChunkedUploadService()
+        chunked_upload = uploads.get_completed(request.user, request.data['upload_id'], 'pitch_deck')
+        if chunked_upload is None:
+            return Response({
+                'error': 'Invalid upload',
+                'message': 'No completed pitch deck upload with this upload_id.'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        data = {'title': request.data.get('title'), 'uploaded_file': uploads.open_file(chunked_upload)}
     
-    # Check if user can upload more decks
-    if not request.user.profile.can_upload_more_decks:
+    try:
+        return _create_pitch_deck(request, data, chunked_upload)
+    finally:
+        if chunked_upload is not None:
+            data['uploaded_file'].close()
+
+
+def _create_pitch_deck(request, data, chunked_upload=None):
+    """Validate, store and queue analysis of an uploaded pitch deck"""
+    
+    # Reserve an upload slot (atomic check-and-increment)
+    quota = QuotaService()
+    if not quota.try_consume_pitch_deck(request.user):
+        limit = quota.get_limits(request.user).get('pitch_decks_limit')
         return Response({
             'error': 'Upload limit reached',
-            'message': f'Free users can upload up to {request.user.profile.pitch_decks_limit} pitch decks. Upgrade to Pro for unlimited uploads.'
+            'message': f'Free users can upload up to {limit} pitch decks. Upgrade to Pro for unlimited uploads.'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    serializer = PitchDeckUploadSerializer(data=request.data, context={'request': request})
+    serializer = PitchDeckUploadSerializer(data=data, context={'request': request})
     
     if serializer.is_valid():
-        pitch_deck = serializer.save()
+        try:
+            pitch_deck = serializer.save()
+        except Exception:
+            quota.release_pitch_deck(request.user)
+            raise
         
-        # Increment user's pitch deck count
-        request.user.profile.increment_pitch_deck_count()
+        # The file now lives in media storage
+        if chunked_upload is not None:
+            ChunkedUploadService().discard(chunked_upload)
         
-        # Trigger background task
+        # Trigger background task (it reuses the analysis of identical
+        # bytes, so the response never tells whether a copy exists)
         from .tasks import analyze_pitch_deck
         analyze_pitch_deck.delay(str(pitch_deck.id))
         
@@ -42,6 +100,7 @@ def upload_pitch_deck(request):
             'pitch_deck': PitchDeckSerializer(pitch_deck).data
         }, status=status.HTTP_201_CREATED)
     
+    quota.release_pitch_deck(request.user)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -63,9 +122,28 @@ def list_pitch_decks(request):
 def get_pitch_deck(request, deck_id):
     """Get single pitch deck with all slides"""
     pitch_deck = get_object_or_404(PitchDeck, id=deck_id, owner=request.user)
-    serializer = PitchDeckSerializer(pitch_deck)
     
-    return Response(serializer.data)
+    return _cached_deck_response(
+        request, pitch_deck, 'detail',
+        lambda: PitchDeckSerializer(pitch_deck).data,
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_pitch_deck(request, deck_id):
+    """The uploaded deck file, through a URL signed for this request"""
+    pitch_deck = get_object_or_404(PitchDeck, id=deck_id, owner=request.user)
+    name = pitch_deck.uploaded_file.name
+    filename = f"{pitch_deck.title}.{pitch_deck.file_type}"
+    
+    storage = ObjectStorage()
+    if storage.is_remote:
+        return HttpResponseRedirect(storage.url(name))
+    
+    response = FileResponse(default_storage.open(name, 'rb'), as_attachment=True, filename=filename)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @api_view(['DELETE'])
@@ -76,9 +154,7 @@ def delete_pitch_deck(request, deck_id):
     pitch_deck.delete()
     
     # Decrement user's pitch deck count
-    if request.user.profile.pitch_decks_uploaded > 0:
-        request.user.profile.pitch_decks_uploaded -= 1
-        request.user.profile.save()
+    QuotaService().release_pitch_deck(request.user)
     
     return Response({
         'message': 'Pitch deck deleted successfully'
@@ -90,14 +166,16 @@ def delete_pitch_deck(request, deck_id):
 def list_slides(request, deck_id):
     """List all slides for a pitch deck"""
     pitch_deck = get_object_or_404(PitchDeck, id=deck_id, owner=request.user)
-    slides = pitch_deck.slides.all()
-    serializer = SlideListSerializer(slides, many=True)
     
-    return Response({
-        'pitch_deck_id': deck_id,
-        'total_slides': slides.count(),
-        'slides': serializer.data
-    })
+    def build_data():
+        slides = list(pitch_deck.slides.all())
+        return {
+            'pitch_deck_id': deck_id,
+            'total_slides': len(slides),
+            'slides': SlideListSerializer(slides, many=True).data
+        }
+    
+    return _cached_deck_response(request, pitch_deck, 'slides', build_data)
 
 
 @api_view(['GET'])
@@ -105,10 +183,12 @@ def list_slides(request, deck_id):
 def get_slide(request, deck_id, slide_number):
     """Get single slide with full details"""
     pitch_deck = get_object_or_404(PitchDeck, id=deck_id, owner=request.user)
-    slide = get_object_or_404(Slide, pitch_deck=pitch_deck, slide_number=slide_number)
-    serializer = SlideSerializer(slide)
     
-    return Response(serializer.data)
+    def build_data():
+        slide = get_object_or_404(Slide, pitch_deck=pitch_deck, slide_number=slide_number)
+        return SlideSerializer(slide).data
+    
+    return _cached_deck_response(request, pitch_deck, f'slide:{slide_number}', build_data)
 
 
 @api_view(['GET'])
@@ -116,16 +196,56 @@ def get_slide(request, deck_id, slide_number):
 def get_slide_coaching(request, deck_id, slide_number):
     """Get coaching/script for a specific slide"""
     pitch_deck = get_object_or_404(PitchDeck, id=deck_id, owner=request.user)
-    slide = get_object_or_404(Slide, pitch_deck=pitch_deck, slide_number=slide_number)
     
-    return Response({
-        'slide_number': slide.slide_number,
-        'slide_type': slide.slide_type,
-        'suggested_script': slide.suggested_script,
-        'key_points': slide.key_points,
-        'estimated_speaking_time': slide.estimated_speaking_time,
-        'suggestions': slide.suggestions,
-    })
+    def build_data():
+        slide = get_object_or_404(Slide, pitch_deck=pitch_deck, slide_number=slide_number)
+        return {
+            'slide_number': slide.slide_number,
+            'slide_type': slide.slide_type,
+            'suggested_script': slide.suggested_script,
+            'key_points': slide.key_points,
+            'estimated_speaking_time': slide.estimated_speaking_time,
+            'suggestions': slide.suggestions,
+        }
+    
+    return _cached_deck_response(request, pitch_deck, f'slide:{slide_number}:coaching', build_data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_slide_thumbnail(request, deck_id, slide_number):
+    """Low-resolution WebP preview of a slide; 202 while a worker renders it"""
+    pitch_deck = get_object_or_404(PitchDeck, id=deck_id, owner=request.user)
+    
+    service = ThumbnailService()
+    state, name = service.lookup(pitch_deck, slide_number)
+    if state == 'rendering':
+        response = Response({
+            'status': 'rendering',
+            'message': 'Thumbnail is being rendered. Try again shortly.'
+        }, status=status.HTTP_202_ACCEPTED)
+        response['Retry-After'] = '2'
+        return response
+    if state == 'failed':
+        return Response({
+            'error': 'Thumbnail unavailable',
+            'message': 'This slide could not be rendered.'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    # Object storage serves the image itself, through a signed URL
+    storage = ObjectStorage()
+    if storage.is_remote:
+        return HttpResponseRedirect(storage.url(name))
+    
+    # Thumbnails never change for a given file and page
+    etag = f'"{pitch_deck.content_hash}-{slide_number}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(default_storage.open(name, 'rb'), content_type='image/webp')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=60 * 60 * 24 * 30)
+    return response
 
 
 # ===== NEW: CHECK ANALYSIS STATUS =====
@@ -142,11 +262,22 @@ def check_analysis_status(request, deck_id):
         'failed': 'Analysis failed. Please try again.'
     }
     
+    # Partial results streamed in by the analysis task
+    progress = {}
+    progress_percentage = 100 if pitch_deck.status == 'completed' else 0
+    if pitch_deck.status == 'processing':
+        progress = ProgressChannel(pitch_deck.cache_namespace).read()
+        slides_total = progress.get('slides_total')
+        progress_percentage = (
+            min(99, round(100 * progress.get('slides_done', 0) / slides_total)) if slides_total else 50
+        )
+    
     return Response({
         'pitch_deck_id': str(deck_id),
         'status': pitch_deck.status,
         'analyzed': pitch_deck.analyzed,
         'total_slides': pitch_deck.total_slides,
         'message': status_messages.get(pitch_deck.status, 'Unknown status'),
-        'progress_percentage': 100 if pitch_deck.status == 'completed' else (50 if pitch_deck.status == 'processing' else 0)
+        'progress_percentage': progress_percentage,
+        'slides_preview': progress.get('slides', {}),
     })
\ No newline at end of file
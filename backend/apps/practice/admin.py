@@ -21,6 +21,7 @@ class PracticeSessionAdmin(admin.ModelAdmin):
         'id',
         'session_number',
         'word_count',
+        'counted_score',
         'created_at',
         'completed_at',
     )
@@ -56,6 +57,9 @@ class PracticeSessionAdmin(admin.ModelAdmin):
         ('Feedback', {
             'fields': ('feedback', 'strengths', 'improvements')
         }),
+        ('Progress', {
+            'fields': ('counted_score',)
+        }),
         ('Status', {
             'fields': ('status', 'created_at', 'completed_at')
         }),
@@ -75,4 +79,13 @@ class PracticeProgressAdmin(admin.ModelAdmin):
     )
     list_filter = ('user', 'pitch_deck')
     search_fields = ('user__username', 'pitch_deck__title')
-    readonly_fields = ('updated_at',)
\ No newline at end of file
+    readonly_fields = (
+        'total_sessions',
+        'best_score',
+        'average_score',
+        'score_sum',
+        'score_sum_squares',
+        'first_session_date',
+        'last_session_date',
+        'updated_at',
+    )
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Rebuild practice progress aggregates from the session table.
+
+The aggregates are maintained incrementally by ProgressTracker; this command
+recomputes them from scratch so any drift (manual edits, failed tasks) can be
+corrected. Safe to run at any time.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from apps.accounts.models import UserProfile
+from apps.practice.models import PracticeSession, PracticeProgress
+
+
+class Command(BaseCommand):
+    help = 'Recompute PracticeProgress and UserProfile practice aggregates from completed sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            dest='username',
+            help='Only reconcile this username',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['username']:
+            users = users.filter(username=options['username'])
+            if not users.exists():
+                raise CommandError(f"User '{options['username']}' not found")
+
+        reconciled = 0
+        for user in users.iterator():
+            with transaction.atomic():
+                self._reconcile_user(user)
+            reconciled += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Reconciled practice progress for {reconciled} user(s)"))
+
+    def _aggregate(self, sessions):
+        return sessions.aggregate(
+            count=Count('id'),
+            score_sum=Sum('overall_score'),
+            score_sum_squares=Sum(F('overall_score') * F('overall_score')),
+            best=Max('overall_score'),
+            duration=Sum('duration_seconds'),
+            first=Min('completed_at'),
+            last=Max('completed_at'),
+        )
+
+    def _reconcile_user(self, user):
+        sessions = PracticeSession.objects.filter(user=user)
+        completed = sessions.filter(status='completed')
+
+        # Mark exactly the completed sessions as counted at their current score
+        completed.update(counted_score=F('overall_score'))
+        sessions.exclude(status='completed').update(counted_score=None)
+
+        # Per-deck aggregates
+        deck_ids = set()
+        per_deck = completed.values('pitch_deck_id').annotate(
+            count=Count('id'),
+            score_sum=Sum('overall_score'),
+            score_sum_squares=Sum(F('overall_score') * F('overall_score')),
+            best=Max('overall_score'),
+            first=Min('completed_at'),
+            last=Max('completed_at'),
+        )
+        for row in per_deck:
+            deck_ids.add(row['pitch_deck_id'])
+            PracticeProgress.objects.update_or_create(
+                user=user,
+                pitch_deck_id=row['pitch_deck_id'],
+                defaults={
+                    'total_sessions': row['count'],
+                    'score_sum': row['score_sum'] or 0,
+                    'score_sum_squares': row['score_sum_squares'] or 0,
+                    'average_score': (row['score_sum'] or 0) / row['count'],
+                    'best_score': row['best'] or 0,
+                    'first_session_date': row['first'],
+                    'last_session_date': row['last'],
+                },
+            )
+        PracticeProgress.objects.filter(user=user).exclude(pitch_deck_id__in=deck_ids).delete()
+
+        # Per-user aggregates
+        totals = self._aggregate(completed)
+        count = totals['count']
+        UserProfile.objects.filter(user=user).update(
+            practice_sessions_completed=count,
+            total_practice_time_seconds=totals['duration'] or 0,
+            practice_score_sum=totals['score_sum'] or 0,
+            practice_score_sum_squares=totals['score_sum_squares'] or 0,
+            average_practice_score=(totals['score_sum'] or 0) / count if count else 0,
+            best_practice_score=totals['best'] or 0,
+            first_practice_at=totals['first'],
+            last_practice_at=totals['last'],
+        )
@@ -0,0 +1,70 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Max, Min, Sum
+
+
+def backfill_running_totals(apps, schema_editor):
+    """Count every completed session once and rebuild the per-deck totals"""
+    PracticeSession = apps.get_model('practice', 'PracticeSession')
+    PracticeProgress = apps.get_model('practice', 'PracticeProgress')
+
+    completed = PracticeSession.objects.filter(status='completed')
+    completed.update(counted_score=F('overall_score'))
+
+    per_deck = completed.values('user_id', 'pitch_deck_id').annotate(
+        count=Count('id'),
+        score_sum=Sum('overall_score'),
+        score_sum_squares=Sum(F('overall_score') * F('overall_score')),
+        best=Max('overall_score'),
+        first=Min('completed_at'),
+        last=Max('completed_at'),
+    )
+    for row in per_deck.iterator():
+        PracticeProgress.objects.update_or_create(
+            user_id=row['user_id'],
+            pitch_deck_id=row['pitch_deck_id'],
+            defaults={
+                'total_sessions': row['count'],
+                'score_sum': row['score_sum'] or 0,
+                'score_sum_squares': row['score_sum_squares'] or 0,
+                'average_score': (row['score_sum'] or 0) / row['count'],
+                'best_score': row['best'] or 0,
+                'first_session_date': row['first'],
+                'last_session_date': row['last'],
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practice', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='practiceprogress',
+            name='score_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='practiceprogress',
+            name='score_sum_squares',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='practicesession',
+            name='counted_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='practiceprogress',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='practice_progress', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_running_totals, migrations.RunPython.noop),
+    ]
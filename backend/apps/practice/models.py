@@ -1,7 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models import Avg
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from apps.pitches.models import PitchDeck
+import math
 import uuid
 
 
@@ -64,6 +66,9 @@ class PracticeSession(models.Model):
     strengths = models.JSONField(default=list, blank=True)
     improvements = models.JSONField(default=list, blank=True)
     
+    # Score currently folded into the progress aggregates (None until first counted)
+    counted_score = models.FloatField(null=True, blank=True)
+    
     # Status
     STATUS_CHOICES = [
         ('pending', 'Pending Analysis'),
@@ -111,6 +116,11 @@ class PracticeSession(models.Model):
         tolerance = 30  # 30 seconds tolerance
         return abs(self.duration_seconds - self.target_duration_seconds) <= tolerance
     
+    @property
+    def cache_namespace(self):
+        """Response cache namespace for this session's read views"""
+        return f"practice_session:{self.id}"
+    
     @property
     def improvement_from_last(self):
         """Calculate improvement from previous session"""
@@ -127,16 +137,17 @@ class PracticeSession(models.Model):
     
     @classmethod
     def get_user_average_score(cls, user):
-        """Get user's average score across all sessions"""
-        return cls.objects.filter(user=user, status='completed').aggregate(
-            avg_score=Avg('overall_score')
-        )['avg_score'] or 0
+        """Get user's average score across all sessions (kept on the profile)"""
+        from apps.accounts.models import UserProfile
+        return UserProfile.objects.filter(user=user).values_list(
+            'average_practice_score', flat=True
+        ).first() or 0
 
 
 class PracticeProgress(models.Model):
     """Track user's overall progress"""
     
-    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='practice_progress')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='practice_progress')
     pitch_deck = models.ForeignKey(PitchDeck, on_delete=models.CASCADE, related_name='progress_tracking')
     
     # Aggregate stats
@@ -144,6 +155,10 @@ class PracticeProgress(models.Model):
     best_score = models.FloatField(default=0)
     average_score = models.FloatField(default=0)
     
+    # Running totals (maintained with F() updates by ProgressTracker)
+    score_sum = models.FloatField(default=0)
+    score_sum_squares = models.FloatField(default=0)
+    
     # Milestones
     first_session_date = models.DateTimeField(null=True, blank=True)
     last_session_date = models.DateTimeField(null=True, blank=True)
@@ -156,4 +171,21 @@ class PracticeProgress(models.Model):
         unique_together = [['user', 'pitch_deck']]
     
     def __str__(self):
-        return f"{self.user.username} - Progress"
\ No newline at end of file
+        return f"{self.user.username} - Progress"
+    
+    @property
+    def score_stddev(self):
+        """Standard deviation of session scores, from the running totals"""
+        if self.total_sessions < 2:
+            return 0
+        mean = self.score_sum / self.total_sessions
+        variance = max(0, self.score_sum_squares / self.total_sessions - mean ** 2)
+        return round(math.sqrt(variance), 2)
+
+
+@receiver(post_delete, sender=PracticeSession)
+def forget_practice_session(sender, instance, **kwargs):
+    """Take a deleted session's score back out of the progress aggregates"""
+    if instance.counted_score is not None:
+        from .services.progress_tracker import ProgressTracker
+        ProgressTracker().forget_session(instance)
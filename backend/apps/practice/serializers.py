@@ -125,15 +125,18 @@ class PracticeProgressSerializer(serializers.ModelSerializer):
     
     user_username = serializers.CharField(source='user.username', read_only=True)
     pitch_deck_title = serializers.CharField(source='pitch_deck.title', read_only=True)
+    score_stddev = serializers.ReadOnlyField()
     
     class Meta:
         model = PracticeProgress
         fields = [
             'user_username',
+            'pitch_deck',
             'pitch_deck_title',
             'total_sessions',
             'best_score',
             'average_score',
+            'score_stddev',
             'first_session_date',
             'last_session_date',
             'updated_at',
@@ -0,0 +1,168 @@
+"""
+Progress Tracker Service
+Maintains per-user and per-deck practice aggregates incrementally
+"""
+import logging
+from django.db import transaction
+from django.db.models import F, Max, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+from apps.accounts.models import UserProfile
+from ..models import PracticeSession, PracticeProgress
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressTracker:
+    """
+    Fold completed practice sessions into the denormalized aggregates on
+    PracticeProgress (per user + deck) and UserProfile (per user).
+
+    Every counter is updated with a single F() expression UPDATE, so concurrent
+    tasks never overwrite each other and reads stay O(1) lookups.
+    """
+
+    def record_session(self, session):
+        """
+        Apply a completed session's score to the aggregates.
+
+        Re-scoring an already counted session only applies the delta between
+        the old and the new score, so re-analysis never drifts the averages.
+
+        Args:
+            session: Completed PracticeSession object
+
+        Returns:
+            bool: True if the aggregates were changed
+        """
+        score = float(session.overall_score)
+        previous = session.counted_score
+        when = session.completed_at or timezone.now()
+
+        if previous is not None and previous == score:
+            return False
+
+        if previous is None:
+            count_delta = 1
+            sum_delta = score
+            squares_delta = score ** 2
+            duration_delta = session.duration_seconds
+        else:
+            count_delta = 0
+            sum_delta = score - previous
+            squares_delta = score ** 2 - previous ** 2
+            duration_delta = 0
+
+        with transaction.atomic():
+            # Claim the session: only one worker can move counted_score from
+            # the value it read, which keeps re-runs idempotent
+            claimed = PracticeSession.objects.filter(pk=session.pk)
+            if previous is None:
+                claimed = claimed.filter(counted_score__isnull=True)
+            else:
+                claimed = claimed.filter(counted_score=previous)
+            if not claimed.update(counted_score=score):
+                logger.info(f"Session {session.pk} already counted, skipping aggregates")
+                return False
+
+            progress, _ = PracticeProgress.objects.get_or_create(
+                user_id=session.user_id,
+                pitch_deck_id=session.pitch_deck_id,
+            )
+            PracticeProgress.objects.filter(pk=progress.pk).update(
+                total_sessions=F('total_sessions') + count_delta,
+                score_sum=F('score_sum') + sum_delta,
+                score_sum_squares=F('score_sum_squares') + squares_delta,
+                average_score=(F('score_sum') + sum_delta) / (F('total_sessions') + count_delta),
+                best_score=Greatest(F('best_score'), Value(score)),
+                first_session_date=Least(Coalesce(F('first_session_date'), Value(when)), Value(when)),
+                last_session_date=Greatest(Coalesce(F('last_session_date'), Value(when)), Value(when)),
+                updated_at=timezone.now(),
+            )
+
+            UserProfile.objects.filter(user_id=session.user_id).update(
+                practice_sessions_completed=F('practice_sessions_completed') + count_delta,
+                total_practice_time_seconds=F('total_practice_time_seconds') + duration_delta,
+                practice_score_sum=F('practice_score_sum') + sum_delta,
+                practice_score_sum_squares=F('practice_score_sum_squares') + squares_delta,
+                average_practice_score=(
+                    (F('practice_score_sum') + sum_delta)
+                    / Greatest(F('practice_sessions_completed') + count_delta, Value(1))
+                ),
+                best_practice_score=Greatest(F('best_practice_score'), Value(score)),
+                first_practice_at=Least(Coalesce(F('first_practice_at'), Value(when)), Value(when)),
+                last_practice_at=Greatest(Coalesce(F('last_practice_at'), Value(when)), Value(when)),
+            )
+
+            # A lowered re-score may have been the best one; this is the only
+            # path that needs to look at the sessions again
+            if previous is not None and score < previous:
+                self._refresh_best_scores(session)
+
+        session.counted_score = score
+        logger.info(f"Progress updated for session {session.pk} (score {score})")
+        return True
+
+    def forget_session(self, session):
+        """
+        Take a deleted session back out of the aggregates.
+
+        Counts, sums and best scores are corrected; first/last practice
+        dates keep their values until reconcile_practice_progress runs.
+
+        Args:
+            session: PracticeSession that was just deleted
+
+        Returns:
+            bool: True if the aggregates were changed
+        """
+        score = session.counted_score
+        if score is None:
+            return False
+
+        with transaction.atomic():
+            progress = PracticeProgress.objects.filter(
+                user_id=session.user_id,
+                pitch_deck_id=session.pitch_deck_id,
+            )
+            progress.update(
+                total_sessions=F('total_sessions') - 1,
+                score_sum=F('score_sum') - score,
+                score_sum_squares=F('score_sum_squares') - score ** 2,
+                average_score=(F('score_sum') - score) / Greatest(F('total_sessions') - 1, Value(1)),
+                updated_at=timezone.now(),
+            )
+            progress.filter(total_sessions__lte=0).delete()
+
+            UserProfile.objects.filter(user_id=session.user_id).update(
+                practice_sessions_completed=F('practice_sessions_completed') - 1,
+                total_practice_time_seconds=F('total_practice_time_seconds') - session.duration_seconds,
+                practice_score_sum=F('practice_score_sum') - score,
+                practice_score_sum_squares=F('practice_score_sum_squares') - score ** 2,
+                average_practice_score=(
+                    (F('practice_score_sum') - score)
+                    / Greatest(F('practice_sessions_completed') - 1, Value(1))
+                ),
+            )
+
+            self._refresh_best_scores(session)
+
+        logger.info(f"Progress updated for deleted session {session.pk} (score {score})")
+        return True
+
+    def _refresh_best_scores(self, session):
+        """Recompute best scores for the session's user and deck"""
+        completed = PracticeSession.objects.filter(
+            user_id=session.user_id,
+            counted_score__isnull=False,
+        )
+        deck_best = completed.filter(pitch_deck_id=session.pitch_deck_id).aggregate(
+            best=Max('counted_score')
+        )['best'] or 0
+        user_best = completed.aggregate(best=Max('counted_score'))['best'] or 0
+
+        PracticeProgress.objects.filter(
+            user_id=session.user_id,
+            pitch_deck_id=session.pitch_deck_id,
+        ).update(best_score=deck_best)
+        UserProfile.objects.filter(user_id=session.user_id).update(best_practice_score=user_best)
@@ -8,16 +8,28 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+FILLER_WORDS = [
+    'um', 'uh', 'like', 'you know', 'basically', 'actually',
+    'literally', 'so', 'well', 'right', 'okay', 'yeah',
+    'kind of', 'sort of', 'i mean', 'you see'
+]
+
+# Every filler in one pass (no filler contains another, so counts match
+# scanning for each one separately)
+FILLER_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(filler) for filler in sorted(FILLER_WORDS, key=len, reverse=True)) + r')\b'
+)
+
 
 class TextAnalyzer:
-    """Analyze practice session transcripts"""
+    """
+    Analyze practice session transcripts.
+
+    A single shared instance per process; metrics are built in locals.
+    """
     
     def __init__(self):
-        self.filler_words = [
-            'um', 'uh', 'like', 'you know', 'basically', 'actually',
-            'literally', 'so', 'well', 'right', 'okay', 'yeah',
-            'kind of', 'sort of', 'i mean', 'you see'
-        ]
+        self.filler_words = FILLER_WORDS
     
     def analyze(self, transcript, duration_seconds=0):
         """
@@ -91,17 +103,11 @@ class TextAnalyzer:
         """Analyze filler word usage"""
         text_lower = text.lower()
         
-        filler_detail = {}
-        total_count = 0
+        counts = Counter(FILLER_PATTERN.findall(text_lower))
         
-        for filler in self.filler_words:
-            # Use word boundaries to avoid matching within words
-            pattern = r'\b' + re.escape(filler) + r'\b'
-            count = len(re.findall(pattern, text_lower))
-            
-            if count > 0:
-                filler_detail[filler] = count
-                total_count += count
+        # Keep the lexicon's order in the detail
+        filler_detail = {filler: counts[filler] for filler in self.filler_words if counts[filler]}
+        total_count = sum(filler_detail.values())
         
         return {
             'total_count': total_count,
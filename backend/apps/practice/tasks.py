@@ -1,8 +1,11 @@
 from celery import shared_task
 from django.utils import timezone
+from apps.core.services.progress import ProgressChannel
+from apps.core.services.registry import get_service
+from apps.core.services.response_cache import invalidate_namespace
 from .models import PracticeSession
 from .services.text_analyzer import TextAnalyzer
-from .services.feedback_generator import FeedbackGenerator
+from .services.progress_tracker import ProgressTracker
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,6 +16,9 @@ def analyze_practice_session(self, session_id):
     """
     Background task to analyze a practice session with real services
     """
+    # Imported here so the web process, which only queues this task, never loads the LLM stack
+    from .services.feedback_generator import FeedbackGenerator
+    
     try:
         # Get session
         session = PracticeSession.objects.get(id=session_id)
@@ -24,7 +30,7 @@ def analyze_practice_session(self, session_id):
         logger.info(f"Starting analysis of practice session: {session.id}")
         
         # STEP 1: Analyze transcript
-        text_analyzer = TextAnalyzer()
+        text_analyzer = get_service(TextAnalyzer)
         metrics = text_analyzer.analyze(
             transcript=session.transcript,
             duration_seconds=session.duration_seconds
@@ -32,12 +38,16 @@ def analyze_practice_session(self, session_id):
         
         logger.info(f"Text analysis complete: {metrics['word_count']} words")
         
-        # STEP 2: Generate feedback with AI
-        feedback_gen = FeedbackGenerator()
+        # STEP 2: Generate feedback with AI, publishing scores as they stream in
+        progress = ProgressChannel(session.cache_namespace)
+        progress.update(pace_score=metrics['pace_score'], clarity_score=metrics['clarity_score'])
+        
+        feedback_gen = get_service(FeedbackGenerator)
         feedback_data = feedback_gen.generate(
             session=session,
             metrics=metrics,
-            pitch_deck=session.pitch_deck
+            pitch_deck=session.pitch_deck,
+            progress=progress,
         )
         
         logger.info(f"Feedback generated, overall score: {feedback_data['overall_score']}")
@@ -64,9 +74,12 @@ def analyze_practice_session(self, session_id):
         session.completed_at = timezone.now()
         session.save()
         
-        # Update user profile stats
-        session.user.profile.increment_practice_session_count()
-        session.user.profile.update_average_score(session.overall_score)
+        # Drop rendered feedback from any previous analysis
+        invalidate_namespace(session.cache_namespace)
+        progress.clear()
+        
+        # Update user and deck progress aggregates
+        ProgressTracker().record_session(session)
         
         logger.info(f"✅ Completed analysis of practice session: {session.id}")
         
@@ -83,6 +96,7 @@ def analyze_practice_session(self, session_id):
             session = PracticeSession.objects.get(id=session_id)
             session.status = 'failed'
             session.save()
+            ProgressChannel(session.cache_namespace).clear()
         except:
             pass
         
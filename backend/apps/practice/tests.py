@@ -1,3 +1,72 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.pitches.models import PitchDeck
+from .models import PracticeSession, PracticeProgress
+from .services.progress_tracker import ProgressTracker
 
-# Create your tests here.
+
+class ProgressAggregateTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('founder', password='pw')
+        self.deck = self.make_deck('Seed')
+
+    def make_deck(self, title):
+        return PitchDeck.objects.create(
+            owner=self.user, title=title, file_type='pdf', uploaded_file=f'pitch_decks/{title}.pdf',
+        )
+
+    def practice(self, score, deck=None, duration=60):
+        session = PracticeSession.objects.create(
+            user=self.user, pitch_deck=deck or self.deck, pitch_type='investor',
+            duration_seconds=duration, overall_score=score, status='completed',
+            completed_at=timezone.now(),
+        )
+        ProgressTracker().record_session(session)
+        return session
+
+    def test_deleting_a_session_takes_it_out_of_the_aggregates(self):
+        self.practice(60)
+        best = self.practice(90, duration=30)
+
+        best.delete()
+
+        progress = PracticeProgress.objects.get(user=self.user, pitch_deck=self.deck)
+        self.assertEqual((progress.total_sessions, progress.average_score, progress.best_score), (1, 60, 60))
+        profile = self.user.profile
+        profile.refresh_from_db()
+        self.assertEqual(profile.practice_sessions_completed, 1)
+        self.assertEqual(profile.total_practice_time_seconds, 60)
+        self.assertEqual((profile.average_practice_score, profile.best_practice_score), (60, 60))
+
+    def test_deleting_a_deck_removes_its_sessions_from_the_profile(self):
+        self.practice(80)
+        other = self.make_deck('Series A')
+        self.practice(50, deck=other)
+
+        other.delete()
+
+        profile = self.user.profile
+        profile.refresh_from_db()
+        self.assertEqual(profile.practice_sessions_completed, 1)
+        self.assertEqual((profile.average_practice_score, profile.best_practice_score), (80, 80))
+        self.assertFalse(PracticeProgress.objects.filter(pitch_deck_id=other.id).exists())
+
+    def test_progress_list_query_count_does_not_grow_with_rows(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.practice(70)
+
+        with CaptureQueriesContext(connection) as one_row:
+            client.get('/api/practice/progress/')
+        for title in ('A', 'B', 'C'):
+            self.practice(70, deck=self.make_deck(title))
+        with CaptureQueriesContext(connection) as four_rows:
+            response = client.get('/api/practice/progress/')
+
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(len(four_rows), len(one_row))
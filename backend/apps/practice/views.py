@@ -3,6 +3,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from apps.accounts.services.quota import QuotaService
+from apps.core.services.chunked_upload import ChunkedUploadService
+from apps.core.services.progress import ProgressChannel
+from apps.core.services.response_cache import cached_json_response
 from apps.pitches.models import PitchDeck
 from .models import PracticeSession, PracticeProgress
 from .serializers import (
@@ -18,17 +22,23 @@ from .serializers import (
 def create_practice_session(request):
     """Create a new practice session"""
     
-    # Check if user can practice more
-    if not request.user.profile.can_practice_more:
+    # Reserve a session in this month's quota (atomic check-and-increment)
+    quota = QuotaService()
+    if not quota.try_consume_practice_session(request.user):
+        limit = quota.get_limits(request.user).get('practice_sessions_limit')
         return Response({
             'error': 'Practice limit reached',
-            'message': f'Free users can practice up to {request.user.profile.practice_sessions_limit} times per month. Upgrade to Pro for unlimited practice.'
+            'message': f'Free users can practice up to {limit} times per month. Upgrade to Pro for unlimited practice.'
         }, status=status.HTTP_403_FORBIDDEN)
     
     serializer = PracticeSessionCreateSerializer(data=request.data, context={'request': request})
     
     if serializer.is_valid():
-        session = serializer.save()
+        try:
+            session = serializer.save()
+        except Exception:
+            quota.release_practice_session(request.user)
+            raise
         
         # ✅ TRIGGER BACKGROUND TASK
         from .tasks import analyze_practice_session
@@ -39,6 +49,7 @@ def create_practice_session(request):
             'session': PracticeSessionSerializer(session).data
         }, status=status.HTTP_201_CREATED)
     
+    quota.release_practice_session(request.user)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -84,31 +95,42 @@ def get_practice_feedback(request, session_id):
     if session.status != 'completed':
         return Response({
             'message': 'Feedback not ready yet. Analysis in progress.',
-            'status': session.status
+            'status': session.status,
+            'partial_scores': ProgressChannel(session.cache_namespace).read(),
         }, status=status.HTTP_202_ACCEPTED)
     
-    return Response({
-        'session_id': session.id,
-        'overall_score': session.overall_score,
-        'scores': {
-            'pace': session.pace_score,
-            'clarity': session.clarity_score,
-            'confidence': session.confidence_score,
-            'content': session.content_score,
-            'structure': session.structure_score,
-        },
-        'metrics': {
-            'duration_seconds': session.duration_seconds,
-            'word_count': session.word_count,
-            'speaking_pace_wpm': session.speaking_pace_wpm,
-            'filler_words_count': session.filler_words_count,
-            'filler_words_detail': session.filler_words_detail,
-        },
-        'feedback': session.feedback,
-        'strengths': session.strengths,
-        'improvements': session.improvements,
-        'improvement_from_last': session.improvement_from_last,
-    })
+    def build_data():
+        return {
+            'session_id': session.id,
+            'overall_score': session.overall_score,
+            'scores': {
+                'pace': session.pace_score,
+                'clarity': session.clarity_score,
+                'confidence': session.confidence_score,
+                'content': session.content_score,
+                'structure': session.structure_score,
+            },
+            'metrics': {
+                'duration_seconds': session.duration_seconds,
+                'word_count': session.word_count,
+                'speaking_pace_wpm': session.speaking_pace_wpm,
+                'filler_words_count': session.filler_words_count,
+                'filler_words_detail': session.filler_words_detail,
+            },
+            'feedback': session.feedback,
+            'strengths': session.strengths,
+            'improvements': session.improvements,
+            'improvement_from_last': session.improvement_from_last,
+        }
+    
+    return cached_json_response(
+        request,
+        namespace=session.cache_namespace,
+        key='feedback',
+        version=session.completed_at.isoformat() if session.completed_at else '',
+        build_data=build_data,
+        last_modified=session.completed_at,
+    )
 
 
 @api_view(['GET'])
@@ -119,7 +141,7 @@ def get_practice_progress(request):
     
     if pitch_deck_id:
         progress = get_object_or_404(
-            PracticeProgress,
+            PracticeProgress.objects.select_related('user', 'pitch_deck'),
             user=request.user,
             pitch_deck_id=pitch_deck_id
         )
@@ -127,11 +149,11 @@ def get_practice_progress(request):
         return Response(serializer.data)
     
     # Return all progress
-    progress = PracticeProgress.objects.filter(user=request.user)
+    progress = PracticeProgress.objects.filter(user=request.user).select_related('user', 'pitch_deck')
     serializer = PracticeProgressSerializer(progress, many=True)
     
     return Response({
-        'count': progress.count(),
+        'count': len(serializer.data),
         'results': serializer.data
     })
 
@@ -143,7 +165,9 @@ def submit_practice_audio(request, session_id):
     Receive an audio recording, transcribe it, then trigger analysis.
 
     Expected request: multipart/form-data with:
-        - audio:            The audio file (required)
+        - audio:            The audio file (required, unless upload_id is sent)
+        - upload_id:        A completed resumable upload (see /api/uploads/),
+                            instead of the audio file
         - duration_seconds: How long the recording is in seconds (optional)
 
     Flow:
@@ -170,7 +194,18 @@ def submit_practice_audio(request, session_id):
         )
 
     # ── 2. Validate audio file ────────────────────────────────────────────────
-    audio_file = request.FILES.get('audio')
+    chunked_upload = None
+    if request.data.get('upload_id'):
+        uploads = ChunkedUploadService()
+        chunked_upload = uploads.get_completed(request.user, request.data['upload_id'], 'practice_audio')
+        if chunked_upload is None:
+            return Response(
+                {'error': 'No completed practice audio upload with this upload_id.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        audio_file = uploads.open_file(chunked_upload)
+    else:
+        audio_file = request.FILES.get('audio')
     if not audio_file:
         return Response(
             {'error': 'No audio file provided. Send the file as "audio" in form-data.'},
@@ -194,6 +229,13 @@ def submit_practice_audio(request, session_id):
             {'error': 'Transcription failed', 'detail': str(e)},
             status=status.HTTP_502_BAD_GATEWAY,
         )
+    finally:
+        if chunked_upload is not None:
+            audio_file.close()
+
+    # The upload is kept until transcription succeeds, so a retry needn't re-send it
+    if chunked_upload is not None:
+        ChunkedUploadService().discard(chunked_upload)
 
     if not result['success']:
         return Response(
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Question, Answer
+from .models import Question, BankQuestion, Answer
 
 
 @admin.register(Question)
@@ -12,20 +12,23 @@ class QuestionAdmin(admin.ModelAdmin):
         'difficulty',
         'times_asked',
         'average_answer_score',
+        'answer_score_sum',
         'created_at',
     )
     list_filter = ('category', 'difficulty', 'created_at')
     search_fields = ('question_text', 'pitch_deck__title')
+    raw_id_fields = ('bank_question',)
     readonly_fields = (
         'id',
         'times_asked',
         'average_answer_score',
+        'answer_score_sum',
         'created_at',
     )
     
     fieldsets = (
         ('Basic Info', {
-            'fields': ('id', 'pitch_deck', 'question_text')
+            'fields': ('id', 'pitch_deck', 'question_text', 'bank_question')
         }),
         ('Classification', {
             'fields': ('category', 'difficulty', 'related_slide_number')
@@ -34,7 +37,7 @@ class QuestionAdmin(admin.ModelAdmin):
             'fields': ('key_points_to_cover',)
         }),
         ('Stats', {
-            'fields': ('times_asked', 'average_answer_score')
+            'fields': ('times_asked', 'average_answer_score', 'answer_score_sum')
         }),
         ('Timestamps', {
             'fields': ('created_at',)
@@ -46,6 +49,25 @@ class QuestionAdmin(admin.ModelAdmin):
     question_text_short.short_description = 'Question'
 
 
+@admin.register(BankQuestion)
+class BankQuestionAdmin(admin.ModelAdmin):
+    """Admin for BankQuestion"""
+    list_display = (
+        'question_text_short',
+        'category',
+        'difficulty',
+        'times_used',
+        'created_at',
+    )
+    list_filter = ('category', 'difficulty')
+    search_fields = ('question_text',)
+    readonly_fields = ('id', 'signature', 'times_used', 'created_at')
+    
+    def question_text_short(self, obj):
+        return obj.question_text[:60] + '...' if len(obj.question_text) > 60 else obj.question_text
+    question_text_short.short_description = 'Question'
+
+
 @admin.register(Answer)
 class AnswerAdmin(admin.ModelAdmin):
     """Admin for Answer"""
@@ -62,6 +84,7 @@ class AnswerAdmin(admin.ModelAdmin):
     readonly_fields = (
         'id',
         'word_count',
+        'counted_score',
         'created_at',
         'analyzed_at',
     )
@@ -80,6 +103,7 @@ class AnswerAdmin(admin.ModelAdmin):
                 'clarity_score',
                 'confidence_score',
                 'relevance_score',
+                'counted_score',
             )
         }),
         ('Analysis', {
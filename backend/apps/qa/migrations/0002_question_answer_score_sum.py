@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:51
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_answer_score_sum(apps, schema_editor):
+    Question = apps.get_model('qa', 'Question')
+    Question.objects.update(answer_score_sum=F('average_answer_score') * F('times_asked'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='answer_score_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(backfill_answer_score_sum, migrations.RunPython.noop),
+    ]
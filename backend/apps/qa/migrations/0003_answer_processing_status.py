@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa', '0002_question_answer_score_sum'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='answer',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending Analysis'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20),
+        ),
+    ]
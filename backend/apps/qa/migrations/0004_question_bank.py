@@ -0,0 +1,39 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:55
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa', '0003_answer_processing_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankQuestion',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('question_text', models.TextField()),
+                ('category', models.CharField(choices=[('market', 'Market Size & Opportunity'), ('competition', 'Competition & Differentiation'), ('business_model', 'Business Model & Revenue'), ('team', 'Team & Execution'), ('traction', 'Traction & Metrics'), ('financials', 'Financials & Projections'), ('product', 'Product & Technology'), ('risks', 'Risks & Challenges')], db_index=True, max_length=50)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], db_index=True, default='medium', max_length=20)),
+                ('key_points_to_cover', models.JSONField(blank=True, default=list)),
+                ('signature', models.JSONField(blank=True, default=list)),
+                ('times_used', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Bank Question',
+                'verbose_name_plural': 'Question Bank',
+                'ordering': ['category', '-times_used'],
+                'indexes': [models.Index(fields=['category', '-times_used'], name='qa_bankques_categor_11c001_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='bank_question',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deck_questions', to='qa.bankquestion'),
+        ),
+    ]
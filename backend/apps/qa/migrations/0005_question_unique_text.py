@@ -0,0 +1,47 @@
+# Generated by Django 6.0.2 on 2026-10-19 02:55
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_duplicate_questions(apps, schema_editor):
+    """Fold repeated questions of a deck into the oldest one, answers and stats included"""
+    Question = apps.get_model('qa', 'Question')
+    Answer = apps.get_model('qa', 'Answer')
+
+    duplicates = (
+        Question.objects.values('pitch_deck_id', 'question_text')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+    )
+    for group in duplicates.iterator():
+        questions = list(
+            Question.objects.filter(
+                pitch_deck_id=group['pitch_deck_id'],
+                question_text=group['question_text'],
+            ).order_by('created_at', 'id')
+        )
+        kept, extra = questions[0], questions[1:]
+
+        Answer.objects.filter(question__in=extra).update(question=kept)
+        kept.times_asked = sum(q.times_asked for q in questions)
+        kept.answer_score_sum = sum(q.answer_score_sum for q in questions)
+        kept.average_answer_score = kept.answer_score_sum / max(kept.times_asked, 1)
+        kept.save(update_fields=['times_asked', 'answer_score_sum', 'average_answer_score'])
+        Question.objects.filter(id__in=[q.id for q in extra]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pitches', '0001_initial'),
+        ('qa', '0004_question_bank'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_questions, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='question',
+            unique_together={('pitch_deck', 'question_text')},
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:31
+
+import hashlib
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Same banding as apps.qa.services.question_bank (64 permutations)
+LSH_BANDS = 16
+LSH_ROWS = 4
+
+
+def backfill_bands(apps, schema_editor):
+    BankQuestion = apps.get_model('qa', 'BankQuestion')
+    BankQuestionBand = apps.get_model('qa', 'BankQuestionBand')
+
+    bands = []
+    for entry in BankQuestion.objects.iterator():
+        if len(entry.signature) != LSH_BANDS * LSH_ROWS:
+            continue
+        for band in range(LSH_BANDS):
+            rows = entry.signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+            key = f"{band}:" + ",".join(str(value) for value in rows)
+            bands.append(BankQuestionBand(
+                bank_question_id=entry.id,
+                category=entry.category,
+                band_hash=hashlib.blake2b(key.encode(), digest_size=16).hexdigest(),
+            ))
+    BankQuestionBand.objects.bulk_create(bands, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa', '0005_question_unique_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankQuestionBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=50)),
+                ('band_hash', models.CharField(max_length=32)),
+                ('bank_question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='qa.bankquestion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'band_hash'], name='qa_bankques_categor_d6374d_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_bands, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.2 on 2026-10-19 03:55
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_counted_score(apps, schema_editor):
+    Answer = apps.get_model('qa', 'Answer')
+    Answer.objects.filter(status='completed').update(counted_score=F('quality_score'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa', '0006_question_bank_bands'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='counted_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_counted_score, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 6.0.2 on 2026-10-19 04:10
+
+import hashlib
+from django.db import migrations, models
+
+
+def question_hash(question_text):
+    normalized = ' '.join(question_text.split()).casefold()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def hash_and_merge_questions(apps, schema_editor):
+    """
+    Fill question_hash, then fold questions of a deck that now share a hash
+    (same text up to case and whitespace) into the oldest one, answers and
+    stats included
+    """
+    Question = apps.get_model('qa', 'Question')
+    Answer = apps.get_model('qa', 'Answer')
+
+    groups = {}
+    for question in Question.objects.order_by('created_at', 'id').iterator():
+        question.question_hash = question_hash(question.question_text)
+        Question.objects.filter(id=question.id).update(question_hash=question.question_hash)
+        groups.setdefault((question.pitch_deck_id, question.question_hash), []).append(question)
+
+    for questions in groups.values():
+        if len(questions) < 2:
+            continue
+        kept, extra = questions[0], questions[1:]
+
+        Answer.objects.filter(question__in=extra).update(question=kept)
+        kept.times_asked = sum(q.times_asked for q in questions)
+        kept.answer_score_sum = sum(q.answer_score_sum for q in questions)
+        kept.average_answer_score = kept.answer_score_sum / max(kept.times_asked, 1)
+        kept.save(update_fields=['times_asked', 'answer_score_sum', 'average_answer_score'])
+        Question.objects.filter(id__in=[q.id for q in extra]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qa', '0007_answer_counted_score'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='question',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='question_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(hash_and_merge_questions, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='question',
+            unique_together={('pitch_deck', 'question_hash')},
+        ),
+    ]
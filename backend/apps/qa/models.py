@@ -1,10 +1,21 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from apps.pitches.models import PitchDeck
 from apps.practice.models import PracticeSession
+import hashlib
 import uuid
 
 
+def question_hash(question_text):
+    """SHA-256 of a question's text, ignoring case and whitespace differences"""
+    normalized = ' '.join(question_text.split()).casefold()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
 class Question(models.Model):
     """AI-generated investor question"""
     
@@ -21,6 +32,7 @@ class Question(models.Model):
     
     # Question Details
     question_text = models.TextField()
+    question_hash = models.CharField(max_length=64, editable=False)  # See question_hash(); the unique key
     
     CATEGORIES = [
         ('market', 'Market Size & Opportunity'),
@@ -47,9 +59,19 @@ class Question(models.Model):
     # Suggested talking points for answer
     key_points_to_cover = models.JSONField(default=list, blank=True)
     
+    # Shared bank entry this question was reused from (or contributed to)
+    bank_question = models.ForeignKey(
+        'BankQuestion',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='deck_questions'
+    )
+    
     # Usage stats
     times_asked = models.IntegerField(default=0)
     average_answer_score = models.FloatField(default=0)
+    answer_score_sum = models.FloatField(default=0)  # Running total behind the average
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -58,6 +80,9 @@ class Question(models.Model):
         ordering = ['category', 'difficulty', 'created_at']
         verbose_name = 'Investor Question'
         verbose_name_plural = 'Investor Questions'
+        # Lets generation bulk insert with ignore_conflicts; the hash keeps
+        # the index small whatever the length of the text
+        unique_together = [['pitch_deck', 'question_hash']]
         indexes = [
             models.Index(fields=['pitch_deck', 'category']),
             models.Index(fields=['difficulty', 'times_asked']),
@@ -65,6 +90,89 @@ class Question(models.Model):
     
     def __str__(self):
         return f"[{self.category}] {self.question_text[:50]}..."
+    
+    def save(self, *args, **kwargs):
+        """Keep question_hash in step with the text"""
+        self.question_hash = question_hash(self.question_text)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'question_text' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'question_hash'}
+        super().save(*args, **kwargs)
+    
+    def apply_answer_score(self, score, previous_score=None):
+        """
+        Fold an answer's score into the usage stats with one atomic UPDATE.
+        
+        Args:
+            score: Newly counted score, or None if the answer no longer counts
+            previous_score: Score that was counted before, or None for a new answer
+        """
+        count_delta = (score is not None) - (previous_score is not None)
+        sum_delta = (score or 0) - (previous_score or 0)
+        
+        Question.objects.filter(pk=self.pk).update(
+            times_asked=F('times_asked') + count_delta,
+            answer_score_sum=F('answer_score_sum') + sum_delta,
+            average_answer_score=(
+                (F('answer_score_sum') + sum_delta)
+                / Greatest(F('times_asked') + count_delta, Value(1))
+            ),
+        )
+
+
+class BankQuestion(models.Model):
+    """Generic investor question reusable across pitch decks"""
+    
+    # Primary Key
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    # Question Details
+    question_text = models.TextField()
+    category = models.CharField(max_length=50, choices=Question.CATEGORIES, db_index=True)
+    difficulty = models.CharField(
+        max_length=20,
+        choices=Question.DIFFICULTY_CHOICES,
+        default='medium',
+        db_index=True
+    )
+    key_points_to_cover = models.JSONField(default=list, blank=True)
+    
+    # MinHash signature for near-duplicate detection
+    signature = models.JSONField(default=list, blank=True)
+    
+    # Usage stats
+    times_used = models.IntegerField(default=0)
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['category', '-times_used']
+        verbose_name = 'Bank Question'
+        verbose_name_plural = 'Question Bank'
+        indexes = [
+            models.Index(fields=['category', '-times_used']),
+        ]
+    
+    def __str__(self):
+        return f"[{self.category}] {self.question_text[:50]}..."
+
+
+class BankQuestionBand(models.Model):
+    """One LSH band of a bank question's MinHash signature"""
+    
+    bank_question = models.ForeignKey(
+        BankQuestion,
+        on_delete=models.CASCADE,
+        related_name='bands'
+    )
+    category = models.CharField(max_length=50)  # Copied from the question, for one-index lookups
+    band_hash = models.CharField(max_length=32)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'band_hash']),
+        ]
 
 
 class Answer(models.Model):
@@ -119,11 +227,15 @@ class Answer(models.Model):
     # Status
     STATUS_CHOICES = [
         ('pending', 'Pending Analysis'),
+        ('processing', 'Processing'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
     
+    # Score currently folded into the question stats (None while not counted)
+    counted_score = models.FloatField(null=True, blank=True)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     analyzed_at = models.DateTimeField(null=True, blank=True)
@@ -141,17 +253,49 @@ class Answer(models.Model):
         return f"{self.user.username} answered: {self.question.question_text[:30]}..."
     
     def save(self, *args, **kwargs):
-        """Update question statistics on save"""
-        is_new = self.pk is None
+        """Update question statistics when the answer's counted score changes"""
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # counted_score is only ever moved by count_score's conditional UPDATE
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'counted_score'
+            ]
         super().save(*args, **kwargs)
+        self.count_score()
+    
+    def count_score(self):
+        """
+        Fold this answer's score into the question stats exactly once.
+        
+        Only the caller whose UPDATE moves counted_score from the value it
+        read applies the delta, so concurrent saves never double count.
+        
+        Returns:
+            bool: True if the question stats were changed
+        """
+        score = self.quality_score if self.status == 'completed' else None
+        previous = self.counted_score
+        answers = Answer.objects.filter(pk=self.pk)
         
-        if is_new and self.status == 'completed':
-            # Update question stats
-            self.question.times_asked += 1
-            
-            # Recalculate average score
-            all_answers = Answer.objects.filter(question=self.question, status='completed')
-            avg_score = sum(a.quality_score for a in all_answers) / all_answers.count()
-            self.question.average_answer_score = avg_score
-            
-            self.question.save()
\ No newline at end of file
+        while True:
+            if previous != score:
+                with transaction.atomic():
+                    claimed = answers.filter(counted_score=previous) if previous is not None \
+                        else answers.filter(counted_score__isnull=True)
+                    if claimed.update(counted_score=score):
+                        self.question.apply_answer_score(score, previous)
+                        self.counted_score = score
+                        return True
+            # Another save may have moved it; apply our change on top of theirs
+            current = list(answers.values_list('counted_score', flat=True))
+            if not current or current[0] == score:
+                self.counted_score = score
+                return False
+            previous = current[0]
+
+
+@receiver(post_delete, sender=Answer)
+def uncount_answer_score(sender, instance, **kwargs):
+    """Take a deleted answer's score back out of the question stats"""
+    if instance.counted_score is not None:
+        Question(pk=instance.question_id).apply_answer_score(None, instance.counted_score)
@@ -119,7 +119,7 @@ class AnswerCreateSerializer(serializers.ModelSerializer):
         return value
     
     def create(self, validated_data):
-        """Create answer"""
+        """Create answer (key point coverage is computed by the analysis task)"""
         answer = Answer.objects.create(
             user=self.context['request'].user,
             question=validated_data['question'],
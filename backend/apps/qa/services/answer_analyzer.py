@@ -0,0 +1,203 @@
+"""
+Answer Analyzer Service
+Scores investor Q&A answers using Groq (Llama 3.3 70B)
+Key-point coverage is settled locally first; answers are batched into one call
+"""
+import json
+import logging
+from typing import Annotated
+from pydantic import BaseModel
+from apps.core.services.llm_client import LLMClient
+from apps.core.services.prompt_builder import PromptBuilder, system_prompt
+from apps.core.services.structured_output import Score, StructuredOutput, ValidItems
+from .key_point_matcher import KeyPointMatcher
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerEvaluation(BaseModel):
+    """Schema of one answer's coaching report"""
+    id: str
+    clarity_score: Score
+    confidence_score: Score
+    relevance_score: Score
+    covered_points: list[str] = []
+    feedback: str
+    strong_points: list[str] = []
+    improvements: list[str] = []
+    suggested_answer: str = ''
+
+
+class AnswerEvaluations(BaseModel):
+    """Schema of the batch evaluation response"""
+    evaluations: Annotated[list[AnswerEvaluation], ValidItems(AnswerEvaluation)]
+
+
+class AnswerAnalyzer:
+    """
+    Evaluate answers to investor questions using Groq.
+
+    Shared by concurrent tasks (see apps.core.services.registry): answers
+    and their evaluations travel through arguments and return values only.
+    """
+
+    MODEL = "llama-3.3-70b-versatile"
+
+    # Weights for the overall quality score
+    SCORE_WEIGHTS = {
+        'completeness_score': 0.3,
+        'relevance_score': 0.3,
+        'clarity_score': 0.25,
+        'confidence_score': 0.15,
+    }
+
+    # Token budget for each answer inside the prompt
+    ANSWER_TEXT_TOKENS = 350
+
+    SYSTEM_ROLE = "You are an experienced venture capital investor coaching founders on their answers."
+    OUTPUT_FORMAT = (
+        '{"evaluations": [{"id": str, "clarity_score": int, "confidence_score": int, "relevance_score": int, '
+        '"covered_points": [str], "feedback": str, "strong_points": [str], '
+        '"improvements": [str], "suggested_answer": str}]}'
+    )
+    RULES = (
+        "Return one object per answer, with the answer's ID",
+        "Scores are 0-100",
+        "covered_points may only contain items from that answer's \"Unclear key points\"",
+        "feedback is two or three sentences of specific coaching",
+        "strong_points and improvements are lists of 1-3 short strings",
+        "suggested_answer is a concise model answer",
+    )
+
+    def __init__(self):
+        self.llm = LLMClient()
+        self.structured = StructuredOutput(self.llm)
+        self.matcher = KeyPointMatcher()
+        self.prompt_builder = PromptBuilder()
+
+    def analyze(self, answer):
+        """
+        Evaluate a single answer.
+
+        Args:
+            answer: Answer object (with its question)
+
+        Returns:
+            dict: Evaluation with scores, key point coverage and feedback,
+                  or None if the model didn't evaluate the answer
+        """
+        return self.analyze_batch([answer]).get(str(answer.id))
+
+    def analyze_batch(self, answers):
+        """
+        Evaluate several answers with a single Groq call.
+
+        Args:
+            answers (list): Answer objects, typically from one Q&A drill
+
+        Returns:
+            dict: Evaluations keyed by answer id (str); answers the model
+                  skipped twice are left out, unscored
+
+        Raises:
+            StructuredOutputError: If the model's output stays invalid
+        """
+        coverage = {
+            str(a.id): self.matcher.match(a.answer_text, a.question.key_points_to_cover)
+            for a in answers
+        }
+
+        llm_results = self._evaluate(answers, coverage)
+
+        # Re-ask only for the answers the model skipped or got wrong
+        skipped = [a for a in answers if str(a.id) not in llm_results]
+        if skipped:
+            logger.warning(f"Re-asking for {len(skipped)} skipped answer evaluation(s)")
+            try:
+                llm_results.update(self._evaluate(skipped, coverage))
+            except Exception as e:
+                # Keep the evaluations of the first call; the rest stay unscored
+                logger.error(f"Error re-asking for skipped evaluations: {str(e)}")
+
+        return {
+            answer_id: self._build_evaluation(coverage[answer_id], llm_result)
+            for answer_id, llm_result in llm_results.items()
+        }
+
+    def _evaluate(self, answers, coverage):
+        """One Groq call for a batch; returns LLM judgements keyed by answer id"""
+        prompt = self._build_evaluation_prompt(answers, coverage)
+
+        logger.info(f"Evaluating {len(answers)} answer(s) via Groq")
+
+        result = self.structured.complete(
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt(self.SYSTEM_ROLE, self.OUTPUT_FORMAT, self.RULES),
+                },
+                {
+                    "role": "user",
+                    "content": prompt,
+                },
+            ],
+            schema=AnswerEvaluations,
+            model=self.MODEL,
+            temperature=0.4,
+            max_tokens=min(4000, 350 * len(answers) + 200),
+            label=f"{len(answers)} answer evaluation(s)",
+        )
+
+        wanted = {str(a.id) for a in answers}
+        return {e.id: e.model_dump() for e in result.evaluations if e.id in wanted}
+
+    def _build_evaluation_prompt(self, answers, coverage):
+        """Build one prompt covering every answer in the batch"""
+        blocks = []
+        for answer in answers:
+            answer_id = str(answer.id)
+            ambiguous = coverage[answer_id]['ambiguous']
+            blocks.append(
+                f"ID: {answer_id}\n"
+                f"Question ({answer.question.category}): {answer.question.question_text}\n"
+                f"Unclear key points: {json.dumps(ambiguous) if ambiguous else 'none'}\n"
+                f"Answer: {self.prompt_builder.compress(answer.answer_text, self.ANSWER_TEXT_TOKENS)}"
+            )
+
+        answers_text = "\n\n---\n\n".join(blocks)
+
+        prompt = f"""Evaluate these founder answers to investor questions.
+
+{answers_text}
+
+Return the JSON object with the evaluations."""
+
+        return prompt
+
+    def _build_evaluation(self, coverage, llm_result):
+        """Merge local coverage with the LLM judgement into final scores"""
+        resolved = set(llm_result.get('covered_points') or [])
+        covered = coverage['covered'] + [p for p in coverage['ambiguous'] if p in resolved]
+        missed = coverage['missed'] + [p for p in coverage['ambiguous'] if p not in resolved]
+        total_points = len(covered) + len(missed)
+
+        evaluation = {
+            'completeness_score': round(100 * len(covered) / total_points, 2) if total_points else 100,
+            'key_points_covered': covered,
+            'key_points_missed': missed,
+            'feedback': llm_result.get('feedback', ''),
+            'strong_points': llm_result.get('strong_points', []),
+            'improvements': llm_result.get('improvements', []),
+            'suggested_answer': llm_result.get('suggested_answer', ''),
+        }
+
+        # LLM scores (already validated to 0-100)
+        for key in ('clarity_score', 'confidence_score', 'relevance_score'):
+            evaluation[key] = llm_result[key]
+
+        evaluation['quality_score'] = round(
+            sum(evaluation[key] * weight for key, weight in self.SCORE_WEIGHTS.items()),
+            2,
+        )
+
+        return evaluation
@@ -0,0 +1,269 @@
+"""
+Key Point Matcher Service
+Local, millisecond key-point coverage for Q&A answers (no LLM call)
+"""
+import math
+import re
+import logging
+import threading
+from collections import OrderedDict
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = {
+    'a', 'about', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'do', 'does',
+    'for', 'from', 'has', 'have', 'how', 'i', 'in', 'into', 'is', 'it', 'its',
+    'of', 'on', 'or', 'our', 'so', 'that', 'the', 'their', 'them', 'there',
+    'these', 'they', 'this', 'to', 'us', 'was', 'we', 'were', 'what', 'when',
+    'which', 'who', 'why', 'will', 'with', 'you', 'your',
+}
+
+# Multi-word phrases collapsed to one canonical token before tokenizing
+PHRASES = {
+    'customer acquisition cost': 'cac',
+    'cost of acquisition': 'cac',
+    'lifetime value': 'ltv',
+    'customer lifetime value': 'ltv',
+    'total addressable market': 'tam',
+    'serviceable addressable market': 'sam',
+    'serviceable obtainable market': 'som',
+    'annual recurring revenue': 'arr',
+    'monthly recurring revenue': 'mrr',
+    'go to market': 'gtm',
+    'go-to-market': 'gtm',
+    'product market fit': 'pmf',
+    'product-market fit': 'pmf',
+    'unit economics': 'unit_economics',
+    'burn rate': 'burn',
+    'gross margin': 'margin',
+}
+
+# Single-word synonyms mapped onto one canonical stem
+SYNONYMS = {
+    'competitor': 'competition',
+    'rival': 'competition',
+    'incumbent': 'competition',
+    'sales': 'revenue',
+    'income': 'revenue',
+    'turnover': 'revenue',
+    'customers': 'user',
+    'customer': 'user',
+    'clients': 'user',
+    'client': 'user',
+    'users': 'user',
+    'attrition': 'churn',
+    'retention': 'churn',
+    'founders': 'team',
+    'founder': 'team',
+    'cofounder': 'team',
+    'hires': 'team',
+    'runway': 'burn',
+    'funding': 'raise',
+    'investment': 'raise',
+    'round': 'raise',
+    'valuation': 'raise',
+    'moat': 'differentiation',
+    'advantage': 'differentiation',
+    'unique': 'differentiation',
+    'profit': 'margin',
+    'profitability': 'margin',
+    'expansion': 'growth',
+    'grow': 'growth',
+    'growing': 'growth',
+}
+
+# Generic key point words ("CAC metric", "Market size") that carry little signal
+GENERIC_TERMS = {
+    'metric', 'calcul', 'size', 'rate', 'number', 'strategi', 'plan', 'detail',
+    'breakdown', 'overview', 'explan', 'exampl', 'data', 'figur', 'analysi',
+}
+GENERIC_TERM_WEIGHT = 0.25
+
+# Compiled once at import: longest phrases first so they win over sub-phrases
+_PHRASE_PATTERN = re.compile(
+    r'\b(' + '|'.join(re.escape(p) for p in sorted(PHRASES, key=len, reverse=True)) + r')\b'
+)
+_WORD_PATTERN = re.compile(r"[a-z0-9_$%]+")
+
+
+class KeyPointMatcher:
+    """
+    Match an answer against a question's key points using stemmed tokens,
+    domain synonyms and, when configured, small static word embeddings.
+
+    Key point indexes are cached per process, so repeated answers to popular
+    questions only tokenize the answer. The instance is shared across threads
+    (see apps.core.services.registry): the caches are the only state, and
+    they are written under _lock.
+    """
+
+    # Share of a key point's terms that must be matched
+    COVERED_THRESHOLD = 0.6
+    MISSED_THRESHOLD = 0.25
+
+    # Cosine similarity at which an embedding neighbour counts as a match
+    EMBEDDING_MATCH_THRESHOLD = 0.72
+
+    INDEX_CACHE_SIZE = 2048
+
+    _stemmer = None
+    _embeddings = None
+    _index_cache = OrderedDict()
+    _lock = threading.Lock()
+
+    def match(self, answer_text, key_points):
+        """
+        Compute key point coverage for an answer.
+
+        Args:
+            answer_text (str): The founder's answer
+            key_points (list): Question.key_points_to_cover
+
+        Returns:
+            dict: {
+                'covered': [...],     # clearly addressed
+                'missed': [...],      # clearly not addressed
+                'ambiguous': [...],   # needs an LLM judgement
+                'scores': {point: 0.0-1.0},
+            }
+        """
+        answer_terms = set(self.terms(answer_text))
+        result = {'covered': [], 'missed': [], 'ambiguous': [], 'scores': {}}
+
+        for point, point_terms in self._index(key_points):
+            if not point_terms:
+                continue
+            total_weight = sum(weight for _, weight in point_terms)
+            score = sum(
+                weight * self._term_credit(term, answer_terms) for term, weight in point_terms
+            ) / total_weight
+            result['scores'][point] = round(score, 2)
+
+            if score >= self.COVERED_THRESHOLD:
+                result['covered'].append(point)
+            elif score < self.MISSED_THRESHOLD:
+                result['missed'].append(point)
+            else:
+                result['ambiguous'].append(point)
+
+        return result
+
+    def _index(self, key_points):
+        """Weighted key point terms, cached per distinct key point list"""
+        cache_key = tuple(key_points or ())
+        cache = KeyPointMatcher._index_cache
+
+        with self._lock:
+            if cache_key in cache:
+                cache.move_to_end(cache_key)
+                return cache[cache_key]
+
+        index = [
+            (point, [
+                (term, GENERIC_TERM_WEIGHT if term in GENERIC_TERMS else 1.0)
+                for term in sorted(set(self.terms(point)))
+            ])
+            for point in cache_key
+        ]
+
+        with self._lock:
+            cache[cache_key] = index
+            if len(cache) > self.INDEX_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        return index
+
+    def terms(self, text):
+        """Normalized terms: phrases collapsed, stopwords dropped, stems + synonyms"""
+        text = _PHRASE_PATTERN.sub(lambda m: PHRASES[m.group(1)], (text or '').lower())
+        stem = self._get_stemmer().stem
+
+        terms = []
+        for word in _WORD_PATTERN.findall(text):
+            if word in STOPWORDS or len(word) < 2:
+                continue
+            if word in SYNONYMS:
+                terms.append(SYNONYMS[word])
+            elif '_' in word:
+                terms.append(word)
+            else:
+                stemmed = stem(word)
+                terms.append(SYNONYMS.get(stemmed, stemmed))
+        return terms
+
+    def _term_credit(self, term, answer_terms):
+        """1 for an exact term match, otherwise embedding similarity above threshold"""
+        if term in answer_terms:
+            return 1.0
+
+        embeddings = self._get_embeddings()
+        if not embeddings or term not in embeddings:
+            return 0.0
+
+        vector = embeddings[term]
+        best = max(
+            (self._cosine(vector, embeddings[t]) for t in answer_terms if t in embeddings),
+            default=0.0,
+        )
+        return best if best >= self.EMBEDDING_MATCH_THRESHOLD else 0.0
+
+    @staticmethod
+    def _cosine(a, b):
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    @classmethod
+    def warm_up(cls):
+        """Load the stemmer and word vectors ahead of the first answer"""
+        cls._get_stemmer()
+        cls._get_embeddings()
+
+    @classmethod
+    def _get_stemmer(cls):
+        """Porter stemmer, created once per process"""
+        if cls._stemmer is None:
+            try:
+                from nltk.stem import PorterStemmer
+            except ImportError:
+                raise ImportError(
+                    "nltk package is required. Install with: pip install nltk"
+                )
+            cls._stemmer = PorterStemmer()
+        return cls._stemmer
+
+    @classmethod
+    def _get_embeddings(cls):
+        """
+        Optional static word vectors (GloVe-style text file: word v1 v2 ...),
+        loaded once per process from settings.QA_KEYPOINT_EMBEDDINGS_PATH.
+        Vectors are keyed by the same stems used for matching.
+        """
+        if cls._embeddings is not None:
+            return cls._embeddings
+
+        with cls._lock:
+            if cls._embeddings is not None:
+                return cls._embeddings
+
+            path = getattr(settings, 'QA_KEYPOINT_EMBEDDINGS_PATH', None)
+            embeddings = {}
+            if path:
+                try:
+                    stem = cls._get_stemmer().stem
+                    with open(path, encoding='utf-8') as f:
+                        for line in f:
+                            parts = line.rstrip().split(' ')
+                            if len(parts) < 3:
+                                continue
+                            word = parts[0].lower()
+                            key = SYNONYMS.get(word) or SYNONYMS.get(stem(word), stem(word))
+                            embeddings.setdefault(key, [float(v) for v in parts[1:]])
+                    logger.info(f"Loaded {len(embeddings)} key point embeddings from {path}")
+                except (OSError, ValueError) as e:
+                    logger.error(f"Could not load key point embeddings: {str(e)}")
+                    embeddings = {}
+
+            cls._embeddings = embeddings
+            return embeddings
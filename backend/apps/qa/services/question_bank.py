@@ -0,0 +1,262 @@
+"""
+Question Bank Service
+Global bank of generic investor questions with MinHash near-duplicate detection,
+looked up through LSH band buckets so cost doesn't grow with the bank
+"""
+import hashlib
+import logging
+import random
+import re
+from django.db.models import F
+from ..models import BankQuestion, BankQuestionBand
+from .key_point_matcher import KeyPointMatcher
+
+logger = logging.getLogger(__name__)
+
+# MinHash parameters (fixed seed so signatures stay comparable across processes)
+NUM_PERMUTATIONS = 64
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+# Estimated Jaccard similarity above which two questions are the same question
+DUPLICATE_THRESHOLD = 0.6
+
+# LSH: 16 bands of 4 rows; questions sharing any band are compared. Pairs at
+# the duplicate threshold share one with probability 1 - (1 - 0.6^4)^16 = 0.9
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+# Which question categories each slide type calls for
+SLIDE_TYPE_CATEGORIES = {
+    'problem': ['market'],
+    'solution': ['product'],
+    'product': ['product'],
+    'market': ['market'],
+    'business_model': ['business_model'],
+    'traction': ['traction'],
+    'competition': ['competition'],
+    'team': ['team'],
+    'financials': ['financials'],
+    'ask': ['financials'],
+}
+
+# Every deck gets these, whatever its slides cover
+BASELINE_CATEGORIES = ['risks', 'business_model', 'team']
+
+_NUMBER_PATTERN = re.compile(r'\d')
+_WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9&'-]*")
+_SENTENCE_PATTERN = re.compile(r'(?<=[.?!:;])\s+|\n+|\s+[-•]\s+')
+
+# Capitalized terms a generic question may still use
+GENERIC_CAPITALIZED = {
+    'i', 'ai', 'ml', 'api', 'saas', 'b2b', 'b2c', 'b2b2c', 'd2c', 'arr', 'mrr',
+    'cac', 'ltv', 'kpi', 'kpis', 'roi', 'tam', 'sam', 'som', 'mvp', 'ip',
+    'ipo', 'm&a', 'ceo', 'cto', 'cfo', 'coo', 'gtm', 'nps', 'gmv', 'ebitda',
+    'r&d', 'series', 'seed', 'pre-seed',
+}
+
+
+def question_signature(text):
+    """
+    MinHash signature over normalized unigrams and bigrams.
+
+    Uses the key point matcher's normalization (stems, synonyms, phrases),
+    so rephrasings like "customer acquisition cost" / "CAC" collide.
+    """
+    terms = KeyPointMatcher().terms(text)
+    shingles = set(terms) | {f"{a} {b}" for a, b in zip(terms, terms[1:])}
+    if not shingles:
+        return []
+
+    hashes = [
+        int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), 'big')
+        for s in shingles
+    ]
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def signature_bands(signature):
+    """LSH bucket keys of a signature, one per band"""
+    if len(signature) != NUM_PERMUTATIONS:
+        return []
+    bands = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        key = f"{band}:" + ",".join(str(value) for value in rows)
+        bands.append(hashlib.blake2b(key.encode(), digest_size=16).hexdigest())
+    return bands
+
+
+def _is_capitalized(word):
+    """Upper-case initial or inner capitals ("Acme", "iPhone", "CRM")"""
+    return word[0].isupper() or any(c.isupper() for c in word[1:])
+
+
+def signature_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    if not sig_a or not sig_b or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class QuestionBank:
+    """Retrieve, deduplicate and store reusable investor questions"""
+
+    def categories_for_deck(self, pitch_deck):
+        """Question categories a deck's slide types call for"""
+        slide_types = set(pitch_deck.slides.values_list('slide_type', flat=True))
+
+        categories = list(BASELINE_CATEGORIES)
+        for slide_type in slide_types:
+            for category in SLIDE_TYPE_CATEGORIES.get(slide_type, []):
+                if category not in categories:
+                    categories.append(category)
+        return categories
+
+    def retrieve(self, categories, per_category=2):
+        """
+        Most-used bank questions for the given categories.
+
+        Returns:
+            list: Question dicts in the generator's format, plus 'bank_question_id'
+        """
+        # One LIMIT query per category, served by the (category, -times_used) index
+        picked = {
+            category: list(
+                BankQuestion.objects.filter(category=category).order_by(
+                    '-times_used', 'created_at'
+                )[:per_category]
+            )
+            for category in categories
+        }
+
+        questions = [
+            {
+                'question_text': entry.question_text,
+                'category': entry.category,
+                'difficulty': entry.difficulty,
+                'related_slide_number': None,
+                'key_points_to_cover': entry.key_points_to_cover,
+                'bank_question_id': entry.id,
+            }
+            for category in categories
+            for entry in picked.get(category, [])
+        ]
+
+        if questions:
+            BankQuestion.objects.filter(
+                id__in=[q['bank_question_id'] for q in questions]
+            ).update(times_used=F('times_used') + 1)
+
+        return questions
+
+    def dedupe(self, questions):
+        """Drop near-duplicate phrasings, keeping the first occurrence"""
+        kept = []
+        signatures = []
+        for question in questions:
+            signature = question_signature(question['question_text'])
+            if any(signature_similarity(signature, s) >= DUPLICATE_THRESHOLD for s in signatures):
+                continue
+            kept.append(question)
+            signatures.append(signature)
+        return kept
+
+    def add(self, questions, pitch_deck=None):
+        """
+        Add reusable questions to the bank, skipping near-duplicates.
+
+        Questions that look deck-specific (figures, proper nouns, or terms
+        from the deck's title and slides) are never shared with other
+        users' decks.
+
+        Returns:
+            list: The same questions, with 'bank_question_id' set where banked
+        """
+        deck_terms = self._deck_terms(pitch_deck) if pitch_deck is not None else set()
+        candidates = [
+            q for q in questions
+            if q.get('reusable') and not q.get('bank_question_id')
+            and self._is_generic(q['question_text'], deck_terms)
+        ]
+        if not candidates:
+            return questions
+
+        created = 0
+        for question in candidates:
+            signature = question_signature(question['question_text'])
+            bands = signature_bands(signature)
+            match = self._find_duplicate(question['category'], signature, bands)
+            if match is None:
+                entry = BankQuestion.objects.create(
+                    question_text=question['question_text'],
+                    category=question['category'],
+                    difficulty=question['difficulty'],
+                    key_points_to_cover=question['key_points_to_cover'],
+                    signature=signature,
+                )
+                BankQuestionBand.objects.bulk_create([
+                    BankQuestionBand(bank_question=entry, category=entry.category, band_hash=band)
+                    for band in bands
+                ])
+                match = entry.id
+                created += 1
+            question['bank_question_id'] = match
+
+        logger.info(f"Question bank: {created} new, {len(candidates) - created} near-duplicates")
+        return questions
+
+    def _find_duplicate(self, category, signature, bands):
+        """Id of a banked question in the same LSH buckets that is a near-duplicate"""
+        if not bands:
+            return None
+        candidates = BankQuestion.objects.filter(
+            id__in=BankQuestionBand.objects.filter(
+                category=category, band_hash__in=bands
+            ).values('bank_question_id')
+        ).values_list('id', 'signature')
+        for entry_id, other in candidates:
+            if signature_similarity(signature, other) >= DUPLICATE_THRESHOLD:
+                return entry_id
+        return None
+
+    def _deck_terms(self, pitch_deck):
+        """
+        Words that identify a deck: title words, plus slide words that are
+        capitalized everywhere they appear (company, product and people names)
+        """
+        terms = {w for w in re.findall(r'\w+', pitch_deck.title.lower()) if len(w) > 3}
+
+        capitalized = set()
+        lowercase = set()
+        for text in pitch_deck.slides.values_list('text_content', flat=True):
+            for sentence in _SENTENCE_PATTERN.split(text or ''):
+                # A sentence's first word is capitalized whatever it is
+                for word in _WORD_PATTERN.findall(sentence)[1:]:
+                    if _is_capitalized(word):
+                        capitalized.add(word.lower())
+                    else:
+                        lowercase.add(word.lower())
+        terms |= {w for w in capitalized - lowercase if len(w) > 2 and w not in GENERIC_CAPITALIZED}
+        return terms
+
+    def _is_generic(self, question_text, deck_terms):
+        """Guard against banking questions that reveal one deck's content"""
+        if _NUMBER_PATTERN.search(question_text):
+            return False
+
+        for sentence in _SENTENCE_PATTERN.split(question_text):
+            # Capitalized words past the first of a sentence are proper nouns
+            for word in _WORD_PATTERN.findall(sentence)[1:]:
+                if _is_capitalized(word) and word.lower() not in GENERIC_CAPITALIZED:
+                    return False
+
+        words = {w.lower() for w in _WORD_PATTERN.findall(question_text)}
+        return not (words & deck_terms)
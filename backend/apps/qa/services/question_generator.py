@@ -2,92 +2,151 @@
 Question Generator Service
 Generates investor questions based on pitch deck content using Groq (Llama 3.3 70B)
 """
-import os
-import json
 import logging
-from django.conf import settings
+from typing import Annotated, Literal, Optional, get_args
+from pydantic import BaseModel
+from apps.core.services.llm_client import LLMClient
+from apps.core.services.prompt_builder import PromptBuilder, system_prompt
+from apps.core.services.structured_output import Choice, StructuredOutput, ValidItems
 
 logger = logging.getLogger(__name__)
 
+Category = Literal[
+    'market', 'competition', 'business_model', 'team',
+    'traction', 'financials', 'product', 'risks',
+]
+
+
+class GeneratedQuestion(BaseModel):
+    """Schema of one generated investor question"""
+    question_text: str
+    category: Annotated[Category, Choice]
+    difficulty: Annotated[Literal['easy', 'medium', 'hard'], Choice] = 'medium'
+    related_slide_number: Optional[int] = None
+    key_points_to_cover: list[str] = []
+    reusable: bool = False
+
+
+class GeneratedQuestions(BaseModel):
+    """Schema of the question generation response"""
+    questions: Annotated[list[GeneratedQuestion], ValidItems(GeneratedQuestion)]
+
 
 class QuestionGenerator:
-    """Generate investor questions for pitch decks using Groq"""
+    """
+    Generate investor questions for pitch decks using Groq.
+
+    Worker processes share one instance between tasks; the deck, exclusions
+    and progress of a call must not be stored on it.
+    """
 
     MODEL = "llama-3.3-70b-versatile"
 
+    CATEGORIES = list(get_args(Category))
+
+    # Token budget for all slide text combined
+    SLIDES_TEXT_TOKENS = 1500
+
+    SYSTEM_ROLE = "You are an experienced venture capital investor reviewing a startup pitch deck."
+    OUTPUT_FORMAT = (
+        '{"questions": [{"question_text": str, "category": str, "difficulty": str, '
+        '"related_slide_number": int|null, "key_points_to_cover": [str], "reusable": bool}]}'
+    )
+    RULES = (
+        "difficulty must be: easy, medium, or hard",
+        "category must be one of: market, competition, business_model, team, traction, financials, product, risks",
+        "key_points_to_cover lists 2-4 short points a strong answer must address",
+        "Mix difficulty levels across questions",
+        "Be specific to the actual deck content where possible",
+        "reusable is true only if the question would fit any startup (no names, figures or details from this deck)",
+    )
+
     def __init__(self):
-        try:
-            from groq import Groq
-            api_key = getattr(settings, 'GROQ_API_KEY', None) or os.getenv('GROQ_API_KEY')
-            if not api_key:
-                raise ValueError("GROQ_API_KEY is not set in settings or .env")
-            self.client = Groq(api_key=api_key)
-        except ImportError:
-            raise ImportError(
-                "groq package is required. Install with: pip install groq"
-            )
+        self.llm = LLMClient()
+        self.structured = StructuredOutput(self.llm)
+        self.prompt_builder = PromptBuilder()
 
-    def generate(self, pitch_deck):
+    def generate(self, pitch_deck, categories=None, count=None, exclude=None, progress=None):
         """
         Generate investor questions based on pitch deck content.
 
         Args:
             pitch_deck: PitchDeck object with slides
+            categories: Optional list of categories to focus on (the bank's gaps)
+            count:      Optional number of questions to ask for
+            exclude:    Optional question texts the deck already has
+            progress:   Optional ProgressChannel; the response is then
+                        streamed and each question published as it completes
 
         Returns:
             list: Generated questions with metadata
-        """
-        try:
-            slides_content = self._get_slides_content(pitch_deck)
-            prompt = self._build_generation_prompt(pitch_deck, slides_content)
-
-            logger.info(f"Generating questions for pitch deck: {pitch_deck.title}")
-
-            response = self.client.chat.completions.create(
-                model=self.MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are an experienced venture capital investor. "
-                            "Always respond with valid JSON only — "
-                            "no markdown, no code fences, no extra text."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt,
-                    },
-                ],
-                temperature=0.7,
-                max_tokens=2000,
-            )
-
-            response_text = response.choices[0].message.content
-            questions = self._parse_questions(response_text)
 
-            logger.info(f"Generated {len(questions)} questions")
-            return questions
+        Raises:
+            StructuredOutputError: If the model's output stays invalid
+        """
+        slides_content = self._get_slides_content(pitch_deck)
+        prompt = self._build_generation_prompt(
+            pitch_deck, slides_content, categories, count, exclude
+        )
+
+        on_value = None
+        if progress is not None:
+            def on_value(key, question):
+                if isinstance(key, tuple) and key[0] == 'questions' and isinstance(question, dict) and question.get('question_text'):
+                    progress.append('questions', {
+                        'question_text': question['question_text'],
+                        'category': question.get('category', ''),
+                    })
 
-        except Exception as e:
-            logger.error(f"Error generating questions: {str(e)}")
-            return self._get_default_questions()
+        logger.info(f"Generating questions for pitch deck: {pitch_deck.title}")
+
+        result = self.structured.complete(
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt(self.SYSTEM_ROLE, self.OUTPUT_FORMAT, self.RULES),
+                },
+                {
+                    "role": "user",
+                    "content": prompt,
+                },
+            ],
+            schema=GeneratedQuestions,
+            model=self.MODEL,
+            temperature=0.7,
+            max_tokens=2000,
+            on_value=on_value,
+            label=f"questions for {pitch_deck.title}",
+        )
+        questions = [q.model_dump() for q in result.questions]
+
+        logger.info(f"Generated {len(questions)} questions")
+        return questions
 
     def _get_slides_content(self, pitch_deck):
-        """Extract content summary from all slides"""
-        slides = pitch_deck.slides.all().order_by('slide_number')
+        """Extract content summary from all slides, compressed into one token budget"""
+        slides = list(
+            pitch_deck.slides.order_by('slide_number').values_list(
+                'slide_number', 'slide_type', 'text_content'
+            )
+        )
+        texts = self.prompt_builder.compress_many(
+            [text for _, _, text in slides],
+            self.SLIDES_TEXT_TOKENS,
+            page_numbers=[number for number, _, _ in slides],
+        )
 
         content_summary = []
-        for slide in slides:
+        for (number, slide_type, _), text in zip(slides, texts):
             content_summary.append({
-                'number': slide.slide_number,
-                'type': slide.slide_type,
-                'text': slide.text_content[:200],
+                'number': number,
+                'type': slide_type,
+                'text': text.replace('\n', ' '),
             })
 
         return content_summary
 
-    def _build_generation_prompt(self, pitch_deck, slides_content):
+    def _build_generation_prompt(self, pitch_deck, slides_content, categories=None, count=None, exclude=None):
         """Build the question generation prompt"""
 
         slides_text = "\n".join([
@@ -95,105 +154,23 @@ class QuestionGenerator:
             for s in slides_content
         ])
 
-        prompt = f"""You are an experienced venture capital investor reviewing a startup pitch deck.
+        categories_text = ", ".join(categories or self.CATEGORIES)
+        count_text = str(count) if count else "8-12"
+        exclude_text = ""
+        if exclude:
+            exclude_text = "\nThe deck already has these questions; do not repeat or rephrase them:\n" + "\n".join(
+                f"- {text}" for text in exclude
+            ) + "\n"
 
-Pitch Deck: {pitch_deck.title}
+        prompt = f"""Pitch Deck: {pitch_deck.title}
 Total Slides: {pitch_deck.total_slides}
 
 Slide Content:
 {slides_text}
 
-Generate 8-12 tough but fair investor questions covering these categories:
-market, competition, business_model, team, traction, financials, product, risks
-
-Return ONLY a JSON array in this exact format:
-[
-  {{
-    "question_text": "What is your customer acquisition cost compared to lifetime value?",
-    "category": "business_model",
-    "difficulty": "hard",
-    "related_slide_number": 5,
-    "key_points_to_cover": ["CAC metric", "LTV calculation", "Payback period"]
-  }}
-]
-
-Rules:
-- difficulty must be: easy, medium, or hard
-- category must be one of: market, competition, business_model, team, traction, financials, product, risks
-- Mix difficulty levels across questions
-- Be specific to the actual deck content where possible
-- Return ONLY the JSON array, nothing else"""
+Generate {count_text} tough but fair investor questions covering these categories:
+{categories_text}
+{exclude_text}
+Return the JSON object with the questions."""
 
         return prompt
-
-    def _parse_questions(self, response_text):
-        """Parse Groq response into question objects"""
-        try:
-            text = response_text.strip()
-
-            # Strip accidental markdown fences
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-                text = text.strip()
-
-            questions = json.loads(text)
-
-            validated = []
-            for q in questions:
-                if 'question_text' in q and 'category' in q:
-                    validated.append({
-                        'question_text': q['question_text'],
-                        'category': q.get('category', 'other'),
-                        'difficulty': q.get('difficulty', 'medium'),
-                        'related_slide_number': q.get('related_slide_number'),
-                        'key_points_to_cover': q.get('key_points_to_cover', []),
-                    })
-
-            return validated
-
-        except Exception as e:
-            logger.error(f"Error parsing questions: {str(e)}")
-            logger.debug(f"Raw response: {response_text}")
-            return self._get_default_questions()
-
-    def _get_default_questions(self):
-        """Fallback questions when Groq call fails"""
-        return [
-            {
-                'question_text': 'What is the total addressable market for your solution?',
-                'category': 'market',
-                'difficulty': 'easy',
-                'related_slide_number': None,
-                'key_points_to_cover': ['TAM size', 'Market segments', 'Growth rate'],
-            },
-            {
-                'question_text': 'How do you differentiate from your main competitors?',
-                'category': 'competition',
-                'difficulty': 'medium',
-                'related_slide_number': None,
-                'key_points_to_cover': ['Unique features', 'Competitive advantages', 'Positioning'],
-            },
-            {
-                'question_text': 'What are your customer acquisition costs?',
-                'category': 'business_model',
-                'difficulty': 'hard',
-                'related_slide_number': None,
-                'key_points_to_cover': ['CAC metric', 'LTV ratio', 'Unit economics'],
-            },
-            {
-                'question_text': 'What experience does your team have in this industry?',
-                'category': 'team',
-                'difficulty': 'easy',
-                'related_slide_number': None,
-                'key_points_to_cover': ['Founder backgrounds', 'Domain expertise', 'Track record'],
-            },
-            {
-                'question_text': 'What are your key metrics and how are they trending?',
-                'category': 'traction',
-                'difficulty': 'medium',
-                'related_slide_number': None,
-                'key_points_to_cover': ['Revenue', 'Users', 'Growth rate', 'Retention'],
-            },
-        ]
\ No newline at end of file
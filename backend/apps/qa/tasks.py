@@ -1,42 +1,176 @@
+import time
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
-from .models import Question, Answer
+from apps.core.services.progress import ProgressChannel
+from apps.core.services.registry import get_service
+from .models import Question, Answer, question_hash
 from apps.pitches.models import PitchDeck
-from .services.question_generator import QuestionGenerator
+from .services.question_bank import QuestionBank
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Questions each deck should end up with (bank + generated)
+QUESTIONS_PER_DECK = 10
+
+# A drill's answers are analyzed once no new answer has arrived for this long...
+DRILL_BATCH_DELAY_SECONDS = 30
+
+# ...or at the latest this long after its first pending answer
+DRILL_BATCH_MAX_WAIT_SECONDS = 300
+
+# How long scoring takes once a batch starts, for clients' polling budgets
+ANSWER_ANALYSIS_SECONDS = 60
+
+# Cache backends each process keeps to itself: the drill debounce needs
+# web and worker processes to see the same keys
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Upper bound on answers per Groq call, to keep the response within max_tokens
+MAX_ANSWERS_PER_CALL = 12
+
+
+def _drill_keys(practice_session_id):
+    """Cache keys for a drill's last answer time and its scheduled batch"""
+    prefix = f"qa_drill:{practice_session_id}"
+    return f"{prefix}:last_answer", f"{prefix}:batch"
+
+
+def analysis_wait_seconds(practice_session_id=None):
+    """How long a client should poll for an answer's scores before giving up"""
+    if practice_session_id:
+        return DRILL_BATCH_MAX_WAIT_SECONDS + DRILL_BATCH_DELAY_SECONDS + ANSWER_ANALYSIS_SECONDS
+    return ANSWER_ANALYSIS_SECONDS
+
+
+def schedule_drill_analysis(practice_session_id):
+    """
+    Debounce a drill's answer analysis: record the answer time and queue one
+    batch per session, which waits until answers stop arriving
+
+    Without a shared cache (no REDIS_URL) the debounce state can't reach the
+    worker, so each answer queues a batch DRILL_BATCH_DELAY_SECONDS out
+    instead; the first one scores whatever is pending by then.
+    """
+    if settings.CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES:
+        analyze_drill_answers.apply_async(
+            args=[str(practice_session_id)],
+            kwargs={'force': True},
+            countdown=DRILL_BATCH_DELAY_SECONDS,
+        )
+        return
+
+    last_key, batch_key = _drill_keys(practice_session_id)
+    now = time.time()
+    timeout = DRILL_BATCH_MAX_WAIT_SECONDS + 2 * DRILL_BATCH_DELAY_SECONDS
+    cache.set(last_key, now, timeout=timeout)
+    # Only the first answer of a batch queues the task; it holds the batch start time
+    if cache.add(batch_key, now, timeout=timeout):
+        analyze_drill_answers.apply_async(
+            args=[str(practice_session_id)],
+            countdown=DRILL_BATCH_DELAY_SECONDS,
+        )
+
+
+def questions_progress(pitch_deck_id):
+    """Progress channel for a deck's question generation"""
+    return ProgressChannel(f"pitch_deck:{pitch_deck_id}:questions")
+
 
 @shared_task(bind=True)
 def generate_questions_for_deck(self, pitch_deck_id):
     """
     Background task to generate questions with real AI service
     """
+    # Imported here so the web process, which only queues this task, never loads the LLM stack
+    from .services.question_generator import QuestionGenerator
+    
     try:
         # Get pitch deck
         pitch_deck = PitchDeck.objects.get(id=pitch_deck_id)
         
         logger.info(f"Generating questions for pitch deck: {pitch_deck.title}")
         
-        # Generate questions with AI
-        generator = QuestionGenerator()
-        questions_data = generator.generate(pitch_deck)
+        # Reuse banked questions for the deck's slide types first
+        bank = QuestionBank()
+        categories = bank.categories_for_deck(pitch_deck)
+        reused = bank.retrieve(categories)
+        
+        # Publish questions as they become available, starting with the bank's
+        progress = questions_progress(pitch_deck.id)
+        progress.update(questions=[
+            {'question_text': q['question_text'], 'category': q['category']} for q in reused
+        ])
+        
+        # Only ask the LLM for the gap
+        covered = {q['category'] for q in reused}
+        missing = [c for c in categories if c not in covered]
+        gap = max(len(missing), QUESTIONS_PER_DECK - len(reused))
         
-        # Create questions in database
-        created_count = 0
+        generated = []
+        if gap > 0:
+            generator = get_service(QuestionGenerator)
+            try:
+                generated = generator.generate(
+                    pitch_deck,
+                    categories=missing or categories,
+                    count=gap,
+                    exclude=[q['question_text'] for q in reused],
+                    progress=progress,
+                )
+            except Exception as e:
+                # Without banked questions there is nothing real to save
+                if not reused:
+                    raise
+                logger.error(f"❌ Question generation failed, keeping {len(reused)} bank questions: {str(e)}")
+            generated = bank.add(generated, pitch_deck)
+        
+        questions_data = bank.dedupe(reused + generated)
+        logger.info(
+            f"Questions for {pitch_deck.title}: {len(reused)} from bank, {len(generated)} generated"
+        )
+        
+        # Drop exact repeats, then skip texts the deck already has (one query)
+        unique_questions = {}
         for q_data in questions_data:
-            Question.objects.get_or_create(
+            unique_questions.setdefault(question_hash(q_data['question_text']), q_data)
+        existing = set(
+            Question.objects.filter(
+                pitch_deck=pitch_deck,
+                question_hash__in=list(unique_questions),
+            ).values_list('question_hash', flat=True)
+        )
+        new_questions = [
+            Question(
                 pitch_deck=pitch_deck,
-                question_text=q_data['question_text'],
-                defaults={
-                    'category': q_data['category'],
-                    'difficulty': q_data['difficulty'],
-                    'related_slide_number': q_data.get('related_slide_number'),
-                    'key_points_to_cover': q_data['key_points_to_cover'],
-                }
+                question_text=q_data['question_text'].strip(),
+                question_hash=text_hash,
+                category=q_data['category'],
+                difficulty=q_data['difficulty'],
+                related_slide_number=q_data.get('related_slide_number'),
+                key_points_to_cover=q_data['key_points_to_cover'],
+                bank_question_id=q_data.get('bank_question_id'),
             )
-            created_count += 1
+            for text_hash, q_data in unique_questions.items()
+            if text_hash not in existing
+        ]
+        
+        # Create questions in database (one INSERT; rows a concurrent run
+        # inserted first conflict on (pitch_deck, question_hash) and are ignored)
+        with transaction.atomic():
+            Question.objects.bulk_create(new_questions, ignore_conflicts=True)
+        # Rows skipped as conflicts aren't reported back; ids are set client-side,
+        # so count which of ours made it in
+        created_count = Question.objects.filter(
+            id__in=[question.id for question in new_questions]
+        ).count() if new_questions else 0
+        progress.clear()
         
         logger.info(f"✅ Generated {created_count} questions for: {pitch_deck.title}")
         
@@ -48,37 +182,127 @@ def generate_questions_for_deck(self, pitch_deck_id):
         
     except Exception as e:
         logger.error(f"❌ Error generating questions: {str(e)}")
+        questions_progress(pitch_deck_id).clear()
         return {'status': 'error', 'message': str(e)}
 
 
+def _claim_pending_answers(answers):
+    """Move pending answers to 'processing' so no other task evaluates them"""
+    with transaction.atomic():
+        answer_ids = list(
+            answers.select_for_update(skip_locked=True)
+            .filter(status='pending')
+            .values_list('id', flat=True)
+        )
+        Answer.objects.filter(id__in=answer_ids).update(status='processing')
+    return answer_ids
+
+
+def _evaluate_answers(answer_ids):
+    """Evaluate claimed answers in batches and store the results"""
+    from .services.answer_analyzer import AnswerAnalyzer
+    
+    analyzer = get_service(AnswerAnalyzer)
+    analyzed = 0
+    
+    for start in range(0, len(answer_ids), MAX_ANSWERS_PER_CALL):
+        batch = list(
+            Answer.objects.filter(id__in=answer_ids[start:start + MAX_ANSWERS_PER_CALL])
+            .select_related('question')
+        )
+        
+        try:
+            evaluations = analyzer.analyze_batch(batch)
+        except Exception as e:
+            logger.error(f"❌ Error evaluating answer batch: {str(e)}")
+            Answer.objects.filter(id__in=[a.id for a in batch]).update(status='failed')
+            continue
+        
+        # Answers the model never evaluated are failed, not given made-up scores
+        unscored = [answer.id for answer in batch if str(answer.id) not in evaluations]
+        if unscored:
+            logger.warning(f"No evaluation for {len(unscored)} answer(s), marking them failed")
+            Answer.objects.filter(id__in=unscored).update(status='failed')
+        
+        for answer in batch:
+            evaluation = evaluations.get(str(answer.id))
+            if evaluation is None:
+                continue
+            for field, value in evaluation.items():
+                setattr(answer, field, value)
+            answer.status = 'completed'
+            answer.analyzed_at = timezone.now()
+            answer.save()
+            analyzed += 1
+    
+    return analyzed
+
+
 @shared_task(bind=True)
 def analyze_answer(self, answer_id):
     """
-    Background task to analyze an answer (placeholder for now)
+    Background task to analyze a single answer
     """
+    claimed = []
     try:
-        answer = Answer.objects.get(id=answer_id)
-        
-        logger.info(f"Analyzing answer: {answer.id}")
+        claimed = _claim_pending_answers(Answer.objects.filter(id=answer_id))
         
-        # TODO: Build answer analyzer service
-        # For now, simple scoring
-        word_count = len(answer.answer_text.split())
+        logger.info(f"Analyzing answer: {answer_id}")
         
-        answer.quality_score = 75
-        answer.completeness_score = 70
-        answer.clarity_score = 80
-        answer.confidence_score = 72
-        answer.relevance_score = 85
-        answer.feedback = "Good answer. Keep practicing!"
-        answer.status = 'completed'
-        answer.analyzed_at = timezone.now()
-        answer.save()
+        analyzed = _evaluate_answers(claimed)
         
-        logger.info(f"✅ Analyzed answer: {answer.id}")
+        logger.info(f"✅ Analyzed answer: {answer_id}")
         
-        return {'status': 'success', 'answer_id': str(answer_id)}
+        return {'status': 'success', 'answer_id': str(answer_id), 'answers_analyzed': analyzed}
         
     except Exception as e:
         logger.error(f"❌ Error analyzing answer: {str(e)}")
-        return {'status': 'error', 'message': str(e)}
\ No newline at end of file
+        Answer.objects.filter(id__in=claimed, status='processing').update(status='failed')
+        return {'status': 'error', 'message': str(e)}
+
+
+@shared_task(bind=True)
+def analyze_drill_answers(self, practice_session_id, force=False):
+    """
+    Background task to analyze every pending answer of a Q&A drill in one batch
+
+    Unless forced (the drill was finished), the batch is put off while
+    answers keep arriving, up to DRILL_BATCH_MAX_WAIT_SECONDS.
+    """
+    last_key, batch_key = _drill_keys(practice_session_id)
+    if not force:
+        now = time.time()
+        last_answer = cache.get(last_key) or 0
+        batch_started = cache.get(batch_key) or 0
+        wait = DRILL_BATCH_DELAY_SECONDS - (now - last_answer)
+        if wait > 0 and now - batch_started < DRILL_BATCH_MAX_WAIT_SECONDS:
+            self.apply_async(args=[practice_session_id], countdown=wait)
+            return {'status': 'deferred', 'practice_session_id': str(practice_session_id)}
+    # Answers submitted from here on start the next batch
+    cache.delete(batch_key)
+    
+    claimed = []
+    try:
+        claimed = _claim_pending_answers(
+            Answer.objects.filter(practice_session_id=practice_session_id)
+        )
+        
+        if not claimed:
+            return {'status': 'success', 'practice_session_id': str(practice_session_id), 'answers_analyzed': 0}
+        
+        logger.info(f"Analyzing {len(claimed)} drill answers for session: {practice_session_id}")
+        
+        analyzed = _evaluate_answers(claimed)
+        
+        logger.info(f"✅ Analyzed {analyzed} drill answers for session: {practice_session_id}")
+        
+        return {
+            'status': 'success',
+            'practice_session_id': str(practice_session_id),
+            'answers_analyzed': analyzed
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error analyzing drill answers: {str(e)}")
+        Answer.objects.filter(id__in=claimed, status='processing').update(status='failed')
+        return {'status': 'error', 'message': str(e)}
@@ -1,3 +1,227 @@
+import uuid
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.pitches.models import PitchDeck, Slide
+from .models import Question, Answer, BankQuestion, question_hash
+from .services.key_point_matcher import KeyPointMatcher
+from .services.question_bank import QuestionBank
+from .tasks import schedule_drill_analysis
 
-# Create your tests here.
+
+class AnswerScoreTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('founder', password='pw')
+        deck = PitchDeck.objects.create(
+            owner=self.user, title='Seed', file_type='pdf', uploaded_file='pitch_decks/seed.pdf',
+        )
+        self.question = Question.objects.create(
+            pitch_deck=deck, question_text='How big is the market?', category='market',
+        )
+
+    def answer(self, **fields):
+        return Answer.objects.create(
+            question=self.question, user=self.user, answer_text='A large one.', **fields
+        )
+
+    def assertStats(self, times_asked, score_sum):
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.times_asked, times_asked)
+        self.assertEqual(self.question.answer_score_sum, score_sum)
+        self.assertEqual(self.question.average_answer_score, score_sum / max(times_asked, 1))
+
+    def complete(self, answer, score):
+        answer.quality_score = score
+        answer.status = 'completed'
+        answer.save()
+
+    def test_score_counts_once_and_rescoring_applies_the_delta(self):
+        answer = self.answer()
+        self.assertStats(0, 0)
+
+        self.complete(answer, 60)
+        answer.save()
+        self.assertStats(1, 60)
+
+        self.complete(Answer.objects.get(pk=answer.pk), 80)
+        self.assertStats(1, 80)
+
+    def test_concurrent_saves_do_not_double_count(self):
+        answer = self.answer()
+        first = Answer.objects.get(pk=answer.pk)
+        second = Answer.objects.get(pk=answer.pk)
+
+        self.complete(first, 70)
+        self.complete(second, 70)
+        self.assertStats(1, 70)
+
+        # A stale copy with a different score replaces the counted one
+        self.complete(Answer.objects.get(pk=answer.pk), 50)
+        self.complete(second, 90)
+        self.assertStats(1, 90)
+        self.assertEqual(Answer.objects.get(pk=answer.pk).counted_score, 90)
+
+    def test_saving_a_stale_copy_keeps_the_counted_score(self):
+        answer = self.answer()
+        stale = Answer.objects.get(pk=answer.pk)
+        self.complete(answer, 70)
+
+        stale.answer_duration_seconds = 30
+        stale.save()
+        self.assertStats(0, 0)
+        self.assertIsNone(Answer.objects.get(pk=answer.pk).counted_score)
+
+    def test_delete_uncounts_the_score(self):
+        kept = self.answer()
+        removed = self.answer()
+        self.complete(kept, 40)
+        self.complete(removed, 80)
+        self.assertStats(2, 120)
+
+        Answer.objects.filter(pk=removed.pk).delete()
+        self.assertStats(1, 40)
+
+        self.answer().delete()
+        self.assertStats(1, 40)
+
+
+class SubmitAnswerTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('founder', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        deck = PitchDeck.objects.create(
+            owner=self.user, title='Seed', file_type='pdf', uploaded_file='pitch_decks/seed.pdf',
+        )
+        self.question = Question.objects.create(
+            pitch_deck=deck, question_text='What is your CAC?', category='business_model',
+            key_points_to_cover=['Customer acquisition cost'],
+        )
+
+    @mock.patch('apps.qa.tasks.analyze_answer.delay')
+    def test_key_points_are_matched_in_the_task_not_the_request(self, delay):
+        with mock.patch.object(KeyPointMatcher, 'match', side_effect=AssertionError):
+            response = self.client.post('/api/qa/answers/', {
+                'question': str(self.question.id),
+                'answer_text': 'Our CAC is forty dollars.',
+            }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['answer']['status'], 'pending')
+        self.assertEqual(response.data['analysis_within_seconds'], 60)
+        delay.assert_called_once_with(response.data['answer']['id'])
+
+
+class QuestionHashTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user('founder', password='pw')
+        self.deck = PitchDeck.objects.create(
+            owner=user, title='Seed', file_type='pdf', uploaded_file='pitch_decks/seed.pdf',
+        )
+
+    def test_texts_differing_in_case_and_spacing_share_a_hash(self):
+        self.assertEqual(question_hash('How big is  the market?\n'), question_hash('how big is the Market?'))
+        self.assertNotEqual(question_hash('How big is the market?'), question_hash('How big is the team?'))
+
+    def test_hash_is_the_unique_key(self):
+        text = 'Why now? ' * 2000  # Far past a btree index row
+        Question.objects.create(pitch_deck=self.deck, question_text=text, category='market')
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Question.objects.create(pitch_deck=self.deck, question_text=text.upper(), category='market')
+
+        Question.objects.bulk_create([
+            Question(pitch_deck=self.deck, question_text=text, question_hash=question_hash(text), category='market'),
+            Question(pitch_deck=self.deck, question_text='Who else?', question_hash=question_hash('Who else?'),
+                     category='competition'),
+        ], ignore_conflicts=True)
+        self.assertEqual(self.deck.questions.count(), 2)
+
+
+@mock.patch('apps.qa.tasks.analyze_drill_answers.apply_async')
+class DrillSchedulingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.session_id = uuid.uuid4()
+
+    def test_shared_cache_queues_one_batch_per_drill(self, apply_async):
+        with mock.patch('apps.qa.tasks.PROCESS_LOCAL_CACHES', ()):
+            schedule_drill_analysis(self.session_id)
+            schedule_drill_analysis(self.session_id)
+
+        apply_async.assert_called_once_with(args=[str(self.session_id)], countdown=30)
+
+    def test_process_local_cache_batches_without_debounce_state(self, apply_async):
+        schedule_drill_analysis(self.session_id)
+        schedule_drill_analysis(self.session_id)
+
+        self.assertEqual(apply_async.call_count, 2)
+        self.assertEqual(apply_async.call_args.kwargs['kwargs'], {'force': True})
+
+
+class QuestionBankTests(TestCase):
+
+    def setUp(self):
+        self.bank = QuestionBank()
+        user = User.objects.create_user('founder', password='pw')
+        self.deck = PitchDeck.objects.create(
+            owner=user, title='Freightly Seed', file_type='pdf', uploaded_file='pitch_decks/seed.pdf',
+        )
+        Slide.objects.create(
+            pitch_deck=self.deck, slide_number=1,
+            text_content='Our platform Routeway plans loads. We sell Routeway to carriers.',
+        )
+
+    def question(self, text, category='business_model', **fields):
+        return {
+            'question_text': text, 'category': category, 'difficulty': 'medium',
+            'key_points_to_cover': [], 'reusable': True, **fields,
+        }
+
+    def test_dedupe_drops_rephrasings_and_keeps_the_first(self):
+        questions = [
+            self.question('What is your customer acquisition cost?'),
+            self.question('What is your CAC?'),
+            self.question('Who are your main competitors?', 'competition'),
+        ]
+
+        kept = self.bank.dedupe(questions)
+
+        self.assertEqual([q['question_text'] for q in kept], [
+            'What is your customer acquisition cost?', 'Who are your main competitors?',
+        ])
+
+    def test_near_duplicates_share_one_bank_entry(self):
+        first = self.bank.add([self.question('What is your customer acquisition cost?')])[0]
+        second = self.bank.add([self.question('What is your CAC?')])[0]
+        other = self.bank.add([self.question('What is your CAC?', 'financials')])[0]
+
+        self.assertEqual(second['bank_question_id'], first['bank_question_id'])
+        self.assertNotEqual(other['bank_question_id'], first['bank_question_id'])
+        self.assertEqual(BankQuestion.objects.count(), 2)
+
+    def test_deck_specific_questions_are_not_banked(self):
+        questions = self.bank.add([
+            self.question('Why would carriers switch to Routeway?'),
+            self.question('How does freightly make money?'),
+            self.question('How will you reach 10 carriers?'),
+            self.question('What is your moat?', reusable=False),
+            self.question('What is your ARR growth?'),
+        ], pitch_deck=self.deck)
+
+        self.assertEqual([bool(q.get('bank_question_id')) for q in questions], [False, False, False, False, True])
+
+    def test_retrieve_counts_uses(self):
+        self.bank.add([self.question('What is your CAC?'), self.question('Who else is building this?', 'competition')])
+
+        questions = self.bank.retrieve(['competition', 'team'])
+
+        self.assertEqual([q['question_text'] for q in questions], ['Who else is building this?'])
+        self.assertEqual(BankQuestion.objects.get(category='competition').times_used, 1)
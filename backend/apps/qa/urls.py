@@ -12,4 +12,7 @@ urlpatterns = [
     path('answers/', views.submit_answer, name='submit-answer'),
     path('answers/<uuid:answer_id>/', views.get_answer, name='answer-detail'),
     path('answers/list/', views.list_user_answers, name='list-answers'),
+    
+    # Q&A drills
+    path('drills/<uuid:session_id>/finish/', views.finish_drill, name='finish-drill'),
 ]
\ No newline at end of file
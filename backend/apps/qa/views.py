@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from apps.pitches.models import PitchDeck
+from apps.practice.models import PracticeSession
 from .models import Question, Answer
 from .serializers import (
     QuestionSerializer,
@@ -30,13 +31,18 @@ def generate_questions(request, deck_id):
             'questions': serializer.data
         })
     
-    # ✅ TRIGGER BACKGROUND TASK
-    from .tasks import generate_questions_for_deck
-    generate_questions_for_deck.delay(str(deck_id))
+    # ✅ TRIGGER BACKGROUND TASK (unless a run is already streaming questions in)
+    from .tasks import generate_questions_for_deck, questions_progress
+    channel = questions_progress(deck_id)
+    progress = channel.read()
+    if not progress:
+        channel.update(questions=[])
+        generate_questions_for_deck.delay(str(deck_id))
     
     return Response({
         'message': 'Questions are being generated. Please check back in a moment.',
         'pitch_deck_id': deck_id,
+        'questions_preview': progress.get('questions', []),
     }, status=status.HTTP_202_ACCEPTED)
 
 
@@ -66,17 +72,42 @@ def submit_answer(request):
         answer = serializer.save()
         
         # ✅ TRIGGER BACKGROUND TASK
-        from .tasks import analyze_answer
-        analyze_answer.delay(str(answer.id))
+        # Drill answers are evaluated together in one batch once the drill settles
+        from .tasks import analyze_answer, analysis_wait_seconds, schedule_drill_analysis
+        if answer.practice_session_id:
+            schedule_drill_analysis(answer.practice_session_id)
+        else:
+            analyze_answer.delay(str(answer.id))
         
         return Response({
             'message': 'Answer submitted. Analysis in progress.',
-            'answer': AnswerSerializer(answer).data
+            'answer': AnswerSerializer(answer).data,
+            # Drill answers are scored in one batch once the drill settles
+            'scored_after_drill': bool(answer.practice_session_id),
+            'analysis_within_seconds': analysis_wait_seconds(answer.practice_session_id),
         }, status=status.HTTP_201_CREATED)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def finish_drill(request, session_id):
+    """Analyze all pending answers of a Q&A drill now, in one batch"""
+    session = get_object_or_404(PracticeSession, id=session_id, user=request.user)
+    pending_count = session.qa_answers.filter(status='pending').count()
+    
+    if pending_count:
+        from .tasks import analyze_drill_answers
+        analyze_drill_answers.delay(str(session.id), force=True)
+    
+    return Response({
+        'message': 'Drill answers are being analyzed.' if pending_count else 'No pending answers.',
+        'practice_session_id': str(session.id),
+        'pending_answers': pending_count,
+    }, status=status.HTTP_202_ACCEPTED if pending_count else status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_answer(request, answer_id):
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 
 # Set default Django settings
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -14,6 +15,29 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 
+@worker_init.connect
+def import_worker_services(**kwargs):
+    """Import service modules once in the main process; pool processes inherit them"""
+    from apps.core.services.registry import import_services
+    import_services()
+
+
+@worker_process_init.connect
+def warm_worker_process(**kwargs):
+    """Build this worker process's services and LibreOffice instances before its first task"""
+    from apps.core.services.registry import preload_services
+    from apps.pitches.services.document_converter import LibreOfficePool
+    preload_services()
+    LibreOfficePool.start()
+
+
+@worker_process_shutdown.connect
+def stop_worker_process(**kwargs):
+    """Kill this worker process's LibreOffice instances; they run in their own sessions and would outlive it"""
+    from apps.pitches.services.document_converter import LibreOfficePool
+    LibreOfficePool.stop()
+
+
 @app.task(bind=True)
 def debug_task(self):
     """Debug task to test Celery"""
@@ -2,6 +2,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 import os
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 # Load environment variables
 load_dotenv()
@@ -33,6 +34,7 @@ INSTALLED_APPS = [
     'drf_yasg',
 
     # Your apps
+    'apps.core',
     'apps.accounts',
     'apps.pitches',
     'apps.practice',
@@ -112,18 +114,59 @@ USE_TZ = True
 # ===== STATIC FILES =====
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # ===== MEDIA FILES =====
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
-# File upload limits
-FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800   # 50MB
-DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800   # 50MB
+# ===== STORAGE =====
+# Decks, thumbnails and direct uploads go to S3-compatible object storage
+# (AWS S3, MinIO, R2, ...) when a bucket is set, so Celery workers don't
+# need the web container's filesystem; otherwise to MEDIA_ROOT.
+AWS_STORAGE_BUCKET_NAME = os.getenv('AWS_STORAGE_BUCKET_NAME')
+if AWS_STORAGE_BUCKET_NAME:
+    MEDIA_STORAGE = {
+        'BACKEND': 'storages.backends.s3.S3Storage',
+        'OPTIONS': {
+            'bucket_name': AWS_STORAGE_BUCKET_NAME,
+            'endpoint_url': os.getenv('AWS_S3_ENDPOINT_URL'),  # e.g. http://minio:9000
+            'region_name': os.getenv('AWS_S3_REGION_NAME'),
+            'access_key': os.getenv('AWS_ACCESS_KEY_ID'),
+            'secret_key': os.getenv('AWS_SECRET_ACCESS_KEY'),
+            'default_acl': None,
+            'querystring_auth': True,
+            'file_overwrite': False,
+        },
+    }
+else:
+    MEDIA_STORAGE = {'BACKEND': 'django.core.files.storage.FileSystemStorage'}
+
+STORAGES = {
+    'default': MEDIA_STORAGE,
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+
+# Lifetime of presigned upload and download URLs
+STORAGE_PRESIGNED_EXPIRY_SECONDS = 3600
+
+# File upload limits: larger multipart files spill to temporary files
+# instead of sitting in worker RAM (big decks should use chunked uploads)
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440   # 2.5MB
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2621440   # 2.5MB
 MAX_PITCH_DECK_SIZE = 50 * 1024 * 1024  # 50MB
 ALLOWED_PITCH_DECK_EXTENSIONS = ['pdf', 'pptx', 'ppt']
 
+# Hash uploads while they stream in (pitch decks are deduplicated by SHA-256)
+FILE_UPLOAD_HANDLERS = [
+    'apps.core.upload_handlers.HashingMemoryFileUploadHandler',
+    'apps.core.upload_handlers.HashingTemporaryFileUploadHandler',
+]
+
+# ===== CHUNKED UPLOADS =====
+# Resumable upload chunks are stored in media storage, so any web node can take the next one
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 5 * 1024 * 1024  # 5MB
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -165,6 +208,10 @@ else:
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Resumable upload protocol headers
+CORS_ALLOW_HEADERS = list(default_headers) + ['upload-offset', 'upload-length', 'tus-resumable']
+CORS_EXPOSE_HEADERS = ['Location', 'Upload-Offset', 'Upload-Length', 'Tus-Resumable']
+
 # ===== CSRF =====
 CSRF_COOKIE_HTTPONLY = False
 CSRF_COOKIE_SAMESITE = 'Lax'
@@ -191,6 +238,45 @@ if not DEBUG:
 
 # ===== API KEYS =====
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+# ===== LLM PROVIDERS =====
+# Backends the LLM router may use, in order of preference: groq, openai, local
+LLM_PROVIDERS = [p.strip() for p in os.getenv('LLM_PROVIDERS', 'groq').split(',') if p.strip()]
+# Any OpenAI-compatible endpoint (OpenAI, Together, a self-hosted vLLM, ...)
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL')
+# Model to use there instead of the Groq model names (e.g. gpt-4o-mini)
+OPENAI_MODEL = os.getenv('OPENAI_MODEL')
+# Send a hedged second request after this long, until latency stats exist
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv('LLM_HEDGE_AFTER_SECONDS', '8'))
+
+# ===== SLIDE ANALYSIS =====
+# Coach only key slides (problem, solution, market, ask) with the large model;
+# the rest get their coaching from the small classifier model
+SLIDE_COACHING_KEY_SLIDES_ONLY = os.getenv('SLIDE_COACHING_KEY_SLIDES_ONLY', 'False') == 'True'
+
+# ===== SLIDE THUMBNAILS =====
+# pdftoppm processes rasterizing a range of slide thumbnails (per render task)
+THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', '2'))
+
+# ===== DOCUMENT CONVERSION =====
+# LibreOffice (installed by nixpacks.toml) converts legacy .ppt decks to PPTX
+# and PowerPoint decks to PDF
+LIBREOFFICE_BINARY = os.getenv('LIBREOFFICE_BINARY', 'soffice')
+# The supported mode is one LibreOffice process per conversion. Warm instances per worker process are opt-in: they need
+# unoserver installed for LibreOffice's own Python (it imports `uno`), which a
+# pip install into the app's environment doesn't give, so it isn't in
+# requirements.txt. Without it the pool logs a warning and falls back.
+LIBREOFFICE_POOL_SIZE = int(os.getenv('LIBREOFFICE_POOL_SIZE', '0'))
+UNOSERVER_BINARY = os.getenv('UNOSERVER_BINARY', 'unoserver')
+LIBREOFFICE_CONVERSION_TIMEOUT = int(os.getenv('LIBREOFFICE_CONVERSION_TIMEOUT', '120'))
+# Address-space cap per LibreOffice process (0 = unlimited); one-off
+# processes are also capped at LIBREOFFICE_CONVERSION_TIMEOUT seconds of CPU
+LIBREOFFICE_MEMORY_LIMIT_MB = int(os.getenv('LIBREOFFICE_MEMORY_LIMIT_MB', '4096'))
+
+# ===== Q&A =====
+# Optional GloVe-style word vectors for local key point matching
+QA_KEYPOINT_EMBEDDINGS_PATH = os.getenv('QA_KEYPOINT_EMBEDDINGS_PATH')
 
 # # ===== CELERY =====
 # REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
@@ -223,6 +309,42 @@ CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60
 CELERY_RESULT_EXPIRES = 3600
 
+# Services built once per worker process before its first task (see
+# apps.core.services.registry). Tasks and threads share each instance via
+# get_service(), so a listed class must keep no per-call state on self
+WORKER_PRELOADED_SERVICES = [
+    'apps.core.services.llm_client.LLMClient',
+    'apps.pitches.services.file_processor.FileProcessor',
+    'apps.pitches.services.slide_classifier.SlideClassifier',
+    'apps.pitches.services.ai_analyzer.AIAnalyzer',
+    'apps.practice.services.text_analyzer.TextAnalyzer',
+    'apps.practice.services.feedback_generator.FeedbackGenerator',
+    'apps.qa.services.key_point_matcher.KeyPointMatcher',
+    'apps.qa.services.question_generator.QuestionGenerator',
+    'apps.qa.services.answer_analyzer.AnswerAnalyzer',
+]
+
+# ===== CACHE =====
+# Shared Redis cache when REDIS_URL is configured, per-process memory otherwise.
+# Without Redis, rate limits, progress channels and the Q&A drill debounce
+# only see their own process (drill answers are then batched per
+# DRILL_BATCH_DELAY_SECONDS window instead of once the drill settles)
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+    if REDIS_URL.startswith('rediss://'):
+        CACHES['default']['OPTIONS'] = {'ssl_cert_reqs': None}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # ===== SWAGGER =====
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
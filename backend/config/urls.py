@@ -29,6 +29,7 @@ urlpatterns = [
     path('api/pitches/', include('apps.pitches.urls')),
     path('api/practice/', include('apps.practice.urls')),
     path('api/qa/', include('apps.qa.urls')),
+    path('api/uploads/', include('apps.core.urls')),
 ]
 
 # Serve media files in development
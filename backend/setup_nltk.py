@@ -1,7 +0,0 @@
-import nltk
-
-print("Downloading NLTK data...")
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('averaged_perceptron_tagger')
-print("✅ NLTK data downloaded successfully!")
\ No newline at end of file
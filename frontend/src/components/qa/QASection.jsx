@@ -10,12 +10,17 @@ import {
   TrendingUp
 } from 'lucide-react';
 
+// Drill answers wait for the drill to settle, so they are polled less often
+const POLL_INTERVAL_MS = 2000;
+const DRILL_POLL_INTERVAL_MS = 5000;
+
 const QASection = ({ deckId }) => {
   const [loading, setLoading] = useState(true);
   const [questions, setQuestions] = useState([]);
   const [selectedQuestion, setSelectedQuestion] = useState(null);
   const [answer, setAnswer] = useState('');
   const [submitting, setSubmitting] = useState(false);
+  const [scoredAfterDrill, setScoredAfterDrill] = useState(false);
   const [feedback, setFeedback] = useState(null);
   const [error, setError] = useState('');
 
@@ -57,19 +62,28 @@ const QASection = ({ deckId }) => {
         answer_duration_seconds: 0
       });
 
-      // Poll for feedback
+      // Poll for feedback for as long as the server says scoring can take
+      const interval = response.scored_after_drill ? DRILL_POLL_INTERVAL_MS : POLL_INTERVAL_MS;
+      const waitSeconds = response.analysis_within_seconds || 60;
+      setScoredAfterDrill(Boolean(response.scored_after_drill));
       const result = await poll(
         () => qaAPI.getAnswer(response.answer.id),
-        (data) => data.status === 'completed',
-        2000,
-        30
+        (data) => data.status === 'completed' || data.status === 'failed',
+        interval,
+        Math.ceil((waitSeconds * 1000) / interval)
       );
 
+      if (result.status === 'failed') {
+        throw new Error('Your answer could not be analyzed. Please try again.');
+      }
+
       setFeedback(result);
       setSubmitting(false);
+      setScoredAfterDrill(false);
 
     } catch (err) {
       setSubmitting(false);
+      setScoredAfterDrill(false);
       setError(err.message || 'Failed to submit answer');
     }
   };
@@ -213,7 +227,7 @@ const QASection = ({ deckId }) => {
               {submitting ? (
                 <>
                   <Loader2 className="w-5 h-5 animate-spin" />
-                  Analyzing...
+                  {scoredAfterDrill ? 'Scoring after your drill...' : 'Analyzing...'}
                 </>
               ) : (
                 <>